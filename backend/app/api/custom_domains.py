@@ -0,0 +1,57 @@
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services.resolver import ResolvedOrganization, domain_resolver, resolve_custom_domain
+from app.utils.helpers import normalize_host, reserved_hosts
+
+
+class CustomDomainMiddleware:
+    """
+    Serves an organization's public routes on its custom domain.
+
+    On a custom domain paths are taken relative to the organization, so
+    status.example.com/status is served by /public/<slug>/status, the root by
+    the bundle and /ws by the public websocket. Paths already starting with
+    /public/ are left alone, so slug URLs keep working on any host.
+
+    Hosts are resolved through a cache that also remembers unknown hosts, so
+    after warmup a request costs one dictionary lookup. Reserved hosts, the
+    API's and frontend's own, skip even that. Only verified domains are served.
+    """
+
+    def __init__(self, app: ASGIApp, prefix: str = "/public"):
+        self.app = app
+        self.prefix = prefix
+        self.excluded_hosts = reserved_hosts()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket") and not scope["path"].startswith(f"{self.prefix}/"):
+            organization = await self._organization(scope)
+            if organization is not None:
+                scope = self._rewrite(scope, organization.slug)
+        await self.app(scope, receive, send)
+
+    async def _organization(self, scope: Scope) -> Optional[ResolvedOrganization]:
+        host = None
+        for name, value in scope["headers"]:
+            if name == b"host":
+                host = normalize_host(value.decode("latin-1"))
+                break
+        if not host or host in self.excluded_hosts:
+            return None
+        hit, organization = domain_resolver.cached(host)
+        if hit:
+            return organization
+        return await run_in_threadpool(resolve_custom_domain, host)
+
+    def _rewrite(self, scope: Scope, slug: str) -> Scope:
+        path = scope["path"]
+        if scope["type"] == "websocket":
+            path = f"/ws{self.prefix}/{slug}" if path.rstrip("/") == "/ws" else path
+        elif path == "/":
+            path = f"{self.prefix}/{slug}/bundle"
+        else:
+            path = f"{self.prefix}/{slug}{path}"
+        return {**scope, "path": path, "raw_path": path.encode("utf-8")}
@@ -1,11 +1,13 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.api.etag import VersionedRoute
 from app.api.dependencies import get_current_active_user, get_user_organization_id
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
 from app.schemas.incident import (
     Incident, 
     IncidentCreate, 
@@ -24,34 +26,61 @@ from app.services.incident import (
     add_incident_update,
     get_active_incidents_by_organization,
 )
+from app.services.export import (
+    incident_history_csv,
+    incident_history_ndjson,
+    iter_incident_history,
+)
 from app.schemas.user import User
+from app.utils.fieldsets import fieldset_response, parse_fields
+from app.utils.pagination import decode_cursor, paginate, set_pagination_headers
 from app.websockets.manager import manager
 
-router = APIRouter()
+router = APIRouter(route_class=VersionedRoute)
 
 
 @router.get("/", response_model=List[Incident])
 def read_incidents(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1),
     active_only: bool = False,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Retrieve incidents for the current user's organization.
+    Retrieve incidents for the current user's organization, newest first.
+    Pass the X-Next-Cursor header of a response as `cursor` to get the next page,
+    and a comma separated list of fields as `fields` to return only those.
     """
     organization_id = get_user_organization_id(current_user)
+    try:
+        after = decode_cursor(cursor, datetime.fromisoformat, int) if cursor else None
+        selected = parse_fields(fields, Incident)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     if active_only:
         incidents = get_active_incidents_by_organization(
-            db, organization_id=organization_id, skip=skip, limit=limit
+            db, organization_id=organization_id, skip=skip, limit=limit + 1, after=after,
+            fields=selected,
         )
     else:
         incidents = get_incidents_by_organization(
-            db, organization_id=organization_id, skip=skip, limit=limit
+            db, organization_id=organization_id, skip=skip, limit=limit + 1, after=after,
+            fields=selected,
         )
     
+    incidents, next_cursor = paginate(
+        incidents, limit=limit, key=lambda incident: (incident.started_at, incident.id)
+    )
+    if selected:
+        response = fieldset_response(incidents, Incident, selected)
+        set_pagination_headers(response, next_cursor)
+        return response
+    set_pagination_headers(response, next_cursor)
     return incidents
 
 
@@ -108,6 +137,37 @@ def create_new_incident(
     return incident
 
 
+@router.get("/export")
+def export_incidents(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Stream the full incident history of the current user's organization,
+    with updates and service IDs inlined, as NDJSON or CSV.
+    """
+    organization_id = get_user_organization_id(current_user)
+    encode = incident_history_csv if format == "csv" else incident_history_ndjson
+    
+    def generate():
+        # The request session is closed before the body is sent, so the
+        # stream uses its own
+        db = SessionLocal()
+        try:
+            yield from encode(
+                iter_incident_history(db, organization_id=organization_id)
+            )
+        finally:
+            db.close()
+    
+    filename = f"incidents-{organization_id}.{format}"
+    return StreamingResponse(
+        generate(),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{incident_id}", response_model=IncidentWithDetails)
 def read_incident(
     *,
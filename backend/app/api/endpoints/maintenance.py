@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_current_active_user, get_user_organization_id
+from app.db.session import get_db
+from app.schemas.incident import MaintenanceWindow
+from app.schemas.user import User
+from app.services.maintenance import FOREVER, affecting, maintenance_index
+
+router = APIRouter()
+
+
+@router.get("/active", response_model=List[MaintenanceWindow])
+def read_active_maintenance(
+    *,
+    db: Session = Depends(get_db),
+    at: Optional[datetime] = None,
+    service_ids: Optional[List[int]] = Query(None),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the maintenance windows in progress now, or at `at`, optionally only
+    those affecting any of `service_ids`.
+    """
+    organization_id = get_user_organization_id(current_user)
+    tree = maintenance_index.get(db, organization_id)
+    return affecting(tree.at(at or datetime.now(timezone.utc)), service_ids)
+
+
+@router.get("/upcoming", response_model=List[MaintenanceWindow])
+def read_upcoming_maintenance(
+    *,
+    db: Session = Depends(get_db),
+    days: int = Query(7, ge=1, le=365),
+    service_ids: Optional[List[int]] = Query(None),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the maintenance windows starting in the next `days` days, optionally
+    only those affecting any of `service_ids`.
+    """
+    organization_id = get_user_organization_id(current_user)
+    tree = maintenance_index.get(db, organization_id)
+    now = datetime.now(timezone.utc)
+    return affecting(tree.starting(now, now + timedelta(days=days)), service_ids)
+
+
+@router.get("/overlaps", response_model=List[MaintenanceWindow])
+def read_overlapping_maintenance(
+    *,
+    db: Session = Depends(get_db),
+    start: datetime,
+    end: Optional[datetime] = None,
+    service_ids: Optional[List[int]] = Query(None),
+    exclude_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the maintenance windows overlapping [start, end), to detect conflicts
+    before scheduling a maintenance. Leave out `end` for a window without a
+    scheduled end, and pass the ID of a maintenance being rescheduled as
+    `exclude_id` to leave it out.
+    """
+    if end is not None and end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+
+    organization_id = get_user_organization_id(current_user)
+    tree = maintenance_index.get(db, organization_id)
+    windows = affecting(tree.overlapping(start, end or FOREVER), service_ids)
+    return [window for window in windows if window.id != exclude_id]
@@ -5,13 +5,22 @@ from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_current_active_user, get_current_active_superuser
 from app.db.session import get_db
-from app.schemas.organization import Organization, OrganizationCreate, OrganizationUpdate
+from app.schemas.organization import (
+    Organization,
+    OrganizationCreate,
+    OrganizationUpdate,
+    ViewerToken,
+    ViewerTokenCreate,
+)
 from app.services.organization import (
     get_organization_by_id,
     get_organizations,
     create_organization,
     update_organization,
     delete_organization,
+    issue_viewer_token,
+    rotate_viewer_key,
+    verify_custom_domain,
 )
 from app.schemas.user import User
 
@@ -108,6 +117,95 @@ def update_organization_details(
     return organization
 
 
+@router.post("/{organization_id}/custom-domain/verify", response_model=Organization)
+def verify_organization_custom_domain(
+    *,
+    db: Session = Depends(get_db),
+    organization_id: int,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Verify the organization's custom domain, after publishing its
+    custom_domain_token as a TXT record named
+    `<CUSTOM_DOMAIN_TXT_PREFIX>.<custom_domain>`. The domain serves the public
+    status page once verified.
+    """
+    organization = get_organization_by_id(db, id=organization_id)
+    if not organization:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+    # Users can only verify the domain of their own organization unless they're superusers
+    if not current_user.is_superuser and current_user.organization_id != organization.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions",
+        )
+    try:
+        organization = verify_custom_domain(db, db_obj=organization)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return organization
+
+
+@router.post("/{organization_id}/viewer-tokens", response_model=ViewerToken)
+def create_organization_viewer_token(
+    *,
+    db: Session = Depends(get_db),
+    organization_id: int,
+    token_in: ViewerTokenCreate = ViewerTokenCreate(),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Issue a viewer token for the organization's private status page. Pass it
+    as the X-Viewer-Token header, the viewer_token cookie or the viewer_token
+    query parameter.
+    """
+    organization = get_organization_by_id(db, id=organization_id)
+    if not organization:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+    # Users can only issue tokens for their own organization unless they're superusers
+    if not current_user.is_superuser and current_user.organization_id != organization.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions",
+        )
+    token, expires_at = issue_viewer_token(
+        db, db_obj=organization, expires_in_minutes=token_in.expires_in_minutes
+    )
+    return ViewerToken(token=token, expires_at=expires_at)
+
+
+@router.post("/{organization_id}/viewer-key/rotate", response_model=Organization)
+def rotate_organization_viewer_key(
+    *,
+    db: Session = Depends(get_db),
+    organization_id: int,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Rotate the organization's viewer key, revoking every viewer token issued so far.
+    """
+    organization = get_organization_by_id(db, id=organization_id)
+    if not organization:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+    # Users can only rotate the key of their own organization unless they're superusers
+    if not current_user.is_superuser and current_user.organization_id != organization.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions",
+        )
+    organization = rotate_viewer_key(db, db_obj=organization)
+    return organization
+
+
 @router.delete("/{organization_id}", response_model=Organization)
 def delete_organization_by_id(
     *,
@@ -1,144 +1,412 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
-from app.schemas.service import Service
-from app.schemas.incident import IncidentPublic, IncidentWithUpdatesPublic
-from app.services.service import get_services_by_organization_slug
+from app.api.response_cache import CachedResponseRoute
+from app.db.session import get_public_db
+from app.schemas.service import Service, ServiceUptime
+from app.schemas.incident import IncidentPublic, IncidentWithUpdatesPublic, MaintenanceWindow
+from app.services.service import get_services_by_organization
 from app.services.incident import (
-    get_active_incidents_by_organization_slug,
     get_incident_by_id_public,
-    get_recent_incidents_by_organization_slug,
+    get_recent_incidents_by_organization,
 )
-from app.services.organization import get_organization_by_slug
+from app.core.config import settings
+from app.services.calendars import calendar_cache
+from app.services.changes import get_changes_since
+from app.services.feeds import FEED_FORMATS, feed_cache
+from app.services.maintenance import affecting, maintenance_index
+from app.services.resolver import organization_resolver
+from app.schemas.status import StatusBatch, StatusBatchRequest, StatusBundle, StatusChanges
+from app.services.status import build_status_bundle, get_status_batch, get_status_snapshot
+from app.services.uptime import get_uptime_by_organization
+from app.utils.badges import BADGE_FORMATS, badge_response
+from app.utils.fieldsets import fieldset_response, parse_fields
 
-router = APIRouter()
+router = APIRouter(route_class=CachedResponseRoute)
+
+
+@router.post("/status/batch", response_model=StatusBatch)
+def get_organization_statuses(
+    *,
+    db: Session = Depends(get_public_db),
+    batch_in: StatusBatchRequest,
+) -> Any:
+    """
+    Get the overall status and active incident count of many organizations.
+    """
+    if len(batch_in.slugs) > settings.STATUS_BATCH_MAX_SLUGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.STATUS_BATCH_MAX_SLUGS} slugs per request",
+        )
+    
+    return get_status_batch(db, slugs=batch_in.slugs)
 
 
 @router.get("/{org_slug}/status", response_model=dict)
 def get_organization_status(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_public_db),
     org_slug: str,
 ) -> Any:
     """
     Get the overall status for an organization.
     """
-    organization = get_organization_by_slug(db, slug=org_slug)
-    if not organization:
+    snapshot = get_status_snapshot(db, org_slug=org_slug)
+    if not snapshot:
         raise HTTPException(
             status_code=404,
             detail="Organization not found",
         )
     
-    # Get all services for this organization
-    services = get_services_by_organization_slug(db, org_slug=org_slug)
-    
-    # Get active incidents
-    active_incidents = get_active_incidents_by_organization_slug(db, org_slug=org_slug)
-    
-    # Determine overall status based on services
-    status = "operational"
-    
-    # Iterate through services to find the most severe status
-    for service in services:
-        if service.status == "major_outage":
-            status = "major_outage"
-            break
-        elif service.status == "partial_outage" and status != "major_outage":
-            status = "partial_outage"
-        elif service.status == "degraded_performance" and status not in ["major_outage", "partial_outage"]:
-            status = "degraded_performance"
-        elif service.status == "maintenance" and status == "operational":
-            status = "maintenance"
-    
     return {
-        "organization": {
-            "name": organization.name,
-            "slug": organization.slug,
-            "logo_url": organization.logo_url,
-            "website": organization.website,
-        },
-        "status": status,
-        "active_incidents_count": len(active_incidents),
+        "organization": snapshot["organization"],
+        "status": snapshot["status"],
+        "active_incidents_count": snapshot["active_incidents_count"],
     }
 
 
+@router.get("/{org_slug}/bundle", response_model=StatusBundle)
+def get_status_bundle(
+    *,
+    db: Session = Depends(get_public_db),
+    org_slug: str,
+    recent_limit: int = 10,
+) -> Any:
+    """
+    Get the organization, overall status, services, active incidents and
+    recent incidents in a single response.
+    """
+    bundle = build_status_bundle(db, org_slug=org_slug, recent_limit=recent_limit)
+    if not bundle:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+    
+    return bundle
+
+
 @router.get("/{org_slug}/services", response_model=List[Service])
 def get_services(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_public_db),
     org_slug: str,
+    fields: Optional[str] = None,
 ) -> Any:
     """
-    Get all services for a specific organization by slug.
+    Get all services for a specific organization by slug, optionally with
+    only a comma separated list of `fields`.
     """
-    organization = get_organization_by_slug(db, slug=org_slug)
+    try:
+        selected = parse_fields(fields, Service)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    organization = organization_resolver.resolve(db, slug=org_slug)
     if not organization:
         raise HTTPException(
             status_code=404,
             detail="Organization not found",
         )
     
-    services = get_services_by_organization_slug(db, org_slug=org_slug)
+    services = get_services_by_organization(
+        db, organization_id=organization.id, fields=selected
+    )
+    if selected:
+        return fieldset_response(services, Service, selected)
     return services
 
 
+@router.get("/{org_slug}/uptime", response_model=List[ServiceUptime])
+def get_services_uptime(
+    *,
+    db: Session = Depends(get_public_db),
+    org_slug: str,
+    days: int = Query(90, ge=1, le=365),
+) -> Any:
+    """
+    Get per-day uptime bars for all services of an organization.
+    """
+    organization = organization_resolver.resolve(db, slug=org_slug)
+    if not organization:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+    
+    return get_uptime_by_organization(db, organization_id=organization.id, days=days)
+
+
+@router.get("/{org_slug}/changes", response_model=StatusChanges)
+def get_changes(
+    *,
+    db: Session = Depends(get_public_db),
+    org_slug: str,
+    since: Optional[int] = Query(None, ge=0),
+) -> Any:
+    """
+    Get the services, incidents and public updates created, changed or
+    deleted since the version a client last saw. Without `since`, or when
+    the changes since then are no longer known, `resync_required` is set:
+    reload everything, then poll from the returned version. Deleting an
+    incident also deletes its updates.
+    """
+    organization = organization_resolver.resolve(db, slug=org_slug)
+    if not organization:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+    
+    return get_changes_since(db, organization_id=organization.id, since=since)
+
+
+@router.get("/{org_slug}/feed.{feed_format}", response_class=Response)
+def get_incident_feed(
+    *,
+    db: Session = Depends(get_public_db),
+    org_slug: str,
+    feed_format: str,
+) -> Any:
+    """
+    Get the RSS or Atom feed of recent incidents and their public updates.
+    """
+    organization = organization_resolver.resolve(db, slug=org_slug)
+    if not organization or feed_format not in FEED_FORMATS:
+        raise HTTPException(
+            status_code=404,
+            detail="Feed not found",
+        )
+    
+    feed = feed_cache.get(db, organization.id, feed_format)
+    if feed is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Feed not found",
+        )
+    
+    return Response(
+        content=feed,
+        media_type=f"application/{feed_format}+xml",
+        headers={"Cache-Control": "public, max-age=60"},
+    )
+
+
+def _calendar_response(calendar: Optional[bytes]) -> Response:
+    if calendar is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Calendar not found",
+        )
+    
+    return Response(
+        content=calendar,
+        media_type="text/calendar; charset=utf-8",
+        headers={"Cache-Control": "public, max-age=300"},
+    )
+
+
+@router.get("/{org_slug}/maintenance.ics", response_class=Response)
+def get_maintenance_calendar(
+    *,
+    db: Session = Depends(get_public_db),
+    org_slug: str,
+) -> Any:
+    """
+    Get the iCalendar feed of an organization's scheduled maintenance windows.
+    """
+    organization = organization_resolver.resolve(db, slug=org_slug)
+    if not organization:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+    
+    return _calendar_response(calendar_cache.get(db, organization.id, None))
+
+
+@router.get("/{org_slug}/services/{service_id}/maintenance.ics", response_class=Response)
+def get_service_maintenance_calendar(
+    *,
+    db: Session = Depends(get_public_db),
+    org_slug: str,
+    service_id: int,
+) -> Any:
+    """
+    Get the iCalendar feed of the scheduled maintenance windows of a service.
+    """
+    organization = organization_resolver.resolve(db, slug=org_slug)
+    if not organization:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+    
+    return _calendar_response(calendar_cache.get(db, organization.id, service_id))
+
+
+@router.get("/{org_slug}/maintenance/active", response_model=List[MaintenanceWindow])
+def get_active_maintenance(
+    *,
+    db: Session = Depends(get_public_db),
+    org_slug: str,
+    service_ids: Optional[List[int]] = Query(None),
+) -> Any:
+    """
+    Get the maintenance windows in progress, optionally only those affecting
+    any of `service_ids`.
+    """
+    organization = organization_resolver.resolve(db, slug=org_slug)
+    if not organization:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+    
+    tree = maintenance_index.get(db, organization.id)
+    return affecting(tree.at(datetime.now(timezone.utc)), service_ids)
+
+
+@router.get("/{org_slug}/maintenance/upcoming", response_model=List[MaintenanceWindow])
+def get_upcoming_maintenance(
+    *,
+    db: Session = Depends(get_public_db),
+    org_slug: str,
+    days: int = Query(7, ge=1, le=365),
+    service_ids: Optional[List[int]] = Query(None),
+) -> Any:
+    """
+    Get the maintenance windows starting in the next `days` days, optionally
+    only those affecting any of `service_ids`.
+    """
+    organization = organization_resolver.resolve(db, slug=org_slug)
+    if not organization:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+    
+    tree = maintenance_index.get(db, organization.id)
+    now = datetime.now(timezone.utc)
+    return affecting(tree.starting(now, now + timedelta(days=days)), service_ids)
+
+
+@router.get("/{org_slug}/badge.{badge_format}", response_class=Response)
+def get_organization_badge(
+    *,
+    db: Session = Depends(get_public_db),
+    org_slug: str,
+    badge_format: str,
+) -> Any:
+    """
+    Get a status badge for an organization as SVG or shields.io endpoint JSON.
+    """
+    snapshot = get_status_snapshot(db, org_slug=org_slug)
+    if not snapshot or badge_format not in BADGE_FORMATS:
+        raise HTTPException(
+            status_code=404,
+            detail="Badge not found",
+        )
+    
+    return badge_response(snapshot["organization"]["name"], snapshot["status"], badge_format)
+
+
+@router.get("/{org_slug}/services/{service_id}/badge.{badge_format}", response_class=Response)
+def get_service_badge(
+    *,
+    db: Session = Depends(get_public_db),
+    org_slug: str,
+    service_id: int,
+    badge_format: str,
+) -> Any:
+    """
+    Get a status badge for a service as SVG or shields.io endpoint JSON.
+    """
+    snapshot = get_status_snapshot(db, org_slug=org_slug)
+    service = snapshot["services"].get(service_id) if snapshot else None
+    if not service or badge_format not in BADGE_FORMATS:
+        raise HTTPException(
+            status_code=404,
+            detail="Badge not found",
+        )
+    
+    return badge_response(service["name"], service["status"], badge_format)
+
+
 @router.get("/{org_slug}/incidents/active", response_model=List[IncidentPublic])
 def get_active_incidents(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_public_db),
     org_slug: str,
+    fields: Optional[str] = None,
 ) -> Any:
     """
-    Get all active incidents for a specific organization by slug.
+    Get all active incidents for a specific organization by slug, optionally
+    with only a comma separated list of `fields`.
     """
-    organization = get_organization_by_slug(db, slug=org_slug)
-    if not organization:
+    try:
+        selected = parse_fields(fields, IncidentPublic)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    snapshot = get_status_snapshot(db, org_slug=org_slug)
+    if not snapshot:
         raise HTTPException(
             status_code=404,
             detail="Organization not found",
         )
     
-    incidents = get_active_incidents_by_organization_slug(db, org_slug=org_slug)
-    return incidents
+    if selected:
+        return fieldset_response(snapshot["active_incidents"], IncidentPublic, selected)
+    return snapshot["active_incidents"]
 
 
 @router.get("/{org_slug}/incidents/recent", response_model=List[IncidentPublic])
 def get_recent_incidents(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_public_db),
     org_slug: str,
     limit: int = 10,
+    fields: Optional[str] = None,
 ) -> Any:
     """
-    Get recent incidents for a specific organization by slug.
+    Get recent incidents for a specific organization by slug, optionally with
+    only a comma separated list of `fields`.
     """
-    organization = get_organization_by_slug(db, slug=org_slug)
+    try:
+        selected = parse_fields(fields, IncidentPublic)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    organization = organization_resolver.resolve(db, slug=org_slug)
     if not organization:
         raise HTTPException(
             status_code=404,
             detail="Organization not found",
         )
     
-    incidents = get_recent_incidents_by_organization_slug(
-        db, org_slug=org_slug, limit=limit
+    incidents = get_recent_incidents_by_organization(
+        db, organization_id=organization.id, limit=limit, fields=selected
     )
+    if selected:
+        return fieldset_response(incidents, IncidentPublic, selected)
     return incidents
 
 
 @router.get("/{org_slug}/incidents/{incident_id}", response_model=IncidentWithUpdatesPublic)
 def get_incident_details(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_public_db),
     org_slug: str,
     incident_id: int,
 ) -> Any:
     """
     Get details for a specific incident.
     """
-    organization = get_organization_by_slug(db, slug=org_slug)
+    organization = organization_resolver.resolve(db, slug=org_slug)
     if not organization:
         raise HTTPException(
             status_code=404,
@@ -1,11 +1,19 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
+from app.api.etag import VersionedRoute
 from app.api.dependencies import get_current_active_user, get_user_organization_id
 from app.db.session import get_db
-from app.schemas.service import Service, ServiceCreate, ServiceUpdate, ServiceStatusUpdate
+from app.schemas.service import (
+    Service,
+    ServiceCreate,
+    ServiceUpdate,
+    ServiceStatusUpdate,
+    ServiceStatusChange,
+    ServiceUptime,
+)
 from app.services.service import (
     get_service_by_id,
     get_services_by_organization,
@@ -14,26 +22,49 @@ from app.services.service import (
     update_service_status,
     delete_service,
 )
+from app.services.uptime import get_status_history, get_uptime_by_organization
 from app.schemas.user import User
+from app.utils.fieldsets import fieldset_response, parse_fields
+from app.utils.pagination import decode_cursor, paginate, set_pagination_headers
 from app.websockets.manager import manager
 
-router = APIRouter()
+router = APIRouter(route_class=VersionedRoute)
 
 
 @router.get("/", response_model=List[Service])
 def read_services(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Retrieve services for the current user's organization.
+    Retrieve services for the current user's organization. Pass the
+    X-Next-Cursor header of a response as `cursor` to get the next page, and a
+    comma separated list of fields as `fields` to return only those.
     """
     organization_id = get_user_organization_id(current_user)
+    try:
+        after = decode_cursor(cursor, int)[0] if cursor else None
+        selected = parse_fields(fields, Service)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     services = get_services_by_organization(
-        db, organization_id=organization_id, skip=skip, limit=limit
+        db, organization_id=organization_id, skip=skip, limit=limit + 1, after=after,
+        fields=selected,
     )
+    services, next_cursor = paginate(
+        services, limit=limit, key=lambda service: (service.id,)
+    )
+    if selected:
+        response = fieldset_response(services, Service, selected)
+        set_pagination_headers(response, next_cursor)
+        return response
+    set_pagination_headers(response, next_cursor)
     return services
 
 
@@ -70,6 +101,19 @@ def create_new_service(
     return service
 
 
+@router.get("/uptime", response_model=List[ServiceUptime])
+def read_services_uptime(
+    db: Session = Depends(get_db),
+    days: int = Query(90, ge=1, le=365),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get per-day uptime of every service in the current user's organization.
+    """
+    organization_id = get_user_organization_id(current_user)
+    return get_uptime_by_organization(db, organization_id=organization_id, days=days)
+
+
 @router.get("/{service_id}", response_model=Service)
 def read_service(
     *,
@@ -202,6 +246,37 @@ def update_status(
     return service
 
 
+@router.get("/{service_id}/history", response_model=List[ServiceStatusChange])
+def read_service_history(
+    *,
+    db: Session = Depends(get_db),
+    service_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the status history of a service, newest first.
+    """
+    organization_id = get_user_organization_id(current_user)
+    service = get_service_by_id(db, id=service_id)
+    
+    if not service:
+        raise HTTPException(
+            status_code=404,
+            detail="Service not found",
+        )
+    
+    # Check if service belongs to user's organization
+    if service.organization_id != organization_id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions",
+        )
+    
+    return get_status_history(db, service_id=service_id, skip=skip, limit=limit)
+
+
 @router.delete("/{service_id}", response_model=Service)
 def delete_service_by_id(
     *,
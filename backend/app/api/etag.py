@@ -0,0 +1,102 @@
+import hashlib
+from typing import Callable, Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+
+# Headers a 304 repeats from the response it stands for
+NOT_MODIFIED_HEADERS = ("cache-control", "vary", "surrogate-key", "surrogate-control", "cache-tag")
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Build the strong ETag of a response body. It depends on the content alone,
+    so every worker tags the same content alike, and content that changes
+    with time rather than writes, like uptime, gets a new tag when it does.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def _opaque(tag: str) -> str:
+    """
+    Strip the weak prefix and the content coding suffix, which identify the
+    representation rather than the content.
+    """
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for encoding in ("br", "gzip"):
+        if tag.endswith(f"-{encoding}"):
+            return tag[: -len(encoding) - 1]
+    return tag
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """
+    Get the tag from If-None-Match that matches `etag`, if any.
+    """
+    if not if_none_match:
+        return None
+    current = _opaque(etag)
+    for tag in if_none_match.split(","):
+        if _opaque(tag) == current:
+            return tag.strip()
+    return None
+
+
+def with_encoding(etag: str, encoding: Optional[str]) -> str:
+    """
+    Get the tag of the `encoding` representation, so it stays a strong ETag.
+    """
+    if not encoding or encoding == "identity":
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+class VersionedRoute(APIRoute):
+    """
+    Route class that tags successful GET responses with a strong ETag of their
+    body and answers a matching If-None-Match with 304 and no body.
+
+    The endpoint and its dependencies run for every request, so a 304 is only
+    sent to a client that may still see the content, and saves the transfer
+    rather than the work. Public routes replay rendered bodies from the
+    response cache, where the tag is computed once per render.
+    """
+
+    async def respond(self, request: Request, handler: Callable) -> Response:
+        return await handler(request)
+
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if request.method != "GET":
+                return await original_route_handler(request)
+
+            response = await self.respond(request, original_route_handler)
+            if response.status_code != 200:
+                return response
+            etag = response.headers.get("etag")
+            if etag is None:
+                body = getattr(response, "body", None)
+                if body is None:
+                    # Streamed, so there is nothing to hash up front
+                    return response
+                etag = with_encoding(make_etag(body), response.headers.get("content-encoding"))
+                response.headers["ETag"] = etag
+
+            matched = matching_etag(request.headers.get("if-none-match"), etag)
+            if matched is None:
+                return response
+            headers = {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() in NOT_MODIFIED_HEADERS
+            }
+            headers["ETag"] = matched
+            return Response(status_code=304, headers=headers)
+
+        return route_handler
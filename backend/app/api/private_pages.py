@@ -0,0 +1,48 @@
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.requests import HTTPConnection
+
+from app.core.security import verify_viewer_token
+from app.services.resolver import ResolvedOrganization
+
+
+VIEWER_TOKEN_PARAM = "viewer_token"
+VIEWER_TOKEN_HEADER = "x-viewer-token"
+
+
+def viewer_token(connection: HTTPConnection) -> Optional[str]:
+    """
+    Get the viewer token of a request or websocket: the X-Viewer-Token header,
+    the viewer_token cookie, or the viewer_token query parameter for clients
+    that can set neither, like calendar apps, feed readers and browsers
+    opening a websocket.
+    """
+    return (
+        connection.headers.get(VIEWER_TOKEN_HEADER)
+        or connection.cookies.get(VIEWER_TOKEN_PARAM)
+        or connection.query_params.get(VIEWER_TOKEN_PARAM)
+    )
+
+
+def can_view(organization: ResolvedOrganization, connection: HTTPConnection) -> bool:
+    """
+    Check whether a request or websocket may see an organization's pages,
+    using only the cached organization and no queries.
+    """
+    if not organization.is_private:
+        return True
+    return verify_viewer_token(viewer_token(connection), organization.id, organization.viewer_key)
+
+
+def cache_query(connection: HTTPConnection) -> str:
+    """
+    Get the query string identifying a cached response, without any viewer
+    token, so that all viewers of a private page share the same entries.
+    """
+    query = connection.url.query
+    if VIEWER_TOKEN_PARAM not in query:
+        return query
+    return urlencode(
+        [(name, value) for name, value in parse_qsl(query, keep_blank_values=True) if name != VIEWER_TOKEN_PARAM]
+    )
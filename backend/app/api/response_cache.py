@@ -0,0 +1,329 @@
+import gzip
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.etag import VersionedRoute, make_etag, with_encoding
+from app.api.private_pages import cache_query, can_view
+from app.cdn.keys import set_surrogate_headers, surrogate_keys
+from app.core.config import settings
+from app.db.circuit import DATABASE_ERRORS, CircuitOpenError, public_database
+from app.services.resolver import organization_resolver, resolve_organization
+from app.services.shared_snapshots import shared_snapshots
+from app.services.versions import content_versions
+from app.utils.singleflight import SingleFlight
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+# Encodings we can serve, in order of preference
+SUPPORTED_ENCODINGS = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def parse_accept_encoding(header: Optional[str]) -> List[str]:
+    """
+    Get the supported encodings a client accepts, best first.
+    """
+    if not header:
+        return []
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    return [
+        encoding
+        for encoding in SUPPORTED_ENCODINGS
+        if accepted.get(encoding, wildcard) > 0
+    ]
+
+
+class CachedResponse:
+    """
+    A rendered response body together with its precompressed variants.
+    """
+
+    __slots__ = (
+        "organization_id", "version", "created_at", "status_code", "media_type", "headers", "bodies",
+        "etag",
+    )
+
+    def __init__(
+        self,
+        *,
+        organization_id: int,
+        version: int,
+        status_code: int,
+        media_type: Optional[str],
+        headers: Dict[str, str],
+        body: bytes,
+        previous: Optional["CachedResponse"] = None,
+    ):
+        self.organization_id = organization_id
+        self.version = version
+        self.created_at = time.monotonic()
+        self.status_code = status_code
+        self.media_type = media_type
+        self.headers = headers
+        self.etag = make_etag(body)
+        if previous is not None and previous.bodies["identity"] == body:
+            # Most version bumps leave a given URL unchanged, so keep the
+            # variants already compressed for it
+            self.bodies = previous.bodies
+            return
+        self.bodies: Dict[str, bytes] = {"identity": body}
+        if len(body) >= settings.PUBLIC_COMPRESSION_MIN_SIZE:
+            self.bodies["gzip"] = gzip.compress(body, compresslevel=settings.PUBLIC_GZIP_LEVEL)
+            if brotli is not None:
+                self.bodies["br"] = brotli.compress(body, quality=settings.PUBLIC_BROTLI_QUALITY)
+
+    @property
+    def expires_at(self) -> float:
+        return self.created_at + settings.STATUS_CACHE_TTL_SECONDS
+
+    def to_response(self, accept_encoding: Optional[str], *, stale: bool = False) -> Response:
+        encoding = next(
+            (encoding for encoding in parse_accept_encoding(accept_encoding) if encoding in self.bodies),
+            "identity",
+        )
+        headers = dict(self.headers)
+        if stale:
+            # Last known good content served while the database is unavailable
+            headers["Cache-Control"] = (
+                f"public, max-age=0, "
+                f"stale-while-revalidate={settings.STALE_WHILE_REVALIDATE_SECONDS}, "
+                f"stale-if-error={settings.STALE_WHILE_REVALIDATE_SECONDS}"
+            )
+            headers["Age"] = str(int(time.monotonic() - self.created_at))
+            headers["X-Status-Stale"] = "true"
+        headers["Vary"] = "Accept-Encoding"
+        headers["ETag"] = with_encoding(self.etag, encoding)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(
+            content=self.bodies[encoding],
+            status_code=self.status_code,
+            media_type=self.media_type,
+            headers=headers,
+        )
+
+
+class ResponseCache:
+    """
+    Bounded LRU of public responses keyed by URL. An entry is only served while
+    the content version of its organization is unchanged. Versions are local to
+    the process, so entries also expire after STATUS_CACHE_TTL_SECONDS to pick
+    up writes handled by other workers.
+
+    Outdated entries are kept until replaced or evicted, as the last known good
+    response to fall back on while the database is unavailable.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str], organization_id: int) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if (
+                entry.organization_id != organization_id
+                or entry.version != content_versions.get(organization_id)
+                or entry.expires_at <= time.monotonic()
+            ):
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def get_stale(self, key: Tuple[str, str]) -> Optional[CachedResponse]:
+        """
+        Get the last response stored for a URL, however old.
+        """
+        return self._entries.get(key)
+
+    def set(self, key: Tuple[str, str], entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(max_entries=settings.PUBLIC_RESPONSE_CACHE_SIZE)
+
+# In-flight public reads keyed by (organization_id, URL path, query)
+public_reads = SingleFlight()
+
+
+def public_read_key(request: Request, organization_id: int) -> Tuple[int, str, str]:
+    """
+    Get the single-flight key of a public read. It is the key the response is
+    cached under, so that only requests for the same URL share a render.
+    """
+    return (organization_id, request.url.path, cache_query(request))
+
+
+class CachedResponseRoute(VersionedRoute):
+    """
+    Route class for public GET routes under `/{org_slug}/...`. Successful
+    responses are stored with gzip and brotli variants and replayed in the
+    encoding the client prefers until the organization's content changes.
+
+    Requests go through the public database circuit breaker. When the database
+    fails or the circuit is open, the last known good response is served,
+    marked stale, instead of an error.
+
+    Pages of private organizations need a valid viewer token, which is checked
+    before anything else, including the cache.
+    """
+
+    def get_route_handler(self) -> Callable:
+        versioned_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if request.method != "GET":
+                await self.authorize(request)
+                return await versioned_route_handler(request)
+            try:
+                return await public_database.call(
+                    lambda: self._authorized(request, versioned_route_handler)
+                )
+            except (CircuitOpenError,) + DATABASE_ERRORS:
+                entry = response_cache.get_stale((request.url.path, cache_query(request)))
+                # Without the organization there is no telling who may see it
+                authorized = getattr(request.state, "authorized", False) or (
+                    await self.authorize(request, cached_only=True)
+                )
+                if entry is None or entry.status_code != 200 or not authorized:
+                    raise HTTPException(
+                        status_code=503,
+                        detail="Status temporarily unavailable",
+                        headers={"Retry-After": str(settings.PUBLIC_DB_RESET_SECONDS)},
+                    )
+                return entry.to_response(
+                    request.headers.get("accept-encoding"), stale=True
+                )
+
+        return route_handler
+
+    async def _authorized(self, request: Request, handler: Callable) -> Response:
+        await self.authorize(request)
+        return await handler(request)
+
+    async def authorize(self, request: Request, *, cached_only: bool = False) -> bool:
+        """
+        Reject requests for a private organization's pages without a valid
+        viewer token. The organization comes from the resolver cache and the
+        token is checked in memory, so gated pages cost no more than public
+        ones. With `cached_only`, an organization missing from the cache is
+        not looked up and the request is not authorized.
+        """
+        slug = request.path_params.get("org_slug")
+        if slug is not None:
+            hit, organization = organization_resolver.cached(slug)
+            if not hit:
+                if cached_only:
+                    return False
+                organization = await run_in_threadpool(resolve_organization, slug)
+            if organization is not None and not can_view(organization, request):
+                raise HTTPException(status_code=401, detail="Viewer token required")
+            request.state.private = organization is not None and organization.is_private
+        request.state.authorized = True
+        return True
+
+    async def organization_id(self, request: Request) -> Optional[int]:
+        slug = request.path_params.get("org_slug")
+        if slug is None:
+            return None
+        if settings.SHARED_SNAPSHOTS_ENABLED:
+            stored = shared_snapshots.get(slug)
+            if stored is not None:
+                return stored[0]
+        organization = await run_in_threadpool(resolve_organization, slug)
+        return organization.id if organization else None
+
+    async def respond(self, request: Request, handler: Callable) -> Response:
+        organization_id = await self.organization_id(request)
+        if organization_id is None:
+            return await handler(request)
+        response = await self._respond(request, handler, organization_id)
+        if getattr(request.state, "private", False):
+            # Keep private pages out of the CDN and other shared caches
+            response.headers["Cache-Control"] = "private, no-cache"
+        elif response.status_code == 200:
+            set_surrogate_headers(
+                response, surrogate_keys(self.path, organization_id, request.path_params)
+            )
+        return response
+
+    async def _respond(
+        self, request: Request, handler: Callable, organization_id: int
+    ) -> Response:
+        key = (request.url.path, cache_query(request))
+        accept_encoding = request.headers.get("accept-encoding")
+        entry = response_cache.get(key, organization_id)
+        if entry is not None:
+            return entry.to_response(accept_encoding)
+
+        # Concurrent misses for the same URL share one computation, so a
+        # burst of visitors costs one set of queries
+        (entry, response), shared = await public_reads.do(
+            public_read_key(request, organization_id), lambda: self._render(request, handler, organization_id)
+        )
+        if entry is not None:
+            return entry.to_response(accept_encoding)
+        if shared:
+            # Responses without a body cannot be replayed to other callers
+            return await handler(request)
+        return response
+
+    async def _render(
+        self, request: Request, handler: Callable, organization_id: int
+    ) -> Tuple[Optional[CachedResponse], Response]:
+        # Read the version before the handler queries anything, so a write
+        # racing with the handler can only make the entry look older
+        version = content_versions.get(organization_id)
+        response = await handler(request)
+        if not hasattr(response, "body"):
+            return None, response
+
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in ("content-length", "content-type", "content-encoding", "vary", "etag")
+        }
+        key = (request.url.path, cache_query(request))
+        entry = await run_in_threadpool(
+            CachedResponse,
+            organization_id=organization_id,
+            version=version,
+            status_code=response.status_code,
+            media_type=response.media_type,
+            headers=headers,
+            body=response.body,
+            previous=response_cache.get_stale(key),
+        )
+        if response.status_code == 200:
+            response_cache.set(key, entry)
+        return entry, response
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import auth, services, incidents, organizations, public
+from app.api.endpoints import auth, services, incidents, maintenance, organizations, public
 
 api_router = APIRouter()
 
@@ -18,6 +18,11 @@ api_router.include_router(services.router, prefix="/services", tags=["services"]
 # Incident routes
 api_router.include_router(incidents.router, prefix="/incidents", tags=["incidents"])
 
+# Scheduled maintenance routes
+api_router.include_router(
+    maintenance.router, prefix="/maintenance", tags=["maintenance"]
+)
+
 # Public routes - these don't require authentication
 public_router = APIRouter()
 public_router.include_router(public.router, tags=["public"])
\ No newline at end of file
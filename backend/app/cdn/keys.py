@@ -0,0 +1,84 @@
+from typing import Any, Dict, List
+
+from fastapi import Response
+
+from app.core.config import settings
+
+
+# Which parts of an organization's data each public view is built from.
+# Views about a single service or incident are keyed by that entity instead,
+# plus any scopes listed here. Routes are given by their path after the
+# organization slug.
+SERVICES = "services"
+INCIDENTS = "incidents"
+ROUTE_SCOPES = {
+    "/services": (SERVICES,),
+    "/uptime": (SERVICES,),
+    "/incidents/active": (INCIDENTS,),
+    "/incidents/recent": (INCIDENTS,),
+    "/feed.{feed_format}": (INCIDENTS,),
+    # Calendars name the services each maintenance affects
+    "/maintenance.ics": (INCIDENTS, SERVICES),
+    "/maintenance/active": (INCIDENTS,),
+    "/maintenance/upcoming": (INCIDENTS,),
+    "/services/{service_id}/maintenance.ics": (INCIDENTS, SERVICES),
+}
+
+
+def organization_key(organization_id: int) -> str:
+    return f"org-{organization_id}"
+
+
+def scope_key(organization_id: int, scope: str) -> str:
+    return f"org-{organization_id}-{scope}"
+
+
+def service_key(service_id: Any) -> str:
+    return f"service-{service_id}"
+
+
+def incident_key(incident_id: Any) -> str:
+    return f"incident-{incident_id}"
+
+
+def surrogate_keys(route_path: str, organization_id: int, path_params: Dict[str, Any]) -> List[str]:
+    """
+    Get the surrogate keys of a public response.
+
+    Every response carries its organization's key. Single service and
+    incident views carry that entity's key; views over the organization carry
+    a key per kind of data they show, so that e.g. an incident change does
+    not purge the service list.
+    """
+    keys = [organization_key(organization_id)]
+    scopes = ROUTE_SCOPES.get(route_path.partition("{org_slug}")[2])
+    if "incident_id" in path_params:
+        keys.append(incident_key(path_params["incident_id"]))
+    elif "service_id" in path_params:
+        keys.append(service_key(path_params["service_id"]))
+    elif scopes is None:
+        scopes = (SERVICES, INCIDENTS)
+    keys.extend(scope_key(organization_id, scope) for scope in scopes or ())
+    return keys
+
+
+def purge_keys(organization_id: int, entity: str, entity_id: int) -> List[str]:
+    """
+    Get the surrogate keys to purge after a write, mirroring surrogate_keys().
+    """
+    if entity == "service":
+        return [service_key(entity_id), scope_key(organization_id, SERVICES)]
+    if entity == "incident":
+        return [incident_key(entity_id), scope_key(organization_id, INCIDENTS)]
+    return [organization_key(organization_id)]
+
+
+def set_surrogate_headers(response: Response, keys: List[str]) -> None:
+    """
+    Tag a response for the CDN: Surrogate-Key for Fastly and Varnish style
+    caches, Cache-Tag for Cloudflare and Akamai style ones.
+    """
+    response.headers["Surrogate-Key"] = " ".join(keys)
+    response.headers["Cache-Tag"] = ",".join(keys)
+    if settings.CDN_SURROGATE_MAX_AGE:
+        response.headers["Surrogate-Control"] = f"max-age={settings.CDN_SURROGATE_MAX_AGE}"
@@ -0,0 +1,206 @@
+import abc
+import importlib
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+from tenacity import Retrying, stop_after_attempt, wait_exponential
+
+from app.cdn.keys import purge_keys
+from app.core.config import settings
+from app.core.events import OrganizationChange, on_organization_change
+
+
+logger = logging.getLogger(__name__)
+
+
+class PurgeBackend(abc.ABC):
+    """
+    Purges surrogate keys from a CDN. Subclasses implement purge() for one
+    batch of at most `max_batch` keys and raise on failure.
+    """
+
+    max_batch = 256
+
+    @abc.abstractmethod
+    def purge(self, keys: List[str]) -> None:
+        """
+        Purge one batch of surrogate keys.
+        """
+
+
+class HTTPPurgeBackend(PurgeBackend):
+    """
+    POSTs {"keys": [...]} to a URL, e.g. a purge relay or the local stand-in
+    from app.cdn.standin.
+    """
+
+    def __init__(self, url: str, token: str = ""):
+        self.url = url
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    def purge(self, keys: List[str]) -> None:
+        response = httpx.post(self.url, json={"keys": keys}, headers=self.headers, timeout=10)
+        response.raise_for_status()
+
+
+class FastlyPurgeBackend(PurgeBackend):
+    """
+    Batch surrogate key purge of a Fastly service.
+    """
+
+    def __init__(self, service_id: str, token: str):
+        self.url = f"https://api.fastly.com/service/{service_id}/purge"
+        self.headers = {"Fastly-Key": token}
+
+    def purge(self, keys: List[str]) -> None:
+        response = httpx.post(
+            self.url, json={"surrogate_keys": keys}, headers=self.headers, timeout=10
+        )
+        response.raise_for_status()
+
+
+class CloudflarePurgeBackend(PurgeBackend):
+    """
+    Cache-Tag purge of a Cloudflare zone.
+    """
+
+    max_batch = 30
+
+    def __init__(self, zone_id: str, token: str):
+        self.url = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/purge_cache"
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def purge(self, keys: List[str]) -> None:
+        response = httpx.post(self.url, json={"tags": keys}, headers=self.headers, timeout=10)
+        response.raise_for_status()
+
+
+def create_purge_backend(name: str) -> Optional[PurgeBackend]:
+    """
+    Create the backend configured by CDN_PURGE_BACKEND: "http", "fastly",
+    "cloudflare", or "package.module:Class" for a PurgeBackend subclass
+    taking no arguments. Empty disables purging.
+    """
+    if not name:
+        return None
+    if name == "http":
+        return HTTPPurgeBackend(settings.CDN_PURGE_URL, settings.CDN_PURGE_TOKEN)
+    if name == "fastly":
+        return FastlyPurgeBackend(settings.CDN_PURGE_SERVICE_ID, settings.CDN_PURGE_TOKEN)
+    if name == "cloudflare":
+        return CloudflarePurgeBackend(settings.CDN_PURGE_SERVICE_ID, settings.CDN_PURGE_TOKEN)
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class PurgeDispatcher:
+    """
+    Sends purges from a background thread, in batches and without duplicates.
+
+    Keys are collected for `batch_window` seconds so that a burst of writes
+    becomes one purge request per batch of keys, each key at most once. When
+    `repeat_after` is set every key is purged a second time after that many
+    seconds, once other worker processes have dropped their cached copies, so
+    the CDN cannot keep a stale response fetched from one of them.
+    """
+
+    def __init__(self, backend: Optional[PurgeBackend], batch_window: float, repeat_after: float):
+        self.backend = backend
+        self.batch_window = batch_window
+        self.repeat_after = repeat_after
+        # Map key -> when to purge it, and when to purge it again
+        self._due: Dict[str, float] = {}
+        self._repeat: Dict[str, float] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def schedule(self, keys: Iterable[str]) -> None:
+        if self.backend is None:
+            return
+        with self._condition:
+            due = time.monotonic() + self.batch_window
+            for key in keys:
+                self._due.setdefault(key, due)
+                if self.repeat_after:
+                    self._repeat[key] = due + self.repeat_after
+            self._ensure_worker()
+            self._condition.notify()
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="cdn-purger", daemon=True)
+            self._thread.start()
+
+    def _take_due(self, now: float) -> List[str]:
+        keys = [key for key, due in self._due.items() if due <= now]
+        for key in keys:
+            del self._due[key]
+        repeated = [key for key, due in self._repeat.items() if due <= now and key not in self._due]
+        for key in repeated:
+            del self._repeat[key]
+        return list(dict.fromkeys(keys + repeated))
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    if self._stopping:
+                        # Purge everything outstanding right away
+                        keys = list(dict.fromkeys(list(self._due) + list(self._repeat)))
+                        self._due.clear()
+                        self._repeat.clear()
+                        break
+                    keys = self._take_due(now)
+                    if keys:
+                        break
+                    pending = list(self._due.values()) + list(self._repeat.values())
+                    self._condition.wait(min(pending) - now if pending else None)
+                stopping = self._stopping
+            self._purge(keys)
+            if stopping:
+                return
+
+    def _purge(self, keys: List[str]) -> None:
+        size = self.backend.max_batch
+        for start in range(0, len(keys), size):
+            batch = keys[start:start + size]
+            try:
+                for attempt in Retrying(
+                    stop=stop_after_attempt(3),
+                    wait=wait_exponential(multiplier=0.5, max=5),
+                    reraise=True,
+                ):
+                    with attempt:
+                        self.backend.purge(batch)
+            except Exception:
+                logger.exception("Purging %s surrogate keys failed", len(batch))
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Send whatever is still pending and stop the worker thread.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+purge_dispatcher = PurgeDispatcher(
+    create_purge_backend(settings.CDN_PURGE_BACKEND),
+    batch_window=settings.CDN_PURGE_BATCH_SECONDS,
+    repeat_after=settings.CDN_PURGE_REPEAT_SECONDS,
+)
+
+
+@on_organization_change
+def _purge_changed_keys(change: OrganizationChange) -> None:
+    purge_dispatcher.schedule(
+        purge_keys(change.organization_id, change.entity, change.entity_id)
+    )
@@ -0,0 +1,115 @@
+import argparse
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+
+logger = logging.getLogger(__name__)
+
+
+class PurgeRecorder:
+    """
+    Purge batches received by the stand-in, in arrival order. `failures`
+    purges are answered with 503 first, to exercise retries.
+    """
+
+    def __init__(self):
+        self.batches: List[List[str]] = []
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def add(self, keys: List[str]) -> bool:
+        """
+        Record a batch, or return False if it is to fail.
+        """
+        with self._lock:
+            if self.failures > 0:
+                self.failures -= 1
+                return False
+            self.batches.append(keys)
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self.batches.clear()
+            self.failures = 0
+
+
+class PurgeHandler(BaseHTTPRequestHandler):
+    """
+    Accepts purges as sent by HTTPPurgeBackend on POST /purge, lists them on
+    GET /purges and forgets them on DELETE /purges.
+    """
+
+    recorder = PurgeRecorder()
+
+    def _reply(self, status: int, body: object) -> None:
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self) -> None:
+        if self.path != "/purge":
+            self._reply(404, {"detail": "Not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            keys = json.loads(self.rfile.read(length))["keys"]
+        except (ValueError, KeyError):
+            self._reply(400, {"detail": "Expected {\"keys\": [...]}"})
+            return
+        if not self.recorder.add(keys):
+            self._reply(503, {"detail": "Failing as asked"})
+            return
+        logger.info("Purged %s", " ".join(keys))
+        self._reply(200, {"purged": len(keys)})
+
+    def do_GET(self) -> None:
+        if self.path != "/purges":
+            self._reply(404, {"detail": "Not found"})
+            return
+        self._reply(200, self.recorder.batches)
+
+    def do_DELETE(self) -> None:
+        if self.path != "/purges":
+            self._reply(404, {"detail": "Not found"})
+            return
+        self.recorder.clear()
+        self._reply(200, [])
+
+    def log_message(self, format: str, *args) -> None:
+        # Purges are logged above; skip the per-request access log
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 8200) -> ThreadingHTTPServer:
+    """
+    Start the stand-in on a background thread and return its server. Port 0
+    picks a free port, found in `server.server_address`.
+    """
+    server = ThreadingHTTPServer((host, port), PurgeHandler)
+    threading.Thread(target=server.serve_forever, name="cdn-standin", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for a CDN purge API."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = ThreadingHTTPServer((args.host, args.port), PurgeHandler)
+    logger.info("Accepting purges on http://%s:%s/purge", args.host, args.port)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
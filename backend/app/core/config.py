@@ -7,6 +7,8 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Default lifetime of viewer tokens for private status pages
+    VIEWER_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30
     BACKEND_CORS_ORIGINS: List[str] = []
     FIRST_SUPERUSER_EMAIL: str = "poornacoc1234@gmail.com"  
     FIRST_SUPERUSER_PASSWORD: str = "admin"
@@ -28,6 +30,91 @@ class Settings(BaseSettings):
     DATABASE_POOL_TIMEOUT: int = 30
     DATABASE_ECHO: bool = False
 
+    # Public status page caching
+    STATUS_CACHE_TTL_SECONDS: int = 30
+    # Active incidents listed in a status snapshot, newest first
+    STATUS_SNAPSHOT_MAX_ACTIVE_INCIDENTS: int = 100
+    MAINTENANCE_INDEX_RESYNC_SECONDS: int = 300
+    PUBLIC_RESPONSE_CACHE_SIZE: int = 2048
+    PUBLIC_COMPRESSION_MIN_SIZE: int = 500
+    # Every cache fill compresses, so favour speed over the last few bytes
+    PUBLIC_GZIP_LEVEL: int = 6
+    PUBLIC_BROTLI_QUALITY: int = 5
+    CHANGE_JOURNAL_SIZE: int = 1000
+    # Journal writes of an organization between two prunings
+    CHANGE_JOURNAL_PRUNE_INTERVAL: int = 100
+    ORGANIZATION_RESOLVER_SIZE: int = 10000
+    ORGANIZATION_RESOLVER_TTL_SECONDS: int = 300
+    ORGANIZATION_RESOLVER_NEGATIVE_TTL_SECONDS: int = 60
+    # Hosts of the API itself, never looked up as custom domains. The hosts of
+    # BACKEND_CORS_ORIGINS and PUBLIC_STATUS_PAGE_URL are reserved as well.
+    CUSTOM_DOMAIN_EXCLUDED_HOSTS: List[str] = ["localhost", "127.0.0.1"]
+    # Custom domains are only served once this TXT record holds their token
+    CUSTOM_DOMAIN_TXT_PREFIX: str = "_status-page-verification"
+
+    # CDN caching of public responses and purging on writes
+    CDN_SURROGATE_MAX_AGE: int = 0
+    CDN_PURGE_BACKEND: str = ""
+    CDN_PURGE_URL: str = ""
+    CDN_PURGE_TOKEN: str = ""
+    CDN_PURGE_SERVICE_ID: str = ""
+    CDN_PURGE_BATCH_SECONDS: float = 1.0
+    CDN_PURGE_REPEAT_SECONDS: int = 30
+
+    # Websocket broadcasts: messages queued per connection, and what happens
+    # to connections whose queue is full: "drop_oldest", "drop_newest" or
+    # "disconnect". Connections that take longer than the timeout to accept
+    # a message are disconnected.
+    WEBSOCKET_QUEUE_SIZE: int = 100
+    WEBSOCKET_SLOW_CLIENT_POLICY: str = "drop_oldest"
+    WEBSOCKET_SEND_TIMEOUT_SECONDS: float = 10.0
+
+    # Public status page links and feeds
+    PUBLIC_STATUS_PAGE_URL: str = "http://localhost:3000"
+    FEED_MAX_INCIDENTS: int = 25
+    # Pre-rendered feeds and calendars older than this are re-rendered, to
+    # pick up writes handled by other workers
+    FEED_CACHE_TTL_SECONDS: int = 60
+    # Organizations whose pre-rendered feeds and calendars are kept in memory
+    FEED_CACHE_SIZE: int = 1024
+    # Days ended maintenance windows stay in the calendar feeds
+    MAINTENANCE_CALENDAR_DAYS: int = 30
+    BADGE_CACHE_SECONDS: int = 300
+    STATUS_BATCH_MAX_SLUGS: int = 5000
+
+    # Degraded mode for public reads when the database is slow or down
+    PUBLIC_DB_FAILURE_THRESHOLD: int = 5
+    PUBLIC_DB_RESET_SECONDS: int = 15
+    PUBLIC_DB_TIMEOUT_SECONDS: float = 3.0
+    PUBLIC_DB_RETRY_ATTEMPTS: int = 2
+    # Public reads have their own pool, so they wait briefly for a connection
+    # and never for the ones dashboard and background work hold
+    PUBLIC_DB_POOL_SIZE: int = 10
+    PUBLIC_DB_POOL_TIMEOUT_SECONDS: float = 1.0
+    PUBLIC_DB_CONNECT_TIMEOUT_SECONDS: int = 2
+    STALE_WHILE_REVALIDATE_SECONDS: int = 300
+
+    # Status snapshots shared by all worker processes through a memory-mapped file
+    SHARED_SNAPSHOTS_ENABLED: bool = False
+    # Prefix of the file; the layout is appended, e.g. -v1-4096x73728
+    SHARED_SNAPSHOTS_PATH: str = "/dev/shm/status_snapshots"
+    SHARED_SNAPSHOTS_CAPACITY: int = 4096
+    # 0 sizes slots for STATUS_SNAPSHOT_MAX_ACTIVE_INCIDENTS incidents; larger
+    # snapshots are cached per worker instead
+    SHARED_SNAPSHOTS_SLOT_SIZE: int = 0
+
+    # Static status page snapshots served directly by nginx
+    STATIC_PUBLISH_ENABLED: bool = False
+    STATIC_PUBLISH_DIR: str = "static_status"
+    STATIC_PUBLISH_HTML: bool = False
+    STATIC_PUBLISH_WORKERS: int = 4
+
+    # Snapshot log shipped to read-only mirror nodes
+    MIRROR_LOG_ENABLED: bool = False
+    MIRROR_LOG_PATH: str = "status_mirror.log"
+    MIRROR_POLL_SECONDS: float = 0.5
+    MIRROR_UPTIME_DAYS: int = 90
+
     # Email
     SMTP_TLS: bool = True
     SMTP_PORT: Optional[int] = None
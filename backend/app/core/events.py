@@ -0,0 +1,67 @@
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OrganizationChange:
+    """
+    Describes a committed write that affects an organization's status data.
+    """
+    organization_id: int
+    entity: str  # "organization", "service" or "incident"
+    action: str  # "created", "updated" or "deleted"
+    entity_id: Optional[int] = None
+    # Status of the service or incident before and after the write; None when
+    # it did not exist before (created) or no longer exists (deleted)
+    previous_status: Optional[str] = None
+    status: Optional[str] = None
+    # Set when the incident is, or was before the write, a scheduled maintenance
+    maintenance: bool = False
+
+
+ChangeListener = Callable[[OrganizationChange], None]
+
+_change_listeners: List[ChangeListener] = []
+
+
+def on_organization_change(listener: ChangeListener) -> ChangeListener:
+    """
+    Register a listener that is called after every organization change.
+    Can be used as a decorator.
+    """
+    _change_listeners.append(listener)
+    return listener
+
+
+def organization_changed(
+    organization_id: int,
+    *,
+    entity: str,
+    action: str,
+    entity_id: Optional[int] = None,
+    previous_status: Optional[str] = None,
+    status: Optional[str] = None,
+    maintenance: bool = False,
+) -> None:
+    """
+    Notify listeners that a write for an organization has been committed.
+    """
+    change = OrganizationChange(
+        organization_id=organization_id,
+        entity=entity,
+        action=action,
+        entity_id=entity_id,
+        previous_status=previous_status,
+        status=status,
+        maintenance=maintenance,
+    )
+    for listener in _change_listeners:
+        try:
+            listener(change)
+        except Exception:
+            # A failing listener must never fail the write that triggered it
+            logger.exception("Organization change listener %r failed", listener)
@@ -1,3 +1,8 @@
+import base64
+import calendar
+import hashlib
+import hmac
+import time
 from datetime import datetime, timedelta
 from typing import Any, Union, Optional
 
@@ -28,4 +33,42 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+def _viewer_signature(organization_id: int, expires: int, key: str) -> str:
+    # Signing with the app secret as well means the per-organization key
+    # alone, e.g. from a database dump, cannot mint tokens
+    digest = hmac.new(
+        f"{settings.SECRET_KEY}:{key}".encode(),
+        f"{organization_id}.{expires}".encode(),
+        hashlib.sha256,
+    ).digest()
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def create_viewer_token(organization_id: int, key: str, expires_at: datetime) -> str:
+    """
+    Create a token granting access to a private status page until
+    `expires_at` (UTC), signed with the organization's viewer key.
+    """
+    expires = calendar.timegm(expires_at.utctimetuple())
+    return f"{organization_id}.{expires}.{_viewer_signature(organization_id, expires, key)}"
+
+
+def verify_viewer_token(token: Optional[str], organization_id: int, key: Optional[str]) -> bool:
+    """
+    Check a viewer token without any lookups: it must be for the organization,
+    not expired, and signed with the organization's current viewer key.
+    """
+    if not token or not key:
+        return False
+    try:
+        token_organization_id, expires, signature = token.split(".")
+        token_organization_id, expires = int(token_organization_id), int(expires)
+    except ValueError:
+        return False
+    if token_organization_id != organization_id or expires <= time.time():
+        return False
+    expected = _viewer_signature(organization_id, expires, key)
+    return hmac.compare_digest(signature.encode(), expected.encode())
@@ -3,5 +3,6 @@ from app.db.base_class import Base
 from app.models.user import User
 from app.models.organization import Organization
 from app.models.team import Team
-from app.models.service import Service
-from app.models.incident import Incident
\ No newline at end of file
+from app.models.service import Service, ServiceStatusChange, ServiceUptimeDaily
+from app.models.incident import Incident
+from app.models.change import ChangeJournalCounter, ChangeJournalEntry
\ No newline at end of file
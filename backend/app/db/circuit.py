@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_fixed
+
+from app.core.config import settings
+from app.db.session import statement_timeout
+
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning the database is unreachable, overloaded or too slow
+DATABASE_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError)
+
+# MySQL error raised when a query exceeds its maximum execution time
+ER_QUERY_TIMEOUT = 3024
+
+
+def is_timeout(error: BaseException) -> bool:
+    """
+    Check whether a database error means a query or pool checkout took too long.
+    """
+    if isinstance(error, PoolTimeoutError):
+        return True
+    args = getattr(getattr(error, "orig", None), "args", None)
+    return bool(args) and args[0] == ER_QUERY_TIMEOUT
+
+
+def _is_transient(error: BaseException) -> bool:
+    # Retrying a query that timed out would only load the database again
+    return isinstance(error, DATABASE_ERRORS) and not is_timeout(error)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling the database while the circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for database calls.
+
+    Calls are retried by tenacity on transient database errors other than
+    timeouts. Every SELECT a call issues is limited to `timeout` seconds by the
+    database server itself, which frees the thread and connection running it,
+    unlike abandoning the call would. After `failure_threshold` failed calls in
+    a row, counting calls that share one failed computation once, the circuit
+    opens and calls fail immediately with CircuitOpenError. After
+    `reset_timeout` seconds one probe call is let through: if it succeeds the
+    circuit closes, otherwise it stays open for another period.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int,
+        reset_timeout: float,
+        timeout: float,
+        attempts: int,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.timeout = timeout
+        self.attempts = attempts
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def _allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def _record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Database circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def _record_failure(self, *, count: bool = True) -> None:
+        with self._lock:
+            if count:
+                self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning("Database circuit opened after %s failures", self._failures)
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    async def call(self, function: Callable[[], Awaitable[Any]]) -> Any:
+        if not self._allow():
+            raise CircuitOpenError("Database circuit is open")
+        token = statement_timeout.set(int(self.timeout * 1000))
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(self.attempts),
+                wait=wait_fixed(0.05),
+                retry=retry_if_exception(_is_transient),
+                reraise=True,
+            ):
+                with attempt:
+                    result = await function()
+        except DATABASE_ERRORS as error:
+            # Callers sharing a single-flight computation get the same error,
+            # which is one failure of the database however many waited on it
+            counted = getattr(error, "_circuit_counted", False)
+            error._circuit_counted = True
+            self._record_failure(count=not counted)
+            raise
+        except Exception:
+            # Anything else, such as a 404, means the database answered
+            self._record_success()
+            raise
+        except BaseException:
+            # Cancelled: no verdict, but let the next probe through
+            with self._lock:
+                self._probing = False
+            raise
+        finally:
+            statement_timeout.reset(token)
+        self._record_success()
+        return result
+
+
+public_database = CircuitBreaker(
+    failure_threshold=settings.PUBLIC_DB_FAILURE_THRESHOLD,
+    reset_timeout=settings.PUBLIC_DB_RESET_SECONDS,
+    timeout=settings.PUBLIC_DB_TIMEOUT_SECONDS,
+    attempts=settings.PUBLIC_DB_RETRY_ATTEMPTS,
+)
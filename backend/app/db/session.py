@@ -1,4 +1,8 @@
-from sqlalchemy import create_engine
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -15,12 +19,59 @@ engine = create_engine(
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine for public status reads, which fail fast when the database is down or
+# the pool is exhausted so that the circuit breaker opens instead of requests
+# holding threads for DATABASE_POOL_TIMEOUT seconds
+public_engine = create_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.PUBLIC_DB_POOL_SIZE,
+    pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    pool_timeout=settings.PUBLIC_DB_POOL_TIMEOUT_SECONDS,
+    echo=settings.DATABASE_ECHO,
+    pool_pre_ping=True,
+    connect_args=(
+        {"connect_timeout": settings.PUBLIC_DB_CONNECT_TIMEOUT_SECONDS}
+        if make_url(settings.DATABASE_URL).get_backend_name() == "mysql"
+        else {}
+    ),
+)
+PublicSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=public_engine)
+
 Base = declarative_base()
 
+# Limit in milliseconds on how long the server may run each SELECT issued in
+# the current context, such as a public read under the circuit breaker
+statement_timeout: ContextVar[Optional[int]] = ContextVar("statement_timeout", default=None)
+
+
+def _limit_execution_time(conn, cursor, statement, parameters, context, executemany):
+    # MySQL aborts the query itself, so the thread and connection running it
+    # are freed too, instead of only the request giving up on them
+    timeout = statement_timeout.get()
+    if timeout and conn.dialect.name == "mysql":
+        stripped = statement.lstrip()
+        if stripped[:6].upper() == "SELECT":
+            statement = f"SELECT /*+ MAX_EXECUTION_TIME({timeout}) */{stripped[6:]}"
+    return statement, parameters
+
+
+for _engine in (engine, public_engine):
+    event.listen(_engine, "before_cursor_execute", _limit_execution_time, retval=True)
+
+
 # Dependency to use in FastAPI endpoints
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Dependency for public status page endpoints
+def get_public_db():
+    db = PublicSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
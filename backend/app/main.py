@@ -1,11 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.custom_domains import CustomDomainMiddleware
 from app.api.router import api_router, public_router
 from app.websockets.routes import router as websocket_router
 from app.core.config import settings
 from app.db.base import Base
 from app.db.session import engine
+from app.cdn.purge import purge_dispatcher
+from app.mirror.shipper import ship_queue
+from app.publisher.publisher import publish_queue
+from app.services.maintenance import load_maintenance_index
+from app.services.uptime import uptime_rollups
 
 # Create all tables in the database
 Base.metadata.create_all(bind=engine)
@@ -22,8 +28,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Has-More", "X-Next-Cursor"],
 )
 
+# Serve public routes on organizations' custom domains
+app.add_middleware(CustomDomainMiddleware, prefix="/public")
+
 # Include API routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -34,6 +44,25 @@ app.include_router(public_router, prefix="/public")
 app.include_router(websocket_router)
 
 
+@app.on_event("startup")
+def build_maintenance_index():
+    load_maintenance_index()
+
+
+@app.on_event("startup")
+def start_uptime_rollups():
+    uptime_rollups.start()
+
+
+@app.on_event("shutdown")
+def flush_static_publisher():
+    # Write out snapshots for changes that are still queued
+    publish_queue.stop(timeout=10)
+    ship_queue.stop(timeout=10)
+    purge_dispatcher.stop(timeout=10)
+    uptime_rollups.stop(timeout=10)
+
+
 @app.get("/")
 def root():
     return {
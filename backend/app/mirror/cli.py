@@ -0,0 +1,74 @@
+import argparse
+import logging
+from typing import List, Optional
+
+from app.db.session import SessionLocal
+from app.mirror.shipper import ship_organization, snapshot_log
+from app.models.organization import Organization
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def snapshot(slugs: Optional[List[str]] = None) -> int:
+    """
+    Append a full snapshot of the given organizations, or all of them, to the
+    snapshot log. Returns the number of organizations that failed.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Organization.id, Organization.slug)
+        if slugs:
+            query = query.filter(Organization.slug.in_(slugs))
+        organizations = query.all()
+
+        failed = 0
+        for organization_id, slug in organizations:
+            try:
+                ship_organization(db, organization_id, full=True)
+                logger.info("Shipped %s", slug)
+            except Exception:
+                failed += 1
+                logger.exception("Failed to ship %s", slug)
+            finally:
+                db.rollback()
+    finally:
+        db.close()
+
+    logger.info(
+        "Shipped %s of %s organizations to %s",
+        len(organizations) - failed,
+        len(organizations),
+        snapshot_log.path,
+    )
+    return failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Maintain the snapshot log read by mirror nodes."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    snapshot_parser = subparsers.add_parser(
+        "snapshot", help="Append full snapshots of organizations"
+    )
+    snapshot_parser.add_argument(
+        "slugs", nargs="*", help="Organization slugs to ship (default: all)"
+    )
+    subparsers.add_parser(
+        "compact", help="Rewrite the log with only the latest state of each organization"
+    )
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        kept = snapshot_log.compact()
+        logger.info("Compacted %s to %s organizations", snapshot_log.path, kept)
+        return
+
+    failed = snapshot(args.slugs)
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import fcntl
+import json
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Record types
+HEADER = "log"
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+DELETE = "delete"
+
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class SnapshotLog:
+    """
+    Append-only log of status snapshots, one JSON record per line.
+
+    The first line is a header holding a random log ID. Every other record is
+    one of:
+
+    - snapshot: all documents of an organization, replacing what it had
+    - delta: documents to replace and paths to remove
+    - delete: the organization is gone
+
+    A record's `seq` is the byte offset it was written at, so sequence numbers
+    grow with the log and a reader can resume from the last one it saw.
+    Appends from several processes are serialized with an flock on the file.
+    Compaction rewrites the log to one snapshot per organization under a new
+    log ID, so readers know to start over.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _open_locked(self) -> int:
+        """
+        Open the current log file and lock it, creating it with a header if needed.
+        """
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                current = os.stat(self.path)
+            except FileNotFoundError:
+                current = None
+            # The file may have been replaced by a compaction while we waited
+            if current is not None and current.st_ino == os.fstat(fd).st_ino:
+                break
+            os.close(fd)
+        if os.fstat(fd).st_size == 0:
+            os.write(fd, _encode({"type": HEADER, "id": secrets.token_hex(8)}))
+        return fd
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        Append a record and return its sequence number.
+        """
+        fd = self._open_locked()
+        try:
+            seq = os.fstat(fd).st_size
+            os.write(fd, _encode({**record, "seq": seq, "written_at": time.time()}))
+            os.fsync(fd)
+            return seq
+        finally:
+            os.close(fd)
+
+    def compact(self) -> int:
+        """
+        Rewrite the log with only the latest state of every organization.
+        Returns the number of organizations kept.
+        """
+        fd = self._open_locked()
+        try:
+            state = MirrorState()
+            with open(fd, "rb", closefd=False) as log_file:
+                log_file.seek(0)
+                for line in log_file:
+                    if line.endswith(b"\n"):
+                        state.apply(json.loads(line))
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            tmp_fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(tmp_fd, "wb") as tmp:
+                    tmp.write(_encode({"type": HEADER, "id": secrets.token_hex(8)}))
+                    for organization in state.organizations.values():
+                        tmp.write(_encode({
+                            "type": SNAPSHOT,
+                            "organization_id": organization.id,
+                            "slug": organization.slug,
+                            "documents": {
+                                path: content.decode("utf-8")
+                                for path, content in organization.documents.items()
+                            },
+                            "seq": tmp.tell(),
+                            "written_at": time.time(),
+                        }))
+                    tmp.flush()
+                    os.fsync(tmp.fileno())
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except FileNotFoundError:
+                    pass
+                raise
+            return len(state.organizations)
+        finally:
+            os.close(fd)
+
+
+class MirroredOrganization:
+    """
+    Documents of one organization, keyed by path like the static publisher's.
+    """
+
+    __slots__ = ("id", "slug", "version", "documents")
+
+    def __init__(self, id: int, slug: str):
+        self.id = id
+        self.slug = slug
+        self.version = 0
+        self.documents: Dict[str, bytes] = {}
+
+    def json(self, path: str) -> Optional[Any]:
+        content = self.documents.get(path)
+        return json.loads(content) if content is not None else None
+
+
+class MirrorState:
+    """
+    The state of every organization, built by applying log records in order.
+    """
+
+    def __init__(self, log_id: Optional[str] = None):
+        self.log_id = log_id
+        self.organizations: Dict[int, MirroredOrganization] = {}
+        self.slugs: Dict[str, int] = {}
+
+    def get(self, slug: str) -> Optional[MirroredOrganization]:
+        organization_id = self.slugs.get(slug)
+        return self.organizations.get(organization_id) if organization_id is not None else None
+
+    def _drop(self, organization_id: int) -> None:
+        organization = self.organizations.pop(organization_id, None)
+        if organization is not None and self.slugs.get(organization.slug) == organization_id:
+            del self.slugs[organization.slug]
+
+    def apply(self, record: Dict[str, Any]) -> None:
+        record_type = record["type"]
+        if record_type == HEADER:
+            self.log_id = record["id"]
+            return
+
+        organization_id = record["organization_id"]
+        if record_type == DELETE:
+            self._drop(organization_id)
+            return
+
+        organization = self.organizations.get(organization_id)
+        if organization is None or organization.slug != record["slug"]:
+            previous = organization
+            self._drop(organization_id)
+            organization = MirroredOrganization(organization_id, record["slug"])
+            if previous is not None and record_type == DELTA:
+                organization.documents = previous.documents
+            self.organizations[organization_id] = organization
+            self.slugs[organization.slug] = organization_id
+
+        documents = {
+            path: content.encode("utf-8") for path, content in record["documents"].items()
+        }
+        if record_type == DELTA:
+            # Copy so that readers never see a half applied delta
+            documents = {**organization.documents, **documents}
+            for path in record.get("removed", []):
+                documents.pop(path, None)
+        organization.documents = documents
+        organization.version = record["seq"]
+
+
+class LogReader:
+    """
+    Follows a snapshot log from where it last stopped, noticing when the file
+    is replaced by a compaction.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._inode: Optional[int] = None
+        self._offset = 0
+
+    def read(self) -> Tuple[bool, List[Dict[str, Any]]]:
+        """
+        Get (restarted, records): the records appended since the last call, or
+        every record if the log was replaced, in which case restarted is True.
+        Partially written lines are left for the next call.
+        """
+        try:
+            log_file = open(self.path, "rb")
+        except FileNotFoundError:
+            return False, []
+        with log_file:
+            stat = os.fstat(log_file.fileno())
+            restarted = stat.st_ino != self._inode or stat.st_size < self._offset
+            if restarted:
+                self._inode = stat.st_ino
+                self._offset = 0
+            log_file.seek(self._offset)
+            records = []
+            for line in log_file:
+                if not line.endswith(b"\n"):
+                    break
+                self._offset += len(line)
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning("Skipping corrupt record at offset %s", self._offset - len(line))
+        return restarted, records
+
+    def follow(
+        self, poll_interval: float, stop: threading.Event
+    ) -> Iterator[Tuple[bool, List[Dict[str, Any]]]]:
+        """
+        Yield batches from read() every `poll_interval` seconds until `stop` is set.
+        """
+        while not stop.is_set():
+            try:
+                restarted, records = self.read()
+            except OSError:
+                logger.exception("Reading snapshot log %s failed", self.path)
+                restarted, records = False, []
+            if restarted or records:
+                yield restarted, records
+            stop.wait(poll_interval)
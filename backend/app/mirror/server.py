@@ -0,0 +1,422 @@
+import argparse
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request, Response
+from fastapi.middleware.cors import CORSMiddleware
+
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.mirror.log import LogReader, MirroredOrganization, MirrorState
+from app.schemas.incident import MaintenanceWindow
+from app.schemas.status import (
+    OrganizationStatusSummary,
+    StatusBatch,
+    StatusBatchRequest,
+    StatusChanges,
+)
+from app.services.maintenance import MaintenanceTree, affecting
+from app.utils.badges import BADGE_FORMATS, badge_response
+
+
+logger = logging.getLogger(__name__)
+
+
+class MirrorFollower:
+    """
+    Keeps a MirrorState up to date by tailing the snapshot log on a background
+    thread. When the log is replaced the state is rebuilt on the side and
+    swapped in, so requests never see it half loaded.
+    """
+
+    def __init__(self, path: str, poll_interval: float):
+        self.reader = LogReader(path)
+        self.poll_interval = poll_interval
+        self.state = MirrorState()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mirror-follower", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        for restarted, records in self.reader.follow(self.poll_interval, self._stop):
+            state = MirrorState() if restarted else self.state
+            for record in records:
+                try:
+                    state.apply(record)
+                except (KeyError, TypeError, ValueError):
+                    logger.warning("Skipping invalid record %s", record.get("seq"))
+            if restarted:
+                self.state = state
+                logger.info(
+                    "Loaded %s organizations from %s", len(state.organizations), self.reader.path
+                )
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+follower = MirrorFollower(settings.MIRROR_LOG_PATH, settings.MIRROR_POLL_SECONDS)
+
+_maintenance_adapter = TypeAdapter(List[MaintenanceWindow])
+
+# Maintenance trees by organization ID, with the log and record they were
+# built from
+_maintenance_trees: Dict[int, Tuple[Tuple[Optional[str], int], MaintenanceTree]] = {}
+
+router = APIRouter()
+
+
+def _organization(org_slug: str) -> MirroredOrganization:
+    organization = follower.state.get(org_slug)
+    if organization is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+    return organization
+
+
+def _document(
+    request: Request,
+    organization: MirroredOrganization,
+    path: str,
+    *,
+    media_type: str = "application/json",
+    detail: str = "Not found",
+) -> Response:
+    """
+    Serve a mirrored document as is, with an ETag of the record it came from.
+    """
+    content = organization.documents.get(path)
+    if content is None:
+        raise HTTPException(
+            status_code=404,
+            detail=detail,
+        )
+    etag = f'"{follower.state.log_id}-{organization.id}-{organization.version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=content, media_type=media_type, headers={"ETag": etag})
+
+
+def _maintenance_tree(organization: MirroredOrganization) -> MaintenanceTree:
+    """
+    Get the interval tree of the shipped maintenance windows, built once per
+    record of the organization.
+    """
+    source = (follower.state.log_id, organization.version)
+    cached = _maintenance_trees.get(organization.id)
+    if cached is not None and cached[0] == source:
+        return cached[1]
+    content = organization.documents.get("maintenance.json")
+    tree = MaintenanceTree(_maintenance_adapter.validate_json(content) if content else [])
+    _maintenance_trees[organization.id] = (source, tree)
+    return tree
+
+
+@router.post("/status/batch", response_model=StatusBatch)
+def get_organization_statuses(*, batch_in: StatusBatchRequest) -> Any:
+    """
+    Get the overall status and active incident count of many organizations.
+    """
+    if len(batch_in.slugs) > settings.STATUS_BATCH_MAX_SLUGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.STATUS_BATCH_MAX_SLUGS} slugs per request",
+        )
+
+    state = follower.state
+    statuses, not_found = [], []
+    for slug in dict.fromkeys(batch_in.slugs):
+        organization = state.get(slug)
+        status = organization.json("status.json") if organization else None
+        if status is None:
+            not_found.append(slug)
+            continue
+        statuses.append(OrganizationStatusSummary(
+            slug=slug,
+            name=status["organization"]["name"],
+            status=status["status"],
+            active_incidents_count=status["active_incidents_count"],
+        ))
+    return StatusBatch(statuses=statuses, not_found=not_found)
+
+
+@router.get("/{org_slug}/status")
+def get_organization_status(*, request: Request, org_slug: str) -> Any:
+    """
+    Get the overall status for an organization.
+    """
+    return _document(request, _organization(org_slug), "status.json")
+
+
+@router.get("/{org_slug}/bundle")
+def get_status_bundle(*, org_slug: str, recent_limit: int = 10) -> Any:
+    """
+    Get the organization, overall status, services, active incidents and
+    recent incidents in a single response. The mirror holds the ten most
+    recent incidents, so larger limits get at most ten.
+    """
+    bundle = _organization(org_slug).json("bundle.json")
+    if bundle is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+
+    bundle["recent_incidents"] = bundle["recent_incidents"][:max(recent_limit, 0)]
+    return bundle
+
+
+@router.get("/{org_slug}/services")
+def get_services(*, request: Request, org_slug: str) -> Any:
+    """
+    Get all services for a specific organization by slug.
+    """
+    return _document(request, _organization(org_slug), "services.json")
+
+
+@router.get("/{org_slug}/uptime")
+def get_services_uptime(
+    *,
+    request: Request,
+    org_slug: str,
+    days: int = Query(90, ge=1, le=365),
+) -> Any:
+    """
+    Get per-day uptime bars for all services of an organization. Only the
+    shipped number of days is available.
+    """
+    organization = _organization(org_slug)
+    if days != settings.MIRROR_UPTIME_DAYS:
+        raise HTTPException(
+            status_code=404,
+            detail="Uptime not found",
+        )
+
+    return _document(request, organization, "uptime.json", detail="Uptime not found")
+
+
+@router.get("/{org_slug}/changes", response_model=StatusChanges)
+def get_changes(*, org_slug: str, since: Optional[int] = Query(None, ge=0)) -> Any:
+    """
+    Get the changes since the version a client last saw. The mirror only
+    knows the latest version, so clients behind it are told to resync from
+    the mirrored documents.
+    """
+    changes = _organization(org_slug).json("changes.json")
+    if changes is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+
+    version = changes["version"]
+    return StatusChanges(version=version, resync_required=since != version)
+
+
+@router.get("/{org_slug}/feed.{feed_format}")
+def get_incident_feed(*, request: Request, org_slug: str, feed_format: str) -> Any:
+    """
+    Get the RSS or Atom feed of recent incidents and their public updates.
+    """
+    response = _document(
+        request,
+        _organization(org_slug),
+        f"feed.{feed_format}",
+        media_type=f"application/{feed_format}+xml",
+        detail="Feed not found",
+    )
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return response
+
+
+def _calendar(request: Request, organization: MirroredOrganization, path: str) -> Response:
+    response = _document(
+        request,
+        organization,
+        path,
+        media_type="text/calendar; charset=utf-8",
+        detail="Calendar not found",
+    )
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return response
+
+
+@router.get("/{org_slug}/maintenance.ics")
+def get_maintenance_calendar(*, request: Request, org_slug: str) -> Any:
+    """
+    Get the iCalendar feed of an organization's scheduled maintenance windows.
+    """
+    return _calendar(request, _organization(org_slug), "maintenance.ics")
+
+
+@router.get("/{org_slug}/services/{service_id}/maintenance.ics")
+def get_service_maintenance_calendar(*, request: Request, org_slug: str, service_id: int) -> Any:
+    """
+    Get the iCalendar feed of the scheduled maintenance windows of a service.
+    """
+    organization = _organization(org_slug)
+    # Deltas keep the calendars of deleted services until the next snapshot
+    services = organization.json("services.json") or []
+    if not any(service["id"] == service_id for service in services):
+        raise HTTPException(
+            status_code=404,
+            detail="Calendar not found",
+        )
+
+    return _calendar(request, organization, f"services/{service_id}/maintenance.ics")
+
+
+@router.get("/{org_slug}/maintenance/active", response_model=List[MaintenanceWindow])
+def get_active_maintenance(
+    *,
+    org_slug: str,
+    service_ids: Optional[List[int]] = Query(None),
+) -> Any:
+    """
+    Get the maintenance windows in progress, optionally only those affecting
+    any of `service_ids`.
+    """
+    tree = _maintenance_tree(_organization(org_slug))
+    return affecting(tree.at(datetime.now(timezone.utc)), service_ids)
+
+
+@router.get("/{org_slug}/maintenance/upcoming", response_model=List[MaintenanceWindow])
+def get_upcoming_maintenance(
+    *,
+    org_slug: str,
+    days: int = Query(7, ge=1, le=365),
+    service_ids: Optional[List[int]] = Query(None),
+) -> Any:
+    """
+    Get the maintenance windows starting in the next `days` days, optionally
+    only those affecting any of `service_ids`.
+    """
+    tree = _maintenance_tree(_organization(org_slug))
+    now = datetime.now(timezone.utc)
+    return affecting(tree.starting(now, now + timedelta(days=days)), service_ids)
+
+
+@router.get("/{org_slug}/badge.{badge_format}")
+def get_organization_badge(*, org_slug: str, badge_format: str) -> Any:
+    """
+    Get a status badge for an organization as SVG or shields.io endpoint JSON.
+    """
+    status = _organization(org_slug).json("status.json")
+    if not status or badge_format not in BADGE_FORMATS:
+        raise HTTPException(
+            status_code=404,
+            detail="Badge not found",
+        )
+
+    return badge_response(status["organization"]["name"], status["status"], badge_format)
+
+
+@router.get("/{org_slug}/services/{service_id}/badge.{badge_format}")
+def get_service_badge(*, org_slug: str, service_id: int, badge_format: str) -> Any:
+    """
+    Get a status badge for a service as SVG or shields.io endpoint JSON.
+    """
+    services = _organization(org_slug).json("services.json") or []
+    service = next((service for service in services if service["id"] == service_id), None)
+    if not service or badge_format not in BADGE_FORMATS:
+        raise HTTPException(
+            status_code=404,
+            detail="Badge not found",
+        )
+
+    return badge_response(service["name"], service["status"], badge_format)
+
+
+@router.get("/{org_slug}/incidents/active")
+def get_active_incidents(*, request: Request, org_slug: str) -> Any:
+    """
+    Get all active incidents for a specific organization by slug.
+    """
+    return _document(request, _organization(org_slug), "incidents/active.json")
+
+
+@router.get("/{org_slug}/incidents/recent")
+def get_recent_incidents(*, org_slug: str, limit: int = 10) -> Any:
+    """
+    Get recent incidents for a specific organization by slug, at most ten.
+    """
+    incidents = _organization(org_slug).json("incidents/recent.json") or []
+    return incidents[:max(limit, 0)]
+
+
+@router.get("/{org_slug}/incidents/{incident_id}")
+def get_incident_details(*, request: Request, org_slug: str, incident_id: int) -> Any:
+    """
+    Get details for a specific incident.
+    """
+    return _document(
+        request,
+        _organization(org_slug),
+        f"incidents/{incident_id}.json",
+        detail="Incident not found",
+    )
+
+
+app = FastAPI(title=f"{settings.PROJECT_NAME} (mirror)")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.BACKEND_CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["ETag"],
+)
+
+app.include_router(router, prefix="/public")
+
+
+@app.on_event("startup")
+def start_follower():
+    follower.start()
+
+
+@app.on_event("shutdown")
+def stop_follower():
+    follower.stop()
+
+
+@app.get("/")
+def root():
+    state = follower.state
+    return {
+        "message": "Status Page mirror",
+        "log_id": state.log_id,
+        "organizations": len(state.organizations),
+    }
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(
+        description="Serve the public status routes from a snapshot log."
+    )
+    parser.add_argument("--log", default=settings.MIRROR_LOG_PATH, help="Snapshot log to follow")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    follower.reader.path = args.log
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import OrganizationChange, on_organization_change
+from app.mirror.log import DELETE, DELTA, SNAPSHOT, SnapshotLog
+from app.models.organization import Organization
+from app.publisher.publisher import PublishQueue, render_incident_history
+from app.publisher.render import render_organization_documents
+from app.schemas.incident import MaintenanceWindow
+from app.schemas.service import ServiceUptime
+from app.schemas.status import OrganizationPublic, StatusChanges
+from app.services.calendars import render_calendars
+from app.services.changes import get_journal_version
+from app.services.feeds import render_feeds
+from app.services.incident import get_maintenance_incidents_by_organization
+from app.services.maintenance import maintenance_window
+from app.services.organization import get_organization_by_id
+from app.services.status import build_status_bundle
+from app.services.uptime import get_uptime_by_organization
+
+
+snapshot_log = SnapshotLog(settings.MIRROR_LOG_PATH)
+
+_uptime_adapter = TypeAdapter(List[ServiceUptime])
+_maintenance_adapter = TypeAdapter(List[MaintenanceWindow])
+
+# Organizations shipped in full by this process; the first change of any
+# other organization ships a snapshot so the mirror has all its documents
+_shipped: Set[int] = set()
+
+
+def render_mirror_documents(db: Session, organization: Organization) -> Dict[str, bytes]:
+    """
+    Render the organization level documents served by the mirror: those of
+    the static publisher plus feeds, calendars, uptime, the maintenance
+    windows not over yet and the change journal version.
+    """
+    # The version comes first, so the documents are at least that recent
+    version = get_journal_version(db, organization_id=organization.id)
+    bundle = build_status_bundle(db, org_slug=organization.slug)
+    documents = render_organization_documents(
+        bundle, active_incidents_count=len(bundle.active_incidents)
+    )
+    feeds = render_feeds(db, organization_id=organization.id) or {}
+    for feed_format, feed in feeds.items():
+        documents[f"feed.{feed_format}"] = feed
+    uptime = get_uptime_by_organization(
+        db, organization_id=organization.id, days=settings.MIRROR_UPTIME_DAYS
+    )
+    documents["uptime.json"] = _uptime_adapter.dump_json(_uptime_adapter.validate_python(uptime))
+    calendars = render_calendars(db, organization_id=organization.id) or {}
+    for service_id, calendar in calendars.items():
+        path = "maintenance.ics" if service_id is None else f"services/{service_id}/maintenance.ics"
+        documents[path] = calendar
+    incidents = get_maintenance_incidents_by_organization(
+        db, organization_id=organization.id, since=datetime.utcnow()
+    )
+    documents["maintenance.json"] = _maintenance_adapter.dump_json(
+        [maintenance_window(incident) for incident in incidents]
+    )
+    documents["changes.json"] = StatusChanges(version=version).model_dump_json().encode("utf-8")
+    return documents
+
+
+def ship_organization(
+    db: Session,
+    organization_id: int,
+    *,
+    incident_ids: Optional[List[int]] = None,
+    full: bool = False,
+) -> bool:
+    """
+    Append the current state of an organization to the snapshot log.
+
+    A full ship writes a snapshot with every incident. Otherwise a delta with
+    the organization level documents and those of `incident_ids` is written,
+    removing documents of incidents that no longer exist. Returns False if
+    the organization is gone or private, which is logged as a delete.
+    """
+    organization = get_organization_by_id(db, id=organization_id)
+    if not organization or organization.is_private:
+        snapshot_log.append({"type": DELETE, "organization_id": organization_id})
+        _shipped.discard(organization_id)
+        return False
+
+    full = full or organization_id not in _shipped
+    documents = render_mirror_documents(db, organization)
+    removed: List[str] = []
+    if full or incident_ids:
+        incident_documents, published_ids = render_incident_history(
+            db,
+            organization_id=organization.id,
+            organization=OrganizationPublic.model_validate(organization),
+            incident_ids=None if full else incident_ids,
+        )
+        documents.update(incident_documents)
+        if not full:
+            removed = [
+                f"incidents/{incident_id}.json"
+                for incident_id in set(incident_ids) - published_ids
+            ]
+
+    snapshot_log.append({
+        "type": SNAPSHOT if full else DELTA,
+        "organization_id": organization.id,
+        "slug": organization.slug,
+        "documents": {path: content.decode("utf-8") for path, content in documents.items()},
+        "removed": removed,
+    })
+    _shipped.add(organization.id)
+    return True
+
+
+ship_queue = PublishQueue(publish=ship_organization, name="mirror-shipper")
+
+
+@on_organization_change
+def _schedule_ship(change: OrganizationChange) -> None:
+    if settings.MIRROR_LOG_ENABLED:
+        ship_queue.schedule_change(change)
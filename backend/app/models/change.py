@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+from sqlalchemy.sql.sqltypes import DateTime
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class ChangeJournalEntry(Base):
+    """
+    Bounded per-organization journal of service, incident and incident update
+    writes, read by polling clients to fetch only what changed.
+    """
+    __table_args__ = (
+        UniqueConstraint("organization_id", "version", name="uq_changejournalentry_organization_version"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    # No foreign key, so that journaling never blocks deleting an organization
+    organization_id = Column(Integer, nullable=False)
+    # Version clients poll from; assigned from the organization's
+    # ChangeJournalCounter, so versions are in commit order
+    version = Column(Integer, nullable=False)
+    # "service", "incident" or "update"
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    # "created", "updated" or "deleted"
+    action = Column(String(20), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ChangeJournalCounter(Base):
+    """
+    Latest journal version of an organization. Writers lock the row until
+    they commit, so versions become visible in the order they are assigned.
+    """
+    organization_id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Table, Text, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Table, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.sqltypes import DateTime
 from sqlalchemy.sql import func
@@ -35,6 +35,11 @@ incident_service = Table(
 
 
 class Incident(Base):
+    # Serves the newest-first listings and their keyset pagination
+    __table_args__ = (
+        Index("ix_incident_organization_started", "organization_id", "started_at", "id"),
+    )
+    
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), index=True, nullable=False)
     status = Column(
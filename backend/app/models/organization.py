@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Boolean, Column, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.sqltypes import DateTime
 from sqlalchemy.sql import func
@@ -12,6 +12,16 @@ class Organization(Base):
     slug = Column(String(100), unique=True, index=True, nullable=False)
     logo_url = Column(String(512), nullable=True)
     website = Column(String(512), nullable=True)
+    # Host serving the public status page instead of the slug, e.g. status.example.com
+    custom_domain = Column(String(255), unique=True, index=True, nullable=True)
+    # The domain is only served once a TXT record proves the organization
+    # controls it; changing the domain resets the verification
+    custom_domain_token = Column(String(64), nullable=True)
+    custom_domain_verified_at = Column(DateTime(timezone=True), nullable=True)
+    # Private pages are only served with a viewer token signed with viewer_key;
+    # rotating the key revokes every token issued so far
+    is_private = Column(Boolean, nullable=False, default=False)
+    viewer_key = Column(String(64), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
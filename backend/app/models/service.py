@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Float, Boolean, Date, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.sqltypes import DateTime
 from sqlalchemy.sql import func
@@ -32,4 +32,38 @@ class Service(Base):
     
     # Relationships
     organization = relationship("Organization", back_populates="services")
-    incidents = relationship("Incident", secondary="incident_service")
\ No newline at end of file
+    incidents = relationship("Incident", secondary="incident_service")
+
+
+class ServiceStatusChange(Base):
+    """
+    Append-only log of service status transitions.
+    """
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(Enum(ServiceStatus), nullable=False)
+    # Status before the change; empty for the transition recorded on creation
+    previous_status = Column(Enum(ServiceStatus), nullable=True)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    # Foreign keys
+    service_id = Column(Integer, ForeignKey("service.id", ondelete="CASCADE"), index=True)
+    organization_id = Column(Integer, ForeignKey("organization.id"), index=True)
+
+
+class ServiceUptimeDaily(Base):
+    """
+    Per-day uptime rollup of a service, computed from ServiceStatusChange.
+    """
+    __table_args__ = (UniqueConstraint("service_id", "day"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    # Weighted outage time and time with a known status within the day
+    downtime_seconds = Column(Float, nullable=False, default=0)
+    tracked_seconds = Column(Float, nullable=False, default=0)
+    computed_until = Column(DateTime(timezone=True), nullable=False)
+    is_complete = Column(Boolean, default=False, nullable=False)
+    
+    # Foreign keys
+    service_id = Column(Integer, ForeignKey("service.id", ondelete="CASCADE"), index=True)
+    organization_id = Column(Integer, ForeignKey("organization.id"), index=True)
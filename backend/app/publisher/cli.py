@@ -0,0 +1,80 @@
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.organization import Organization
+from app.publisher.publisher import publish_organization
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _publish_one(organization_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        return publish_organization(db, organization_id, full=True)
+    finally:
+        db.close()
+
+
+def rebuild(slugs: Optional[List[str]] = None, workers: int = settings.STATIC_PUBLISH_WORKERS) -> int:
+    """
+    Fully re-publish the given organizations, or all of them, in parallel.
+    Returns the number of organizations that failed.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Organization.id, Organization.slug)
+        if slugs:
+            query = query.filter(Organization.slug.in_(slugs))
+        organizations = query.all()
+    finally:
+        db.close()
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_publish_one, organization_id): slug
+            for organization_id, slug in organizations
+        }
+        for future in as_completed(futures):
+            slug = futures[future]
+            try:
+                future.result()
+                logger.info(f"Published {slug}")
+            except Exception:
+                failed += 1
+                logger.exception(f"Failed to publish {slug}")
+
+    logger.info(
+        f"Published {len(organizations) - failed} of {len(organizations)} organizations "
+        f"to {settings.STATIC_PUBLISH_DIR}"
+    )
+    return failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild the static status page snapshots."
+    )
+    parser.add_argument(
+        "slugs", nargs="*", help="Organization slugs to rebuild (default: all)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.STATIC_PUBLISH_WORKERS,
+        help="Number of organizations to publish in parallel",
+    )
+    args = parser.parse_args()
+
+    failed = rebuild(args.slugs, workers=args.workers)
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
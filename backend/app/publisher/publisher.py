@@ -0,0 +1,252 @@
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import OrganizationChange, on_organization_change
+from app.db.session import SessionLocal
+from app.publisher.render import (
+    incident_document_paths,
+    render_incident_documents,
+    render_organization_documents,
+)
+from app.publisher.writer import remove_documents, remove_tree, write_atomic, write_documents
+from app.schemas.incident import IncidentPublic, IncidentWithUpdatesPublic
+from app.schemas.status import OrganizationPublic
+from app.services.incident import get_incidents_with_public_updates
+from app.services.organization import get_organization_by_id
+from app.services.status import build_status_bundle
+
+
+logger = logging.getLogger(__name__)
+
+# Marker file identifying which organization a slug directory belongs to
+ORGANIZATION_MARKER = ".organization_id"
+
+
+def _publish_root() -> Path:
+    return Path(settings.STATIC_PUBLISH_DIR)
+
+
+def _remove_stale_directories(root: Path, organization_id: int, slug: Optional[str]) -> None:
+    """
+    Remove directories published for this organization under another slug,
+    left behind by a slug change or by deleting the organization.
+    """
+    if not root.is_dir():
+        return
+    for directory in root.iterdir():
+        if directory.name == slug or not directory.is_dir():
+            continue
+        marker = directory / ORGANIZATION_MARKER
+        try:
+            if marker.read_text().strip() == str(organization_id):
+                remove_tree(directory)
+        except FileNotFoundError:
+            continue
+
+
+def render_incident_history(
+    db: Session,
+    *,
+    organization_id: int,
+    organization: OrganizationPublic,
+    incident_ids: Optional[List[int]] = None,
+    html: bool = False,
+) -> Tuple[Dict[str, bytes], Set[int]]:
+    """
+    Render the detail documents of the given incidents, or of every incident.
+    Returns the documents and the IDs of the incidents that still exist.
+    """
+    documents: Dict[str, bytes] = {}
+    published_ids: Set[int] = set()
+    incidents = get_incidents_with_public_updates(
+        db, organization_id=organization_id, incident_ids=incident_ids
+    )
+    for incident, updates in incidents:
+        detail = IncidentWithUpdatesPublic(
+            **IncidentPublic.model_validate(incident).model_dump(),
+            updates=updates,
+            services=incident.services,
+        )
+        documents.update(render_incident_documents(detail, organization=organization, html=html))
+        published_ids.add(incident.id)
+    return documents, published_ids
+
+
+def publish_organization(
+    db: Session,
+    organization_id: int,
+    *,
+    incident_ids: Optional[List[int]] = None,
+    full: bool = False,
+) -> bool:
+    """
+    Re-render the static documents of an organization.
+
+    Organization level documents are always rewritten. Incident detail
+    documents are rewritten for `incident_ids`, or for every incident when
+    `full` is set, in which case documents of deleted incidents and of old
+    slugs are removed as well. Returns False if the organization is gone, or
+    private, in which case its documents are removed.
+    """
+    root = _publish_root()
+    organization = get_organization_by_id(db, id=organization_id)
+    if not organization or organization.is_private:
+        _remove_stale_directories(root, organization_id, None)
+        return False
+
+    if full:
+        _remove_stale_directories(root, organization_id, organization.slug)
+
+    directory = root / organization.slug
+    html = settings.STATIC_PUBLISH_HTML
+
+    bundle = build_status_bundle(db, org_slug=organization.slug)
+    documents = render_organization_documents(
+        bundle, active_incidents_count=len(bundle.active_incidents), html=html
+    )
+
+    if full or incident_ids:
+        incident_documents, published_ids = render_incident_history(
+            db,
+            organization_id=organization.id,
+            organization=bundle.organization,
+            incident_ids=None if full else incident_ids,
+            html=html,
+        )
+        documents.update(incident_documents)
+
+        if full:
+            stale_ids = _published_incident_ids(directory) - published_ids
+        else:
+            stale_ids = set(incident_ids) - published_ids
+        for incident_id in stale_ids:
+            remove_documents(directory, incident_document_paths(incident_id))
+
+    write_documents(directory, documents)
+    write_atomic(directory / ORGANIZATION_MARKER, str(organization.id).encode())
+    return True
+
+
+def _published_incident_ids(directory: Path) -> Set[int]:
+    incidents_dir = directory / "incidents"
+    if not incidents_dir.is_dir():
+        return set()
+    return {
+        int(path.stem) for path in incidents_dir.iterdir() if path.stem.isdigit()
+    }
+
+
+class PublishQueue:
+    """
+    Publishes organizations from a background thread so writes never wait on
+    rendering. Changes that arrive while the worker is busy are coalesced per
+    organization.
+
+    `publish` is called as publish(db, organization_id, incident_ids=...,
+    full=...) like publish_organization, the default.
+    """
+
+    def __init__(
+        self,
+        debounce: float = 0.5,
+        *,
+        publish: Callable[..., bool] = publish_organization,
+        name: str = "status-publisher",
+    ):
+        self.debounce = debounce
+        self.publish = publish
+        self.name = name
+        # Map organization_id -> incident IDs to re-render, or None for a full publish
+        self._pending: Dict[int, Optional[Set[int]]] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def schedule(
+        self, organization_id: int, *, incident_id: Optional[int] = None, full: bool = False
+    ) -> None:
+        with self._condition:
+            if full:
+                self._pending[organization_id] = None
+            else:
+                incident_ids = self._pending.setdefault(organization_id, set())
+                if incident_ids is not None and incident_id is not None:
+                    incident_ids.add(incident_id)
+            self._ensure_worker()
+            self._condition.notify()
+
+    def schedule_change(self, change: OrganizationChange) -> None:
+        """
+        Schedule what a change affects: everything for an organization
+        change, the incident's documents for an incident change.
+        """
+        if change.entity == "organization":
+            self.schedule(change.organization_id, full=True)
+        elif change.entity == "incident":
+            self.schedule(change.organization_id, incident_id=change.entity_id)
+        else:
+            self.schedule(change.organization_id)
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if not self._pending and self._stopping:
+                    return
+                # Give bursts of writes a moment to coalesce
+                if not self._stopping:
+                    self._condition.wait(self.debounce)
+                pending, self._pending = self._pending, {}
+            self._publish(pending)
+
+    def _publish(self, pending: Dict[int, Optional[Set[int]]]) -> None:
+        db = SessionLocal()
+        try:
+            for organization_id, incident_ids in pending.items():
+                try:
+                    self.publish(
+                        db,
+                        organization_id,
+                        incident_ids=sorted(incident_ids) if incident_ids else None,
+                        full=incident_ids is None,
+                    )
+                except Exception:
+                    logger.exception("Publishing organization %s failed", organization_id)
+                finally:
+                    # End the transaction so the next render reads fresh data
+                    db.rollback()
+        finally:
+            db.close()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Publish whatever is still pending and stop the worker thread.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+publish_queue = PublishQueue()
+
+
+@on_organization_change
+def _schedule_publish(change: OrganizationChange) -> None:
+    if settings.STATIC_PUBLISH_ENABLED:
+        publish_queue.schedule_change(change)
@@ -0,0 +1,140 @@
+import json
+from typing import Any, Dict, List
+
+from jinja2 import Environment, select_autoescape
+
+from app.schemas.incident import IncidentWithUpdatesPublic
+from app.schemas.status import OrganizationPublic, StatusBundle
+from app.utils.helpers import format_datetime, get_status_color, get_status_display_name
+
+
+STATUS_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="utf-8">
+    <title>{{ organization.name }} Status</title>
+</head>
+<body>
+    <h1>{{ organization.name }}</h1>
+    <p class="status status-{{ status | status_color }}">{{ status | status_name }}</p>
+
+    <h2>Services</h2>
+    <ul>
+    {% for service in services %}
+        <li>{{ service.name }}: <span class="status-{{ service.status | status_color }}">{{ service.status | status_name }}</span></li>
+    {% endfor %}
+    </ul>
+
+    <h2>Active Incidents</h2>
+    {% for incident in active_incidents %}
+        <p><a href="incidents/{{ incident.id }}.html">{{ incident.title }}</a> ({{ incident.status | status_name }})</p>
+    {% else %}
+        <p>No active incidents.</p>
+    {% endfor %}
+
+    <h2>Recent Incidents</h2>
+    {% for incident in recent_incidents %}
+        <p><a href="incidents/{{ incident.id }}.html">{{ incident.title }}</a> - {{ incident.started_at | datetime }}</p>
+    {% endfor %}
+</body>
+</html>
+"""
+
+INCIDENT_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="utf-8">
+    <title>{{ incident.title }} - {{ organization.name }} Status</title>
+</head>
+<body>
+    <p><a href="../index.html">{{ organization.name }}</a></p>
+    <h1>{{ incident.title }}</h1>
+    <p>{{ incident.status | status_name }} &middot; {{ incident.impact | status_name }} impact</p>
+
+    {% for update in incident.updates %}
+        <div>
+            <strong>{{ update.status | status_name }}</strong> - {{ update.message }}
+            <small>{{ update.created_at | datetime }}</small>
+        </div>
+    {% endfor %}
+</body>
+</html>
+"""
+
+
+def _status_value(value: Any) -> str:
+    # Status enums render as their raw value
+    return getattr(value, "value", value)
+
+
+_environment = Environment(autoescape=select_autoescape(default=True))
+_environment.filters["status_name"] = lambda value: get_status_display_name(_status_value(value))
+_environment.filters["status_color"] = lambda value: get_status_color(_status_value(value))
+_environment.filters["datetime"] = format_datetime
+
+_status_page = _environment.from_string(STATUS_PAGE_TEMPLATE)
+_incident_page = _environment.from_string(INCIDENT_PAGE_TEMPLATE)
+
+
+def _json(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def render_organization_documents(
+    bundle: StatusBundle, *, active_incidents_count: int, html: bool = False
+) -> Dict[str, bytes]:
+    """
+    Render the organization level documents, keyed by path relative to the
+    organization's directory. Paths mirror the public API routes.
+    """
+    data = bundle.model_dump(mode="json")
+    services = [
+        {key: value for key, value in service.items() if key != "active_incident_ids"}
+        for service in data["services"]
+    ]
+
+    documents = {
+        "bundle.json": _json(data),
+        "status.json": _json({
+            "organization": data["organization"],
+            "status": data["status"],
+            "active_incidents_count": active_incidents_count,
+        }),
+        "services.json": _json(services),
+        "incidents/active.json": _json(data["active_incidents"]),
+        "incidents/recent.json": _json(data["recent_incidents"]),
+    }
+
+    if html:
+        documents["index.html"] = _status_page.render(
+            organization=bundle.organization,
+            status=bundle.status,
+            services=bundle.services,
+            active_incidents=bundle.active_incidents,
+            recent_incidents=bundle.recent_incidents,
+        ).encode("utf-8")
+
+    return documents
+
+
+def render_incident_documents(
+    incident: IncidentWithUpdatesPublic,
+    *,
+    organization: OrganizationPublic,
+    html: bool = False,
+) -> Dict[str, bytes]:
+    """
+    Render the detail documents of a single incident.
+    """
+    documents = {
+        f"incidents/{incident.id}.json": _json(incident.model_dump(mode="json")),
+    }
+    if html:
+        documents[f"incidents/{incident.id}.html"] = _incident_page.render(
+            organization=organization, incident=incident
+        ).encode("utf-8")
+    return documents
+
+
+def incident_document_paths(incident_id: int) -> List[str]:
+    return [f"incidents/{incident_id}.json", f"incidents/{incident_id}.html"]
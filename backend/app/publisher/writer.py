@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable
+
+
+def write_atomic(path: Path, content: bytes) -> None:
+    """
+    Write a file so that readers only ever see the old or the new content.
+
+    The content goes to a temporary file in the same directory, which is then
+    renamed over the target; a rename within one filesystem is atomic.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(content)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        # mkstemp creates files readable by the owner only; nginx needs to read them
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_documents(root: Path, documents: Dict[str, bytes]) -> None:
+    """
+    Atomically write several documents given as relative path -> content.
+    """
+    for relative_path, content in documents.items():
+        write_atomic(root / relative_path, content)
+
+
+def remove_documents(root: Path, relative_paths: Iterable[str]) -> None:
+    for relative_path in relative_paths:
+        try:
+            (root / relative_path).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def remove_tree(path: Path) -> None:
+    shutil.rmtree(path, ignore_errors=True)
@@ -1,6 +1,6 @@
-from typing import Optional, List
+from typing import Any, Optional, List
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 
 from app.models.incident import IncidentStatus, IncidentImpact, IncidentType
 
@@ -118,6 +118,23 @@ class IncidentWithUpdatesPublic(IncidentPublic):
     updates: List[IncidentUpdatePublic] = []
     services: List[int] = []
 
+    @validator("services", pre=True)
+    def service_ids(cls, v: List[Any]) -> List[int]:
+        # Accept Service ORM objects and expose only their IDs
+        return [getattr(service, "id", service) for service in v]
+
+
+# Scheduled maintenance as kept in the maintenance index. `ends_at` is None
+# while a maintenance without a scheduled end is not resolved.
+class MaintenanceWindow(BaseModel):
+    id: int
+    title: str
+    status: IncidentStatus
+    impact: IncidentImpact
+    starts_at: datetime
+    ends_at: Optional[datetime] = None
+    service_ids: List[int] = []
+
 
 from app.schemas.service import Service
 from app.schemas.user import User
\ No newline at end of file
@@ -1,6 +1,8 @@
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
+
+from app.utils.helpers import normalize_host, reserved_hosts
 
 
 # Shared properties
@@ -9,6 +11,20 @@ class OrganizationBase(BaseModel):
     slug: Optional[str] = None
     logo_url: Optional[str] = None
     website: Optional[str] = None
+    custom_domain: Optional[str] = None
+    is_private: Optional[bool] = False
+
+    @validator("custom_domain", pre=True)
+    def normalize_custom_domain(cls, v):
+        # Stored the way Host headers are looked up; empty clears the domain
+        return normalize_host(v) if v else None
+
+
+def check_custom_domain(v: Optional[str]) -> Optional[str]:
+    # The API's and frontend's own hosts would be rewritten to a status page
+    if v and v in reserved_hosts():
+        raise ValueError("This domain is reserved")
+    return v
 
 
 # Properties to receive via API on creation
@@ -16,10 +32,12 @@ class OrganizationCreate(OrganizationBase):
     name: str
     slug: str
 
+    _check_custom_domain = validator("custom_domain", allow_reuse=True)(check_custom_domain)
+
 
 # Properties to receive via API on update
 class OrganizationUpdate(OrganizationBase):
-    pass
+    _check_custom_domain = validator("custom_domain", allow_reuse=True)(check_custom_domain)
 
 
 # Properties shared by models stored in DB
@@ -27,6 +45,10 @@ class OrganizationInDBBase(OrganizationBase):
     id: int
     name: str
     slug: str
+    # Publish as a TXT record named CUSTOM_DOMAIN_TXT_PREFIX.<custom_domain>,
+    # then verify the domain, to have it served
+    custom_domain_token: Optional[str] = None
+    custom_domain_verified_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -41,4 +63,15 @@ class Organization(OrganizationInDBBase):
 
 # Additional properties stored in DB but not returned by API
 class OrganizationInDB(OrganizationInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+
+# Lifetime of a viewer token to issue
+class ViewerTokenCreate(BaseModel):
+    expires_in_minutes: Optional[int] = Field(None, ge=1)
+
+
+# Viewer token for a private status page
+class ViewerToken(BaseModel):
+    token: str
+    expires_at: datetime
\ No newline at end of file
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel, Field
 
 from app.models.service import ServiceStatus
@@ -48,4 +48,31 @@ class Service(ServiceInDBBase):
 
 # Additional properties stored in DB but not returned by API
 class ServiceInDB(ServiceInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+
+# Entry of a service's status history
+class ServiceStatusChange(BaseModel):
+    id: int
+    service_id: int
+    status: ServiceStatus
+    previous_status: Optional[ServiceStatus] = None
+    changed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Uptime of a service on one day; empty when there is no data for the day
+class UptimeDay(BaseModel):
+    date: date
+    uptime: Optional[float] = None
+
+
+# Per-day uptime bars of a service
+class ServiceUptime(BaseModel):
+    service_id: int
+    name: str
+    status: ServiceStatus
+    uptime: Optional[float] = None
+    days: List[UptimeDay] = []
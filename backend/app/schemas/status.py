@@ -0,0 +1,73 @@
+from typing import Optional, List
+from pydantic import BaseModel
+
+from app.models.service import ServiceStatus
+from app.schemas.incident import IncidentPublic, IncidentUpdatePublic
+from app.schemas.service import Service
+
+
+# Organization header shown on the public page
+class OrganizationPublic(BaseModel):
+    name: str
+    slug: str
+    logo_url: Optional[str] = None
+    website: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+# Service with the IDs of the active incidents affecting it
+class ServiceWithActiveIncidents(Service):
+    active_incident_ids: List[int] = []
+
+
+# Slugs to look up in one batch status request
+class StatusBatchRequest(BaseModel):
+    slugs: List[str]
+
+
+# Overall status of one organization in a batch response
+class OrganizationStatusSummary(BaseModel):
+    slug: str
+    name: str
+    status: ServiceStatus
+    active_incidents_count: int
+
+
+class StatusBatch(BaseModel):
+    statuses: List[OrganizationStatusSummary] = []
+    not_found: List[str] = []
+
+
+# Everything the public status page needs in a single response
+class StatusBundle(BaseModel):
+    organization: OrganizationPublic
+    status: ServiceStatus
+    services: List[ServiceWithActiveIncidents] = []
+    active_incidents: List[IncidentPublic] = []
+    recent_incidents: List[IncidentPublic] = []
+
+
+# Public incident update along with the incident it belongs to
+class IncidentUpdateChange(IncidentUpdatePublic):
+    incident_id: int
+
+
+# IDs of entities deleted, or no longer public, since a version
+class DeletedIds(BaseModel):
+    services: List[int] = []
+    incidents: List[int] = []
+    updates: List[int] = []
+
+
+# Everything that changed for an organization since the version a client saw
+class StatusChanges(BaseModel):
+    version: int
+    # Set when the changes are no longer known; reload everything, then poll
+    # from `version`
+    resync_required: bool = False
+    services: List[Service] = []
+    incidents: List[IncidentPublic] = []
+    updates: List[IncidentUpdateChange] = []
+    deleted: DeletedIds = DeletedIds()
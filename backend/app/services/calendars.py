@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import OrganizationChange, on_organization_change
+from app.models.incident import Incident
+from app.services.feeds import FeedCache
+from app.services.incident import get_maintenance_incidents_by_organization
+from app.services.organization import get_organization_by_id
+from app.services.service import get_services_by_organization
+from app.utils.helpers import get_status_display_name
+
+
+def _escape(text: str) -> str:
+    """
+    Escape a TEXT value (RFC 5545, 3.3.11).
+    """
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """
+    Fold a content line into lines of at most 75 octets (RFC 5545, 3.1).
+    """
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        # Continuation lines start with a space, which counts towards the limit
+        limit = 74
+    return "\r\n ".join(parts)
+
+
+def _timestamp(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _render_calendar(name: str, events: List[List[str]]) -> bytes:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Status Page//Maintenance//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+        "REFRESH-INTERVAL;VALUE=DURATION:PT1H",
+        "X-PUBLISHED-TTL:PT1H",
+    ]
+    for event in events:
+        lines.extend(event)
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(_fold(line) for line in lines) + "\r\n").encode("utf-8")
+
+
+def _maintenance_event(incident: Incident, base_url: str, host: str) -> List[str]:
+    starts_at = incident.scheduled_start_time or incident.started_at
+    ends_at = incident.scheduled_end_time or incident.resolved_at
+    services = ", ".join(service.name for service in incident.services)
+    description = get_status_display_name(incident.status.value)
+    if services:
+        description += f". Affects {services}"
+    event = [
+        "BEGIN:VEVENT",
+        f"UID:maintenance-{incident.id}@{host}",
+        f"DTSTAMP:{_timestamp(incident.updated_at or incident.created_at)}",
+        f"DTSTART:{_timestamp(starts_at)}",
+    ]
+    if ends_at and ends_at > starts_at:
+        event.append(f"DTEND:{_timestamp(ends_at)}")
+    event.extend([
+        f"SUMMARY:{_escape(incident.title)}",
+        f"DESCRIPTION:{_escape(description)}",
+        f"URL:{base_url}/incidents/{incident.id}",
+        "STATUS:CONFIRMED",
+        "TRANSP:TRANSPARENT",
+        "END:VEVENT",
+    ])
+    return event
+
+
+def render_calendars(db: Session, *, organization_id: int) -> Optional[Dict[Optional[int], bytes]]:
+    """
+    Render the iCalendar feeds of an organization's upcoming, ongoing and
+    recent maintenance windows: one for the whole organization, keyed by None,
+    and one per service, keyed by service ID. Returns None if the organization
+    does not exist.
+    """
+    organization = get_organization_by_id(db, id=organization_id)
+    if not organization:
+        return None
+
+    incidents = get_maintenance_incidents_by_organization(
+        db,
+        organization_id=organization_id,
+        since=datetime.utcnow() - timedelta(days=settings.MAINTENANCE_CALENDAR_DAYS),
+    )
+    services = get_services_by_organization(db, organization_id=organization_id, limit=None)
+
+    base_url = settings.PUBLIC_STATUS_PAGE_URL.rstrip("/")
+    host = urlparse(base_url).hostname or "localhost"
+    events = {incident.id: _maintenance_event(incident, base_url, host) for incident in incidents}
+
+    calendars: Dict[Optional[int], bytes] = {
+        None: _render_calendar(f"{organization.name} maintenance", list(events.values()))
+    }
+    for service in services:
+        calendars[service.id] = _render_calendar(
+            f"{organization.name} {service.name} maintenance",
+            [
+                events[incident.id]
+                for incident in incidents
+                if any(affected.id == service.id for affected in incident.services)
+            ],
+        )
+    return calendars
+
+
+calendar_cache = FeedCache(render_calendars, name="calendar-renderer")
+
+
+@on_organization_change
+def _rerender_calendars(change: OrganizationChange) -> None:
+    if change.entity == "organization" and change.action == "deleted":
+        calendar_cache.forget(change.organization_id)
+    elif (
+        change.entity == "organization"
+        or (change.entity == "incident" and change.maintenance)
+        # Services added, removed or renamed, but not mere status changes
+        or (
+            change.entity == "service"
+            and (change.action != "updated" or change.previous_status == change.status)
+        )
+    ):
+        calendar_cache.schedule(change.organization_id)
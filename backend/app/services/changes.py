@@ -0,0 +1,172 @@
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.change import ChangeJournalCounter, ChangeJournalEntry
+from app.models.incident import Incident, IncidentUpdate
+from app.models.service import Service
+from app.schemas.incident import IncidentPublic
+from app.schemas.service import Service as ServiceSchema
+from app.schemas.status import DeletedIds, IncidentUpdateChange, StatusChanges
+
+
+def _lock_counter(db: Session, *, organization_id: int) -> ChangeJournalCounter:
+    """
+    Get the organization's journal counter, locked until the caller's
+    transaction ends, creating it on the organization's first write.
+    """
+    query = db.query(ChangeJournalCounter).filter(
+        ChangeJournalCounter.organization_id == organization_id
+    )
+    counter = query.with_for_update().first()
+    if counter is not None:
+        return counter
+    try:
+        with db.begin_nested():
+            counter = ChangeJournalCounter(organization_id=organization_id, version=0)
+            db.add(counter)
+    except IntegrityError:
+        # Created by a concurrent first write
+        counter = query.with_for_update().one()
+    return counter
+
+
+def record_change(
+    db: Session, *, organization_id: int, entity: str, entity_id: int, action: str
+) -> None:
+    """
+    Journal a write in the caller's transaction.
+
+    The version comes from the organization's counter, which stays locked
+    until the caller commits. Concurrent writers of an organization therefore
+    commit in version order, and a client that has seen a version never misses
+    an older one committed later, as it could with autoincrement IDs. Every
+    CHANGE_JOURNAL_PRUNE_INTERVAL versions, entries older than the newest
+    CHANGE_JOURNAL_SIZE are deleted.
+    """
+    counter = _lock_counter(db, organization_id=organization_id)
+    counter.version += 1
+    db.add(ChangeJournalEntry(
+        organization_id=organization_id,
+        version=counter.version,
+        entity=entity,
+        entity_id=entity_id,
+        action=action,
+    ))
+    if counter.version % settings.CHANGE_JOURNAL_PRUNE_INTERVAL == 0:
+        # Versions of an organization are contiguous, so no lookup is needed
+        db.query(ChangeJournalEntry).filter(
+            ChangeJournalEntry.organization_id == organization_id,
+            ChangeJournalEntry.version <= counter.version - settings.CHANGE_JOURNAL_SIZE,
+        ).delete(synchronize_session=False)
+    db.flush()
+
+
+def get_journal_version(db: Session, *, organization_id: int) -> int:
+    """
+    Get the version of an organization's latest journaled write, 0 if none.
+    """
+    return (
+        db.query(ChangeJournalCounter.version)
+        .filter(ChangeJournalCounter.organization_id == organization_id)
+        .scalar()
+    ) or 0
+
+
+def get_changes_since(
+    db: Session, *, organization_id: int, since: Optional[int]
+) -> StatusChanges:
+    """
+    Get the services, incidents and public incident updates written since a
+    version, each in its current state, or the IDs of those deleted since.
+
+    A resync is required when no version is given, when it is newer than the
+    journal, or when the entries following it have been pruned. In that case
+    the current version is returned so the client can reload and continue
+    from there.
+    """
+    version = get_journal_version(db, organization_id=organization_id)
+    if since is None or since > version:
+        return StatusChanges(version=version, resync_required=True)
+    if since == version:
+        return StatusChanges(version=version)
+
+    oldest = (
+        db.query(func.min(ChangeJournalEntry.version))
+        .filter(ChangeJournalEntry.organization_id == organization_id)
+        .scalar()
+    )
+    if oldest is None or since + 1 < oldest:
+        return StatusChanges(version=version, resync_required=True)
+
+    entries = (
+        db.query(ChangeJournalEntry.entity, ChangeJournalEntry.entity_id, ChangeJournalEntry.action)
+        .filter(
+            ChangeJournalEntry.organization_id == organization_id,
+            ChangeJournalEntry.version > since,
+            ChangeJournalEntry.version <= version,
+        )
+        .order_by(ChangeJournalEntry.version)
+        .all()
+    )
+
+    # Only the last write of each entity matters
+    last_actions: Dict[Tuple[str, int], str] = {}
+    for entity, entity_id, action in entries:
+        last_actions[(entity, entity_id)] = action
+    changed: Dict[str, List[int]] = {"service": [], "incident": [], "update": []}
+    deleted: Dict[str, List[int]] = {"service": [], "incident": [], "update": []}
+    for (entity, entity_id), action in last_actions.items():
+        (deleted if action == "deleted" else changed)[entity].append(entity_id)
+
+    services = incidents = updates = []
+    if changed["service"]:
+        services = (
+            db.query(Service)
+            .filter(Service.id.in_(changed["service"]), Service.organization_id == organization_id)
+            .order_by(Service.id)
+            .all()
+        )
+    if changed["incident"]:
+        incidents = (
+            db.query(Incident)
+            .filter(Incident.id.in_(changed["incident"]), Incident.organization_id == organization_id)
+            .order_by(Incident.id)
+            .all()
+        )
+    if changed["update"]:
+        updates = (
+            db.query(IncidentUpdate)
+            .join(Incident, IncidentUpdate.incident_id == Incident.id)
+            .filter(
+                IncidentUpdate.id.in_(changed["update"]),
+                IncidentUpdate.is_public == True,
+                Incident.organization_id == organization_id,
+            )
+            .order_by(IncidentUpdate.id)
+            .all()
+        )
+
+    # Entities changed and then deleted, or updates made private, are gone too
+    found = {
+        "service": {service.id for service in services},
+        "incident": {incident.id for incident in incidents},
+        "update": {update.id for update in updates},
+    }
+    for entity, ids in changed.items():
+        deleted[entity].extend(entity_id for entity_id in ids if entity_id not in found[entity])
+
+    return StatusChanges(
+        version=version,
+        services=[ServiceSchema.model_validate(service) for service in services],
+        incidents=[IncidentPublic.model_validate(incident) for incident in incidents],
+        updates=[IncidentUpdateChange.model_validate(update) for update in updates],
+        deleted=DeletedIds(
+            services=sorted(deleted["service"]),
+            incidents=sorted(deleted["incident"]),
+            updates=sorted(deleted["update"]),
+        ),
+    )
@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.models.incident import Incident, IncidentUpdate, incident_service
+
+
+INCIDENT_FIELDS = [
+    "id",
+    "title",
+    "status",
+    "impact",
+    "type",
+    "started_at",
+    "resolved_at",
+    "scheduled_start_time",
+    "scheduled_end_time",
+    "created_by_id",
+    "created_at",
+    "updated_at",
+]
+
+UPDATE_FIELDS = ["id", "message", "status", "is_public", "created_by_id", "created_at"]
+
+# Enough for any number of service IDs of an incident; MySQL's default of 1024
+# bytes silently truncates the list after about 150 of them
+GROUP_CONCAT_MAX_LEN = 1024 * 1024
+
+CSV_COLUMNS = INCIDENT_FIELDS + ["service_ids", "updates"]
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+
+def iter_incident_history(
+    db: Session, *, organization_id: int, chunk_size: int = 500
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every incident of an organization, oldest first, with its service
+    IDs and all of its updates inlined.
+
+    Incidents and their updates are read with a single joined query streamed
+    from a server-side cursor `chunk_size` rows at a time, so only the
+    incident being assembled is held in memory.
+    """
+    if db.get_bind().dialect.name == "mysql":
+        # A second query cannot run on the connection while it streams, so
+        # service IDs are concatenated in the main query instead
+        db.execute(text(f"SET SESSION group_concat_max_len = {GROUP_CONCAT_MAX_LEN}"))
+    service_ids = (
+        select(func.group_concat(incident_service.c.service_id))
+        .where(incident_service.c.incident_id == Incident.id)
+        .correlate(Incident)
+        .scalar_subquery()
+    )
+    statement = (
+        select(
+            *[getattr(Incident, field) for field in INCIDENT_FIELDS],
+            service_ids.label("service_ids"),
+            *[getattr(IncidentUpdate, field).label(f"update_{field}") for field in UPDATE_FIELDS],
+        )
+        .outerjoin(IncidentUpdate, IncidentUpdate.incident_id == Incident.id)
+        .where(Incident.organization_id == organization_id)
+        .order_by(
+            Incident.started_at,
+            Incident.id,
+            IncidentUpdate.created_at,
+            IncidentUpdate.id,
+        )
+        .execution_options(yield_per=chunk_size)
+    )
+
+    current = None
+    for rows in db.execute(statement).partitions():
+        for row in rows:
+            if current is None or current["id"] != row.id:
+                if current is not None:
+                    yield current
+                current = {field: _json_value(getattr(row, field)) for field in INCIDENT_FIELDS}
+                current["service_ids"] = sorted(
+                    int(service_id) for service_id in str(row.service_ids or "").split(",") if service_id
+                )
+                current["updates"] = []
+            if row.update_id is not None:
+                current["updates"].append({
+                    field: _json_value(getattr(row, f"update_{field}")) for field in UPDATE_FIELDS
+                })
+    if current is not None:
+        yield current
+
+
+def incident_history_ndjson(records: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Encode incident records as newline-delimited JSON.
+    """
+    for record in records:
+        yield (json.dumps(record, separators=(",", ":")) + "\n").encode()
+
+
+def incident_history_csv(records: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Encode incident records as CSV, one row per incident. Service IDs are
+    separated by semicolons and updates are embedded as a JSON array.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for record in records:
+        writer.writerow({
+            **record,
+            "service_ids": ";".join(str(service_id) for service_id in record["service_ids"]),
+            "updates": json.dumps(record["updates"], separators=(",", ":")),
+        })
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
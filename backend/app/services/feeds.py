@@ -0,0 +1,262 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from jinja2 import Environment, select_autoescape
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import OrganizationChange, on_organization_change
+from app.db.session import SessionLocal
+from app.services.incident import (
+    get_incidents_with_public_updates,
+    get_recent_incidents_by_organization,
+)
+from app.services.organization import get_organization_by_id
+from app.utils.helpers import get_status_display_name
+
+
+logger = logging.getLogger(__name__)
+
+FEED_FORMATS = ("rss", "atom")
+
+RSS_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+<channel>
+    <title>{{ organization.name }} Status</title>
+    <link>{{ page_url }}</link>
+    <description>Incidents and updates for {{ organization.name }}</description>
+    <atom:link href="{{ feed_url }}.rss" rel="self" type="application/rss+xml"/>
+    <lastBuildDate>{{ updated | rfc822 }}</lastBuildDate>
+{%- for entry in entries %}
+    <item>
+        <title>{{ entry.title }}</title>
+        <link>{{ entry.link }}</link>
+        <guid isPermaLink="false">{{ entry.id }}</guid>
+        <pubDate>{{ entry.published | rfc822 }}</pubDate>
+        <description>{{ entry.summary }}</description>
+    </item>
+{%- endfor %}
+</channel>
+</rss>
+"""
+
+ATOM_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+    <id>{{ feed_url }}</id>
+    <title>{{ organization.name }} Status</title>
+    <link href="{{ page_url }}"/>
+    <link href="{{ feed_url }}.atom" rel="self" type="application/atom+xml"/>
+    <updated>{{ updated | rfc3339 }}</updated>
+{%- for entry in entries %}
+    <entry>
+        <id>{{ feed_url }}/{{ entry.id }}</id>
+        <title>{{ entry.title }}</title>
+        <link href="{{ entry.link }}"/>
+        <updated>{{ entry.published | rfc3339 }}</updated>
+        <summary>{{ entry.summary }}</summary>
+    </entry>
+{%- endfor %}
+</feed>
+"""
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+_environment = Environment(autoescape=select_autoescape(default=True))
+_environment.filters["rfc822"] = lambda value: _utc(value).strftime("%a, %d %b %Y %H:%M:%S +0000")
+_environment.filters["rfc3339"] = lambda value: _utc(value).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+_templates = {
+    "rss": _environment.from_string(RSS_TEMPLATE),
+    "atom": _environment.from_string(ATOM_TEMPLATE),
+}
+
+
+def status_page_url(slug: str) -> str:
+    """
+    Get the URL of an organization's page on the public status site.
+    """
+    return f"{settings.PUBLIC_STATUS_PAGE_URL.rstrip('/')}/status/{slug}"
+
+
+def incident_page_url(incident_id: int) -> str:
+    """
+    Get the URL of an incident's page on the public status site, which is the
+    page the status page itself links incidents to.
+    """
+    return f"{settings.PUBLIC_STATUS_PAGE_URL.rstrip('/')}/incidents/{incident_id}"
+
+
+def render_feeds(db: Session, *, organization_id: int) -> Optional[Dict[str, bytes]]:
+    """
+    Render the RSS and Atom feeds of an organization's recent incidents and
+    their public updates. Returns None if the organization does not exist.
+    """
+    organization = get_organization_by_id(db, id=organization_id)
+    if not organization:
+        return None
+
+    recent = get_recent_incidents_by_organization(
+        db, organization_id=organization_id, limit=settings.FEED_MAX_INCIDENTS
+    )
+    incidents = get_incidents_with_public_updates(
+        db,
+        organization_id=organization_id,
+        incident_ids=[incident.id for incident in recent],
+    )
+
+    base_url = settings.PUBLIC_STATUS_PAGE_URL.rstrip("/")
+    entries: List[dict] = []
+    for incident, updates in incidents:
+        link = incident_page_url(incident.id)
+        entries.append({
+            "id": f"incident-{incident.id}",
+            "title": incident.title,
+            "link": link,
+            "published": incident.started_at,
+            "summary": (
+                f"{get_status_display_name(incident.impact.value)} impact, "
+                f"{get_status_display_name(incident.status.value)}"
+            ),
+        })
+        for update in updates:
+            entries.append({
+                "id": f"incident-{incident.id}-update-{update.id}",
+                "title": f"{incident.title}: {get_status_display_name(update.status.value)}",
+                "link": link,
+                "published": update.created_at,
+                "summary": update.message,
+            })
+    entries.sort(key=lambda entry: _utc(entry["published"]), reverse=True)
+
+    context = {
+        "organization": organization,
+        "page_url": status_page_url(organization.slug),
+        "feed_url": f"{base_url}/public/{organization.slug}/feed",
+        "updated": entries[0]["published"] if entries else organization.created_at or datetime.utcnow(),
+        "entries": entries,
+    }
+    return {
+        feed_format: template.render(**context).encode("utf-8")
+        for feed_format, template in _templates.items()
+    }
+
+
+class FeedCache:
+    """
+    Pre-rendered feeds per organization, for the `max_entries` organizations
+    requested most recently.
+
+    `render` renders all documents of an organization at once, keyed e.g. by
+    feed format, or returns None if the organization does not exist. Feeds are
+    re-rendered on a background thread when scheduled after a change. A
+    request arriving before that render is done renders in the request
+    instead, so a change is never answered with the documents from before it,
+    which the response cache would keep under the new content version. Feeds
+    requested more than `ttl` seconds after they were rendered are re-rendered
+    in the background to pick up writes made by other processes; until then
+    polls keep getting the previous documents.
+    """
+
+    def __init__(
+        self,
+        render: Callable[..., Optional[Dict[Any, bytes]]] = render_feeds,
+        *,
+        name: str = "feed-renderer",
+        ttl: int = settings.FEED_CACHE_TTL_SECONDS,
+        max_entries: int = settings.FEED_CACHE_SIZE,
+    ):
+        self.render = render
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Map organization_id -> (loaded_at, generation, documents)
+        self._feeds: "OrderedDict[int, tuple]" = OrderedDict()
+        # Bumped per organization on every change so in-flight renders can detect races
+        self._generations: Dict[int, int] = {}
+        self._pending: Set[int] = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, organization_id: int, key: Any) -> Optional[bytes]:
+        with self._lock:
+            generation = self._generations.get(organization_id, 0)
+            entry = self._feeds.get(organization_id)
+            if entry is not None:
+                self._feeds.move_to_end(organization_id)
+        if entry is None or entry[1] != generation:
+            # Never rendered, or changed since
+            feeds = self.render(db, organization_id=organization_id)
+            if feeds is None:
+                return None
+            self._store(organization_id, feeds, generation)
+            return feeds.get(key)
+        loaded_at, _, feeds = entry
+        if time.monotonic() - loaded_at >= self.ttl:
+            self._submit(organization_id)
+        return feeds.get(key)
+
+    def _store(self, organization_id: int, feeds: Dict[Any, bytes], generation: int) -> None:
+        with self._lock:
+            if self._generations.get(organization_id, 0) != generation:
+                return
+            self._feeds[organization_id] = (time.monotonic(), generation, feeds)
+            self._feeds.move_to_end(organization_id)
+            while len(self._feeds) > self.max_entries:
+                self._feeds.popitem(last=False)
+
+    def schedule(self, organization_id: int) -> None:
+        """
+        Re-render an organization's feeds in the background, if they were ever requested.
+        """
+        with self._lock:
+            self._generations[organization_id] = self._generations.get(organization_id, 0) + 1
+        self._submit(organization_id)
+
+    def _submit(self, organization_id: int) -> None:
+        with self._lock:
+            if organization_id not in self._feeds or organization_id in self._pending:
+                return
+            self._pending.add(organization_id)
+        self._executor.submit(self._render, organization_id)
+
+    def _render(self, organization_id: int) -> None:
+        with self._lock:
+            self._pending.discard(organization_id)
+            generation = self._generations.get(organization_id, 0)
+        db = SessionLocal()
+        try:
+            feeds = self.render(db, organization_id=organization_id)
+        except Exception:
+            logger.exception("Rendering feeds of organization %s failed", organization_id)
+            return
+        finally:
+            db.close()
+        if feeds is None:
+            self.forget(organization_id)
+        else:
+            self._store(organization_id, feeds, generation)
+
+    def forget(self, organization_id: int) -> None:
+        with self._lock:
+            self._feeds.pop(organization_id, None)
+            self._generations[organization_id] = self._generations.get(organization_id, 0) + 1
+
+
+feed_cache = FeedCache()
+
+
+@on_organization_change
+def _rerender_feeds(change: OrganizationChange) -> None:
+    if change.entity == "organization" and change.action == "deleted":
+        feed_cache.forget(change.organization_id)
+    elif change.entity in ("incident", "organization"):
+        feed_cache.schedule(change.organization_id)
@@ -1,13 +1,17 @@
-from typing import List, Optional, Any, Dict, Union
+from typing import List, Optional, Any, Dict, Tuple, Union
 from datetime import datetime
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.models.incident import Incident, IncidentUpdate, IncidentStatus
+from app.core.events import organization_changed
+from app.services.changes import record_change
+from app.models.incident import Incident, IncidentUpdate, IncidentStatus, IncidentType, incident_service
 from app.models.service import Service
 from app.models.organization import Organization
 from app.schemas.incident import IncidentCreate, IncidentUpdate as IncidentUpdateSchema
 from app.schemas.incident import IncidentUpdateCreate
+from app.utils.fieldsets import load_fields
 
 
 def get_incident_by_id(db: Session, *, id: int) -> Optional[Incident]:
@@ -56,16 +60,76 @@ def get_incident_by_id_public(
     return incident
 
 
+def get_incidents_with_public_updates(
+    db: Session, *, organization_id: int, incident_ids: Optional[List[int]] = None
+) -> List[Tuple[Incident, List[IncidentUpdate]]]:
+    """
+    Get incidents of an organization together with their public updates,
+    using a fixed number of queries. All incidents are returned unless
+    `incident_ids` is given.
+    """
+    incidents_query = (
+        db.query(Incident)
+        .filter(Incident.organization_id == organization_id)
+        .options(selectinload(Incident.services))
+    )
+    updates_query = (
+        db.query(IncidentUpdate)
+        .join(Incident)
+        .filter(
+            Incident.organization_id == organization_id,
+            IncidentUpdate.is_public == True
+        )
+        .order_by(IncidentUpdate.created_at.desc())
+    )
+    if incident_ids is not None:
+        incidents_query = incidents_query.filter(Incident.id.in_(incident_ids))
+        updates_query = updates_query.filter(IncidentUpdate.incident_id.in_(incident_ids))
+    
+    updates: Dict[int, List[IncidentUpdate]] = {}
+    for update in updates_query.all():
+        updates.setdefault(update.incident_id, []).append(update)
+    
+    return [
+        (incident, updates.get(incident.id, []))
+        for incident in incidents_query.all()
+    ]
+
+
+def _before_incident(after: Tuple[datetime, int]):
+    """
+    Keyset condition for incidents that sort after `after` in
+    (started_at, id) descending order.
+    """
+    started_at, id = after
+    return or_(
+        Incident.started_at < started_at,
+        and_(Incident.started_at == started_at, Incident.id < id),
+    )
+
+
 def get_incidents_by_organization(
-    db: Session, *, organization_id: int, skip: int = 0, limit: int = 100
+    db: Session,
+    *,
+    organization_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, int]] = None,
+    fields: Optional[List[str]] = None,
 ) -> List[Incident]:
     """
-    Get all incidents for a specific organization.
+    Get all incidents for a specific organization, newest first. Pass the
+    (started_at, id) of the last incident seen as `after` to get the next page,
+    and `fields` to load only those columns.
     """
+    query = db.query(Incident).filter(Incident.organization_id == organization_id)
+    if after is not None:
+        query = query.filter(_before_incident(after))
+    if fields:
+        query = query.options(load_fields(Incident, fields, "started_at"))
     return (
-        db.query(Incident)
-        .filter(Incident.organization_id == organization_id)
-        .order_by(Incident.started_at.desc())
+        query
+        .order_by(Incident.started_at.desc(), Incident.id.desc())
         .offset(skip)
         .limit(limit)
         .all()
@@ -73,18 +137,31 @@ def get_incidents_by_organization(
 
 
 def get_active_incidents_by_organization(
-    db: Session, *, organization_id: int, skip: int = 0, limit: int = 100
+    db: Session,
+    *,
+    organization_id: int,
+    skip: int = 0,
+    limit: Optional[int] = 100,
+    after: Optional[Tuple[datetime, int]] = None,
+    fields: Optional[List[str]] = None,
 ) -> List[Incident]:
     """
-    Get active (non-resolved) incidents for a specific organization.
+    Get active (non-resolved) incidents for a specific organization, newest
+    first. Pass the (started_at, id) of the last incident seen as `after` to
+    get the next page, `fields` to load only those columns, and a `limit` of
+    None to get all of them.
     """
+    query = db.query(Incident).filter(
+        Incident.organization_id == organization_id,
+        Incident.status != IncidentStatus.RESOLVED
+    )
+    if after is not None:
+        query = query.filter(_before_incident(after))
+    if fields:
+        query = query.options(load_fields(Incident, fields, "started_at"))
     return (
-        db.query(Incident)
-        .filter(
-            Incident.organization_id == organization_id,
-            Incident.status != IncidentStatus.RESOLVED
-        )
-        .order_by(Incident.started_at.desc())
+        query
+        .order_by(Incident.started_at.desc(), Incident.id.desc())
         .offset(skip)
         .limit(limit)
         .all()
@@ -127,6 +204,121 @@ def get_recent_incidents_by_organization_slug(
     )
 
 
+def get_recent_incidents_by_organization(
+    db: Session, *, organization_id: int, limit: int = 10, fields: Optional[List[str]] = None
+) -> List[Incident]:
+    """
+    Get recent incidents (including resolved) for a specific organization.
+    Pass `fields` to load only those columns.
+    """
+    query = db.query(Incident).filter(Incident.organization_id == organization_id)
+    if fields:
+        query = query.options(load_fields(Incident, fields))
+    return (
+        query
+        .order_by(Incident.started_at.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def _maintenance_since(db: Session, since: datetime):
+    """
+    Query of the scheduled maintenances that are upcoming, in progress or
+    ended after `since`, with their services, by start time.
+    """
+    ended_at = func.coalesce(Incident.scheduled_end_time, Incident.resolved_at)
+    return (
+        db.query(Incident)
+        .filter(
+            Incident.type == IncidentType.MAINTENANCE,
+            or_(ended_at.is_(None), ended_at >= since),
+        )
+        .options(selectinload(Incident.services))
+        .order_by(func.coalesce(Incident.scheduled_start_time, Incident.started_at), Incident.id)
+    )
+
+
+def get_maintenance_incidents_by_organization(
+    db: Session, *, organization_id: int, since: datetime
+) -> List[Incident]:
+    """
+    Get the scheduled maintenances of an organization that are upcoming, in
+    progress or ended after `since`, with their services, by start time.
+    """
+    return (
+        _maintenance_since(db, since)
+        .filter(Incident.organization_id == organization_id)
+        .all()
+    )
+
+
+def get_maintenance_incidents_for_organizations(
+    db: Session, *, since: datetime, organization_ids: Optional[List[int]] = None
+) -> List[Incident]:
+    """
+    Same as get_maintenance_incidents_by_organization, for several
+    organizations at once, or for all of them if `organization_ids` is None.
+    """
+    query = _maintenance_since(db, since)
+    if organization_ids is not None:
+        query = query.filter(Incident.organization_id.in_(organization_ids))
+    return query.all()
+
+
+def get_service_ids_by_incident(
+    db: Session, *, incident_ids: List[int]
+) -> Dict[int, List[int]]:
+    """
+    Get the affected service IDs for several incidents in a single query.
+    """
+    if not incident_ids:
+        return {}
+    
+    rows = db.execute(
+        select(incident_service.c.incident_id, incident_service.c.service_id)
+        .where(incident_service.c.incident_id.in_(incident_ids))
+    ).all()
+    
+    service_ids: Dict[int, List[int]] = {}
+    for incident_id, service_id in rows:
+        service_ids.setdefault(incident_id, []).append(service_id)
+    return service_ids
+
+
+def count_incidents_by_status(
+    db: Session, *, organization_id: int
+) -> Dict[IncidentStatus, int]:
+    """
+    Count the incidents of an organization grouped by status.
+    """
+    rows = (
+        db.query(Incident.status, func.count(Incident.id))
+        .filter(Incident.organization_id == organization_id)
+        .group_by(Incident.status)
+        .all()
+    )
+    return {status: count for status, count in rows}
+
+
+def count_incidents_by_status_for_organizations(
+    db: Session, *, organization_ids: List[int]
+) -> Dict[int, Dict[IncidentStatus, int]]:
+    """
+    Count the incidents of several organizations grouped by organization and status.
+    """
+    rows = (
+        db.query(Incident.organization_id, Incident.status, func.count(Incident.id))
+        .filter(Incident.organization_id.in_(organization_ids))
+        .group_by(Incident.organization_id, Incident.status)
+        .all()
+    )
+    counts: Dict[int, Dict[IncidentStatus, int]] = {}
+    for organization_id, status, count in rows:
+        counts.setdefault(organization_id, {})[status] = count
+    return counts
+
+
 def create_incident(
     db: Session, *, obj_in: IncidentCreate, user_id: int
 ) -> Incident:
@@ -171,8 +363,23 @@ def create_incident(
         is_public=True,
     )
     db.add(initial_update)
+    db.flush()
+    record_change(
+        db, organization_id=db_obj.organization_id, entity="incident", entity_id=db_obj.id, action="created"
+    )
+    record_change(
+        db, organization_id=db_obj.organization_id, entity="update", entity_id=initial_update.id, action="created"
+    )
     db.commit()
     
+    organization_changed(
+        db_obj.organization_id,
+        entity="incident",
+        action="created",
+        entity_id=db_obj.id,
+        status=db_obj.status,
+        maintenance=db_obj.type == IncidentType.MAINTENANCE,
+    )
     return db_obj
 
 
@@ -190,6 +397,9 @@ def update_incident(
     # Handle service_ids separately
     service_ids = update_data.pop("service_ids", None)
     
+    previous_status = db_obj.status
+    previous_type = db_obj.type
+    
     # Update fields
     for field in update_data:
         setattr(db_obj, field, update_data[field])
@@ -207,8 +417,20 @@ def update_incident(
         db_obj.services = services
     
     db.add(db_obj)
+    record_change(
+        db, organization_id=db_obj.organization_id, entity="incident", entity_id=db_obj.id, action="updated"
+    )
     db.commit()
     db.refresh(db_obj)
+    organization_changed(
+        db_obj.organization_id,
+        entity="incident",
+        action="updated",
+        entity_id=db_obj.id,
+        previous_status=previous_status,
+        status=db_obj.status,
+        maintenance=IncidentType.MAINTENANCE in (previous_type, db_obj.type),
+    )
     return db_obj
 
 
@@ -218,6 +440,7 @@ def update_incident_status(
     """
     Update just the status of an incident.
     """
+    previous_status = db_obj.status
     db_obj.status = status
     
     # If status is changing to RESOLVED, set resolved_at time
@@ -225,8 +448,20 @@ def update_incident_status(
         db_obj.resolved_at = resolved_at
     
     db.add(db_obj)
+    record_change(
+        db, organization_id=db_obj.organization_id, entity="incident", entity_id=db_obj.id, action="updated"
+    )
     db.commit()
     db.refresh(db_obj)
+    organization_changed(
+        db_obj.organization_id,
+        entity="incident",
+        action="updated",
+        entity_id=db_obj.id,
+        previous_status=previous_status,
+        status=db_obj.status,
+        maintenance=db_obj.type == IncidentType.MAINTENANCE,
+    )
     return db_obj
 
 
@@ -246,6 +481,8 @@ def add_incident_update(
     )
     db.add(incident_update)
     
+    previous_status = incident.status
+    
     # Update the incident status if it's changing
     if update_in.status != incident.status:
         incident.status = update_in.status
@@ -255,8 +492,24 @@ def add_incident_update(
             incident.resolved_at = datetime.now()
     
     db.add(incident)
+    db.flush()
+    record_change(
+        db, organization_id=incident.organization_id, entity="update", entity_id=incident_update.id, action="created"
+    )
+    record_change(
+        db, organization_id=incident.organization_id, entity="incident", entity_id=incident.id, action="updated"
+    )
     db.commit()
     db.refresh(incident)
+    organization_changed(
+        incident.organization_id,
+        entity="incident",
+        action="updated",
+        entity_id=incident.id,
+        previous_status=previous_status,
+        status=incident.status,
+        maintenance=incident.type == IncidentType.MAINTENANCE,
+    )
     
     # Re-fetch the incident with all details
     return get_incident_by_id(db, id=incident.id)
@@ -270,6 +523,18 @@ def delete_incident(db: Session, *, id: int) -> Incident:
     if not obj:
         raise ValueError("Incident not found")
     
+    organization_id = obj.organization_id
+    previous_status = obj.status
+    maintenance = obj.type == IncidentType.MAINTENANCE
     db.delete(obj)
+    record_change(db, organization_id=organization_id, entity="incident", entity_id=id, action="deleted")
     db.commit()
+    organization_changed(
+        organization_id,
+        entity="incident",
+        action="deleted",
+        entity_id=id,
+        previous_status=previous_status,
+        maintenance=maintenance,
+    )
     return obj
\ No newline at end of file
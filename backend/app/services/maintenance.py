@@ -0,0 +1,251 @@
+import bisect
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import OrganizationChange, on_organization_change
+from app.db.session import SessionLocal
+from app.models.incident import Incident, IncidentStatus
+from app.schemas.incident import MaintenanceWindow
+from app.services.incident import (
+    get_maintenance_incidents_by_organization,
+    get_maintenance_incidents_for_organizations,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# End of maintenances that have neither a scheduled end nor been resolved
+FOREVER = datetime.max.replace(tzinfo=timezone.utc)
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _end(window: MaintenanceWindow) -> datetime:
+    return window.ends_at or FOREVER
+
+
+def maintenance_window(incident: Incident) -> MaintenanceWindow:
+    """
+    Get the window of a maintenance incident: from its scheduled start until
+    it was resolved, or else until its scheduled end.
+    """
+    starts_at = _utc(incident.scheduled_start_time or incident.started_at)
+    if incident.status == IncidentStatus.RESOLVED:
+        # Status changes don't always record when the incident was resolved
+        ends_at = _utc(incident.resolved_at or incident.updated_at or starts_at)
+    elif incident.scheduled_end_time:
+        ends_at = _utc(incident.scheduled_end_time)
+    else:
+        ends_at = None
+    return MaintenanceWindow(
+        id=incident.id,
+        title=incident.title,
+        status=incident.status,
+        impact=incident.impact,
+        starts_at=starts_at,
+        ends_at=max(ends_at, starts_at) if ends_at else None,
+        service_ids=sorted(service.id for service in incident.services),
+    )
+
+
+class _Node:
+    """
+    Node of a centered interval tree: the windows containing `center`, sorted
+    by start and by end, and subtrees of the windows entirely before and
+    entirely after it.
+    """
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, windows: List[MaintenanceWindow]):
+        # Centering on a start guarantees that window stays here, so every
+        # subtree is smaller than its parent
+        starts = sorted(window.starts_at for window in windows)
+        self.center = starts[len(starts) // 2]
+        here, before, after = [], [], []
+        for window in windows:
+            if _end(window) <= self.center:
+                before.append(window)
+            elif window.starts_at > self.center:
+                after.append(window)
+            else:
+                here.append(window)
+        self.by_start = sorted(here, key=lambda window: window.starts_at)
+        self.by_end = sorted(here, key=_end, reverse=True)
+        self.left = _Node(before) if before else None
+        self.right = _Node(after) if after else None
+
+
+class MaintenanceTree:
+    """
+    Immutable interval index of one organization's maintenance windows, each
+    taken as [starts_at, ends_at).
+
+    Windows containing a point are found through a centered interval tree,
+    windows starting in a range through a list sorted by start, both in
+    O(log n + k) for k results. Windows overlapping a range are those
+    containing its start plus those starting inside it.
+    """
+
+    def __init__(self, windows: Iterable[MaintenanceWindow]):
+        self.windows = sorted(windows, key=lambda window: (window.starts_at, window.id))
+        self._starts = [window.starts_at for window in self.windows]
+        # Empty windows contain no point, and would never leave a subtree
+        nonempty = [window for window in self.windows if _end(window) > window.starts_at]
+        self._root = _Node(nonempty) if nonempty else None
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def at(self, moment: datetime) -> List[MaintenanceWindow]:
+        """
+        Get the windows in progress at `moment`, by start.
+        """
+        moment = _utc(moment)
+        found = []
+        node = self._root
+        while node is not None:
+            if moment < node.center:
+                for window in node.by_start:
+                    if window.starts_at > moment:
+                        break
+                    found.append(window)
+                node = node.left
+            else:
+                for window in node.by_end:
+                    if _end(window) <= moment:
+                        break
+                    found.append(window)
+                node = node.right if moment > node.center else None
+        found.sort(key=lambda window: (window.starts_at, window.id))
+        return found
+
+    def starting(self, start: datetime, end: datetime) -> List[MaintenanceWindow]:
+        """
+        Get the windows starting after `start` and no later than `end`, by start.
+        """
+        low = bisect.bisect_right(self._starts, _utc(start))
+        high = bisect.bisect_right(self._starts, _utc(end))
+        return self.windows[low:high]
+
+    def overlapping(self, start: datetime, end: datetime) -> List[MaintenanceWindow]:
+        """
+        Get the windows overlapping [start, end), by start.
+        """
+        start, end = _utc(start), _utc(end)
+        inside = self.windows[
+            bisect.bisect_right(self._starts, start):bisect.bisect_left(self._starts, end)
+        ]
+        return self.at(start) + inside
+
+
+def affecting(
+    windows: List[MaintenanceWindow], service_ids: Optional[List[int]]
+) -> List[MaintenanceWindow]:
+    """
+    Keep the windows that affect any of `service_ids`, or all if None.
+    """
+    if not service_ids:
+        return windows
+    wanted = set(service_ids)
+    return [window for window in windows if wanted.intersection(window.service_ids)]
+
+
+class MaintenanceIndex:
+    """
+    Per-organization interval trees of the maintenance windows that are not
+    over yet.
+
+    All trees are built on startup with one query. A write to a maintenance
+    incident drops its organization's tree, which is rebuilt from the
+    database on the next lookup. Trees are also rebuilt after
+    `resync_interval` seconds, to pick up writes made by other processes and
+    let windows that ended since drop out.
+    """
+
+    def __init__(self, resync_interval: int):
+        self.resync_interval = resync_interval
+        self._trees: Dict[int, MaintenanceTree] = {}
+        # Bumped for an organization whenever it changes, so a load that
+        # overlapped a write can be discarded
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, organization_id: int) -> MaintenanceTree:
+        tree = self._trees.get(organization_id)
+        if tree is not None and time.monotonic() - tree.loaded_at < self.resync_interval:
+            return tree
+        generation = self._generations.get(organization_id, 0)
+        incidents = get_maintenance_incidents_by_organization(
+            db, organization_id=organization_id, since=datetime.utcnow()
+        )
+        tree = MaintenanceTree(maintenance_window(incident) for incident in incidents)
+        with self._lock:
+            if self._generations.get(organization_id, 0) == generation:
+                self._trees[organization_id] = tree
+        return tree
+
+    def load(self, db: Session) -> None:
+        """
+        Build the trees of all organizations with maintenances not over yet.
+        Trees of other organizations are loaded on their first lookup.
+        """
+        generations = dict(self._generations)
+        windows: Dict[int, List[MaintenanceWindow]] = {}
+        for incident in get_maintenance_incidents_for_organizations(db, since=datetime.utcnow()):
+            windows.setdefault(incident.organization_id, []).append(maintenance_window(incident))
+        trees = {
+            organization_id: MaintenanceTree(organization_windows)
+            for organization_id, organization_windows in windows.items()
+        }
+        with self._lock:
+            for organization_id, tree in trees.items():
+                if self._generations.get(organization_id, 0) == generations.get(organization_id, 0):
+                    self._trees[organization_id] = tree
+        logger.info(
+            f"Indexed {sum(len(tree) for tree in trees.values())} maintenance windows "
+            f"of {len(trees)} organizations"
+        )
+
+    def invalidate(self, organization_id: Optional[int] = None) -> None:
+        with self._lock:
+            if organization_id is None:
+                self._trees.clear()
+            else:
+                self._generations[organization_id] = self._generations.get(organization_id, 0) + 1
+                self._trees.pop(organization_id, None)
+
+
+maintenance_index = MaintenanceIndex(resync_interval=settings.MAINTENANCE_INDEX_RESYNC_SECONDS)
+
+
+def load_maintenance_index() -> None:
+    """
+    Build the maintenance index from the database, e.g. on startup.
+    """
+    db = SessionLocal()
+    try:
+        maintenance_index.load(db)
+    finally:
+        db.close()
+
+
+@on_organization_change
+def _update_maintenance_index(change: OrganizationChange) -> None:
+    if (
+        change.entity == "organization"
+        or (change.entity == "incident" and change.maintenance)
+        or (change.entity == "service" and change.action == "deleted")
+    ):
+        maintenance_index.invalidate(change.organization_id)
@@ -1,10 +1,18 @@
-from typing import List, Optional, Any, Dict, Union
+import secrets
+from datetime import datetime, timedelta
+from typing import List, Optional, Any, Dict, Tuple, Union
 
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.events import organization_changed
+from app.core.security import create_viewer_token
 from app.models.organization import Organization
+from app.models.service import ServiceStatusChange, ServiceUptimeDaily
 from app.models.user import User
 from app.schemas.organization import OrganizationCreate, OrganizationUpdate
+from app.utils.domains import txt_records
+from app.utils.helpers import reserved_hosts
 
 
 def get_organization_by_id(db: Session, *, id: int) -> Optional[Organization]:
@@ -30,6 +38,17 @@ def get_organizations(
     return db.query(Organization).offset(skip).limit(limit).all()
 
 
+def _check_custom_domain(db: Session, *, domain: str) -> None:
+    """
+    Make sure a custom domain is neither reserved nor used by another organization.
+    """
+    if domain in reserved_hosts():
+        raise ValueError("This domain is reserved")
+    existing = db.query(Organization.id).filter(Organization.custom_domain == domain).first()
+    if existing:
+        raise ValueError("Organization with this custom domain already exists")
+
+
 def create_organization(
     db: Session, *, obj_in: OrganizationCreate, user: User = None
 ) -> Organization:
@@ -41,16 +60,24 @@ def create_organization(
     if db_org:
         raise ValueError("Organization with this slug already exists")
     
+    if obj_in.custom_domain:
+        _check_custom_domain(db, domain=obj_in.custom_domain)
+    
     # Create organization
     db_obj = Organization(
         name=obj_in.name,
         slug=obj_in.slug,
         logo_url=obj_in.logo_url,
         website=obj_in.website,
+        custom_domain=obj_in.custom_domain,
+        custom_domain_token=secrets.token_urlsafe(24) if obj_in.custom_domain else None,
+        is_private=bool(obj_in.is_private),
+        viewer_key=secrets.token_urlsafe(32),
     )
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    organization_changed(db_obj.id, entity="organization", action="created", entity_id=db_obj.id)
     
     # If user provided, associate it with the new organization
     if user and not user.organization_id:
@@ -79,15 +106,84 @@ def update_organization(
         if existing:
             raise ValueError("Organization with this slug already exists")
     
+    if "custom_domain" in update_data and update_data["custom_domain"] != db_obj.custom_domain:
+        if update_data["custom_domain"]:
+            _check_custom_domain(db, domain=update_data["custom_domain"])
+        # A new domain has to be verified before it is served
+        db_obj.custom_domain_token = secrets.token_urlsafe(24) if update_data["custom_domain"] else None
+        db_obj.custom_domain_verified_at = None
+    
+    if "is_private" in update_data:
+        update_data["is_private"] = bool(update_data["is_private"])
+    
     for field in update_data:
         setattr(db_obj, field, update_data[field])
+    if not db_obj.viewer_key:
+        db_obj.viewer_key = secrets.token_urlsafe(32)
     
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    organization_changed(db_obj.id, entity="organization", action="updated", entity_id=db_obj.id)
+    return db_obj
+
+
+def custom_domain_txt_name(domain: str) -> str:
+    """
+    Get the DNS name of the TXT record verifying a custom domain.
+    """
+    return f"{settings.CUSTOM_DOMAIN_TXT_PREFIX}.{domain}"
+
+
+def verify_custom_domain(db: Session, *, db_obj: Organization) -> Organization:
+    """
+    Mark an organization's custom domain as verified if its TXT record holds
+    the organization's token, so that the domain starts being served.
+    """
+    if not db_obj.custom_domain or not db_obj.custom_domain_token:
+        raise ValueError("Organization has no custom domain")
+    if db_obj.custom_domain_verified_at is not None:
+        return db_obj
+    if db_obj.custom_domain_token not in txt_records(custom_domain_txt_name(db_obj.custom_domain)):
+        raise ValueError(
+            f"TXT record {custom_domain_txt_name(db_obj.custom_domain)} "
+            f"does not contain the verification token"
+        )
+    db_obj.custom_domain_verified_at = datetime.utcnow()
+    db.add(db_obj)
+    db.commit()
+    db.refresh(db_obj)
+    organization_changed(db_obj.id, entity="organization", action="updated", entity_id=db_obj.id)
+    return db_obj
+
+
+def rotate_viewer_key(db: Session, *, db_obj: Organization) -> Organization:
+    """
+    Replace an organization's viewer key, revoking all its viewer tokens.
+    """
+    db_obj.viewer_key = secrets.token_urlsafe(32)
+    db.add(db_obj)
+    db.commit()
+    db.refresh(db_obj)
+    organization_changed(db_obj.id, entity="organization", action="updated", entity_id=db_obj.id)
     return db_obj
 
 
+def issue_viewer_token(
+    db: Session, *, db_obj: Organization, expires_in_minutes: Optional[int] = None
+) -> Tuple[str, datetime]:
+    """
+    Create a viewer token for an organization's private status page. Returns
+    the token and when it expires.
+    """
+    if not db_obj.viewer_key:
+        db_obj = rotate_viewer_key(db, db_obj=db_obj)
+    expires_at = datetime.utcnow().replace(microsecond=0) + timedelta(
+        minutes=expires_in_minutes or settings.VIEWER_TOKEN_EXPIRE_MINUTES
+    )
+    return create_viewer_token(db_obj.id, db_obj.viewer_key, expires_at), expires_at
+
+
 def delete_organization(db: Session, *, id: int) -> Organization:
     """
     Delete an organization.
@@ -96,6 +192,11 @@ def delete_organization(db: Session, *, id: int) -> Organization:
     if not obj:
         raise ValueError("Organization not found")
     
+    # Status history and uptime rollups reference the organization directly,
+    # so they have to go before it
+    for model in (ServiceUptimeDaily, ServiceStatusChange):
+        db.query(model).filter(model.organization_id == id).delete(synchronize_session=False)
     db.delete(obj)
     db.commit()
+    organization_changed(id, entity="organization", action="deleted", entity_id=id)
     return obj
\ No newline at end of file
@@ -0,0 +1,230 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import OrganizationChange, on_organization_change
+from app.db.session import PublicSessionLocal
+from app.models.organization import Organization
+
+
+@dataclass(frozen=True)
+class ResolvedOrganization:
+    """
+    The fields of an organization needed to serve its public pages.
+    """
+
+    id: int
+    name: str
+    slug: str
+    logo_url: Optional[str]
+    website: Optional[str]
+    # Needed to check viewer tokens of private pages without a query
+    is_private: bool = False
+    viewer_key: Optional[str] = None
+
+
+class OrganizationResolver:
+    """
+    Bounded cache mapping slugs, or another unique column given as `field`,
+    to organizations. Organizations not matching the optional `where` clause
+    resolve as unknown.
+
+    Unknown slugs are remembered too, in a separate and shorter lived cache so
+    that probing random slugs neither reaches the database on every request
+    nor evicts real organizations. Organization writes in this process drop
+    the affected entries; the TTLs bound staleness for writes made elsewhere.
+    """
+
+    def __init__(
+        self, max_entries: int, ttl: int, negative_ttl: int, field: str = "slug", where=None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._column = getattr(Organization, field)
+        self._where = where
+        # Map slug -> (expires_at, organization)
+        self._found: "OrderedDict[str, tuple]" = OrderedDict()
+        # Map slug -> expires_at
+        self._missing: "OrderedDict[str, float]" = OrderedDict()
+        # Map organization_id -> slug it is cached under
+        self._slugs: Dict[int, str] = {}
+        # Bumped on every invalidation so in-flight lookups can detect races
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def cached(self, slug: str) -> tuple:
+        """
+        Get (hit, organization) for a slug from the cache.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._found.get(slug)
+            if entry is not None and entry[0] > now:
+                self._found.move_to_end(slug)
+                return True, entry[1]
+            expires_at = self._missing.get(slug)
+            if expires_at is not None and expires_at > now:
+                return True, None
+            return False, None
+
+    def _store(self, slug: str, organization: Optional[ResolvedOrganization], generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            now = time.monotonic()
+            if organization is None:
+                self._missing[slug] = now + self.negative_ttl
+                self._missing.move_to_end(slug)
+                while len(self._missing) > self.max_entries:
+                    self._missing.popitem(last=False)
+                return
+            self._found[slug] = (now + self.ttl, organization)
+            self._found.move_to_end(slug)
+            self._slugs[organization.id] = slug
+            while len(self._found) > self.max_entries:
+                _, (_, evicted) = self._found.popitem(last=False)
+                self._slugs.pop(evicted.id, None)
+
+    def resolve(self, db: Session, *, slug: str) -> Optional[ResolvedOrganization]:
+        """
+        Get the organization with the given slug, querying only on a cache miss.
+        """
+        hit, organization = self.cached(slug)
+        if hit:
+            return organization
+
+        generation = self._generation
+        row = (
+            db.query(
+                Organization.id,
+                Organization.name,
+                Organization.slug,
+                Organization.logo_url,
+                Organization.website,
+                Organization.is_private,
+                Organization.viewer_key,
+            )
+            .filter(self._column == slug, *self._conditions())
+            .first()
+        )
+        organization = ResolvedOrganization(*row) if row else None
+        self._store(slug, organization, generation)
+        return organization
+
+    def resolve_many(
+        self, db: Session, *, slugs: List[str]
+    ) -> Dict[str, Optional[ResolvedOrganization]]:
+        """
+        Resolve several slugs, querying all cache misses together.
+        """
+        result: Dict[str, Optional[ResolvedOrganization]] = {}
+        missing: List[str] = []
+        for slug in slugs:
+            hit, organization = self.cached(slug)
+            if hit:
+                result[slug] = organization
+            else:
+                missing.append(slug)
+        if not missing:
+            return result
+
+        generation = self._generation
+        rows = (
+            db.query(
+                Organization.id,
+                Organization.name,
+                Organization.slug,
+                Organization.logo_url,
+                Organization.website,
+                Organization.is_private,
+                Organization.viewer_key,
+                self._column.label("key"),
+            )
+            .filter(self._column.in_(missing), *self._conditions())
+            .all()
+        )
+        found = {row.key: ResolvedOrganization(*row[:7]) for row in rows}
+        for slug in missing:
+            result[slug] = found.get(slug)
+            self._store(slug, result[slug], generation)
+        return result
+
+    def _conditions(self) -> list:
+        return [self._where] if self._where is not None else []
+
+    def invalidate(self, organization_id: int) -> None:
+        """
+        Forget an organization and every unknown slug, one of which it may now use.
+        """
+        with self._lock:
+            self._generation += 1
+            slug = self._slugs.pop(organization_id, None)
+            if slug is not None:
+                self._found.pop(slug, None)
+            self._missing.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._found.clear()
+            self._missing.clear()
+            self._slugs.clear()
+
+
+organization_resolver = OrganizationResolver(
+    max_entries=settings.ORGANIZATION_RESOLVER_SIZE,
+    ttl=settings.ORGANIZATION_RESOLVER_TTL_SECONDS,
+    negative_ttl=settings.ORGANIZATION_RESOLVER_NEGATIVE_TTL_SECONDS,
+)
+
+
+# Custom domain -> organization, looked up from the Host header of public
+# requests. Domains are only served once their ownership is verified.
+domain_resolver = OrganizationResolver(
+    max_entries=settings.ORGANIZATION_RESOLVER_SIZE,
+    ttl=settings.ORGANIZATION_RESOLVER_TTL_SECONDS,
+    negative_ttl=settings.ORGANIZATION_RESOLVER_NEGATIVE_TTL_SECONDS,
+    field="custom_domain",
+    where=Organization.custom_domain_verified_at.isnot(None),
+)
+
+
+@on_organization_change
+def _invalidate_resolved_organization(change: OrganizationChange) -> None:
+    if change.entity == "organization":
+        organization_resolver.invalidate(change.organization_id)
+        domain_resolver.invalidate(change.organization_id)
+
+
+def resolve_organization(slug: str) -> Optional[ResolvedOrganization]:
+    """
+    Resolve a slug outside of a request session, opening one only on a cache miss.
+    """
+    hit, organization = organization_resolver.cached(slug)
+    if hit:
+        return organization
+    db = PublicSessionLocal()
+    try:
+        return organization_resolver.resolve(db, slug=slug)
+    finally:
+        db.close()
+
+
+def resolve_custom_domain(domain: str) -> Optional[ResolvedOrganization]:
+    """
+    Resolve a custom domain outside of a request session, opening one only on a cache miss.
+    """
+    hit, organization = domain_resolver.cached(domain)
+    if hit:
+        return organization
+    db = PublicSessionLocal()
+    try:
+        return domain_resolver.resolve(db, slug=domain)
+    finally:
+        db.close()
@@ -1,10 +1,20 @@
+import logging
 from typing import List, Optional, Any, Dict, Union
+from datetime import datetime
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.models.service import Service, ServiceStatus
+from app.core.events import organization_changed
+from app.services.changes import record_change
+from app.models.service import Service, ServiceStatus, ServiceStatusChange
 from app.models.organization import Organization
 from app.schemas.service import ServiceCreate, ServiceUpdate
+from app.services.uptime import refresh_uptime_rollups
+from app.utils.fieldsets import load_fields
+
+
+logger = logging.getLogger(__name__)
 
 
 def get_service_by_id(db: Session, *, id: int) -> Optional[Service]:
@@ -15,20 +25,47 @@ def get_service_by_id(db: Session, *, id: int) -> Optional[Service]:
 
 
 def get_services_by_organization(
-    db: Session, *, organization_id: int, skip: int = 0, limit: int = 100
+    db: Session,
+    *,
+    organization_id: int,
+    skip: int = 0,
+    limit: Optional[int] = 100,
+    after: Optional[int] = None,
+    fields: Optional[List[str]] = None,
 ) -> List[Service]:
     """
-    Get multiple services for a specific organization.
+    Get multiple services for a specific organization, ordered by ID. Pass the
+    ID of the last service seen as `after` to get the next page, `fields` to
+    load only those columns, and a `limit` of None to get all of them.
     """
+    query = db.query(Service).filter(Service.organization_id == organization_id)
+    if after is not None:
+        query = query.filter(Service.id > after)
+    if fields:
+        query = query.options(load_fields(Service, fields))
     return (
-        db.query(Service)
-        .filter(Service.organization_id == organization_id)
+        query
+        .order_by(Service.id)
         .offset(skip)
         .limit(limit)
         .all()
     )
 
 
+def get_service_statuses_by_organization(
+    db: Session, *, organization_id: int
+) -> List[Any]:
+    """
+    Get the ID, name and status of every service of an organization.
+    """
+    return (
+        db.query(Service.id, Service.name, Service.status)
+        .filter(Service.organization_id == organization_id)
+        .order_by(Service.id)
+        .all()
+    )
+
+
 def get_services_by_organization_slug(
     db: Session, *, org_slug: str, skip: int = 0, limit: int = 100
 ) -> List[Service]:
@@ -45,19 +82,107 @@ def get_services_by_organization_slug(
     )
 
 
+def count_services_by_status(
+    db: Session, *, organization_id: int
+) -> Dict[ServiceStatus, int]:
+    """
+    Count the services of an organization grouped by status.
+    """
+    rows = (
+        db.query(Service.status, func.count(Service.id))
+        .filter(Service.organization_id == organization_id)
+        .group_by(Service.status)
+        .all()
+    )
+    return {status: count for status, count in rows}
+
+
+def count_services_by_status_for_organizations(
+    db: Session, *, organization_ids: List[int]
+) -> Dict[int, Dict[ServiceStatus, int]]:
+    """
+    Count the services of several organizations grouped by organization and status.
+    """
+    rows = (
+        db.query(Service.organization_id, Service.status, func.count(Service.id))
+        .filter(Service.organization_id.in_(organization_ids))
+        .group_by(Service.organization_id, Service.status)
+        .all()
+    )
+    counts: Dict[int, Dict[ServiceStatus, int]] = {}
+    for organization_id, status, count in rows:
+        counts.setdefault(organization_id, {})[status] = count
+    return counts
+
+
+def _record_status_change(
+    db: Session,
+    *,
+    service: Service,
+    previous_status: Optional[ServiceStatus],
+    changed_at: Optional[datetime] = None,
+) -> None:
+    """
+    Append a status transition to the service's history. Times are taken from
+    the application's UTC clock, like uptime rollups, never from the
+    database's.
+    """
+    db.add(ServiceStatusChange(
+        service_id=service.id,
+        organization_id=service.organization_id,
+        status=service.status,
+        previous_status=previous_status,
+        changed_at=changed_at or datetime.utcnow(),
+    ))
+
+
+def _refresh_today_uptime(db: Session, *, service: Service) -> None:
+    """
+    Close today's uptime rollup at the moment the status changed. Runs after
+    the change is committed and published, and a failure only leaves today's
+    rollup behind until the next refresh, so it is logged rather than raised.
+    """
+    try:
+        refresh_uptime_rollups(
+            db,
+            organization_id=service.organization_id,
+            since=datetime.utcnow().date(),
+            service_ids=[service.id],
+        )
+    except Exception:
+        logger.exception("Refreshing uptime of service %s failed", service.id)
+        db.rollback()
+
+
 def create_service(db: Session, *, obj_in: ServiceCreate) -> Service:
     """
     Create a new service.
     """
+    # Uptime is tracked from created_at, so it comes from the same clock as
+    # status changes rather than the database's
+    created_at = datetime.utcnow()
     db_obj = Service(
         name=obj_in.name,
         description=obj_in.description,
         status=obj_in.status or ServiceStatus.OPERATIONAL,
         organization_id=obj_in.organization_id,
+        created_at=created_at,
     )
     db.add(db_obj)
+    db.flush()
+    _record_status_change(db, service=db_obj, previous_status=None, changed_at=created_at)
+    record_change(
+        db, organization_id=db_obj.organization_id, entity="service", entity_id=db_obj.id, action="created"
+    )
     db.commit()
     db.refresh(db_obj)
+    organization_changed(
+        db_obj.organization_id,
+        entity="service",
+        action="created",
+        entity_id=db_obj.id,
+        status=db_obj.status,
+    )
     return db_obj
 
 
@@ -72,13 +197,32 @@ def update_service(
     else:
         update_data = obj_in.model_dump(exclude_unset=True)
     
+    previous_status = db_obj.status
+    
     # Update fields
     for field in update_data:
         setattr(db_obj, field, update_data[field])
     
+    status_changed = db_obj.status != previous_status
+    if status_changed:
+        _record_status_change(db, service=db_obj, previous_status=previous_status)
+    
     db.add(db_obj)
+    record_change(
+        db, organization_id=db_obj.organization_id, entity="service", entity_id=db_obj.id, action="updated"
+    )
     db.commit()
     db.refresh(db_obj)
+    organization_changed(
+        db_obj.organization_id,
+        entity="service",
+        action="updated",
+        entity_id=db_obj.id,
+        previous_status=previous_status,
+        status=db_obj.status,
+    )
+    if status_changed:
+        _refresh_today_uptime(db, service=db_obj)
     return db_obj
 
 
@@ -88,10 +232,27 @@ def update_service_status(
     """
     Update just the status of a service.
     """
+    previous_status = db_obj.status
     db_obj.status = status
+    status_changed = db_obj.status != previous_status
+    if status_changed:
+        _record_status_change(db, service=db_obj, previous_status=previous_status)
     db.add(db_obj)
+    record_change(
+        db, organization_id=db_obj.organization_id, entity="service", entity_id=db_obj.id, action="updated"
+    )
     db.commit()
     db.refresh(db_obj)
+    organization_changed(
+        db_obj.organization_id,
+        entity="service",
+        action="updated",
+        entity_id=db_obj.id,
+        previous_status=previous_status,
+        status=db_obj.status,
+    )
+    if status_changed:
+        _refresh_today_uptime(db, service=db_obj)
     return db_obj
 
 
@@ -103,6 +264,16 @@ def delete_service(db: Session, *, id: int) -> Service:
     if not obj:
         raise ValueError("Service not found")
     
+    organization_id = obj.organization_id
+    previous_status = obj.status
     db.delete(obj)
+    record_change(db, organization_id=organization_id, entity="service", entity_id=id, action="deleted")
     db.commit()
+    organization_changed(
+        organization_id,
+        entity="service",
+        action="deleted",
+        entity_id=id,
+        previous_status=previous_status,
+    )
     return obj
\ No newline at end of file
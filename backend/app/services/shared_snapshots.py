@@ -0,0 +1,283 @@
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from app.core.config import settings
+from app.core.events import OrganizationChange, on_organization_change
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"STATSNAP"
+LAYOUT_VERSION = 1
+
+# magic, layout version, capacity, slot size, generation
+HEADER = struct.Struct("<8sIIIxxxxQ")
+GENERATION_OFFSET = 24
+GENERATION = struct.Struct("<Q")
+
+# organization_id (0 = empty), slot number + 1
+ORG_ENTRY = struct.Struct("<qI4x")
+
+# sequence, valid, organization_id, slug length, slug, payload length, written_at
+SLOT_HEADER = struct.Struct("<IIqH64sId")
+SEQUENCE = struct.Struct("<I")
+MAX_SLUG_LENGTH = 64
+
+# Room in a slot for the organization and its services, and for each listed
+# active incident with a title of up to 255 characters
+SNAPSHOT_BASE_SIZE = 8192
+SNAPSHOT_INCIDENT_SIZE = 640
+
+
+def _hash(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "little")
+
+
+def slot_size_for(active_incidents: int) -> int:
+    """
+    Get a slot size, in whole pages, that fits a snapshot listing
+    `active_incidents` incidents. The file is sparse, so unused room in slots
+    costs no memory.
+    """
+    size = SLOT_HEADER.size + SNAPSHOT_BASE_SIZE + active_incidents * SNAPSHOT_INCIDENT_SIZE
+    return -(-size // mmap.PAGESIZE) * mmap.PAGESIZE
+
+
+class SharedSnapshotStore:
+    """
+    Status snapshots in a memory-mapped file shared by all worker processes.
+
+    The file has a fixed layout: a header holding a global generation, an
+    open-addressing index from organization ID to slot, and `capacity` slots
+    of `slot_size` bytes addressed by slug hash, each holding one
+    organization's serialized snapshot. Readers take no lock: every slot has a
+    sequence number that writers make odd while they update it, and a read
+    that saw it change is retried. Writers serialize on an flock of the file.
+
+    Any write invalidates the organization's slot in every process at once. A
+    snapshot built by a reader is only stored if no invalidation happened
+    since it read the generation, so it cannot overwrite newer state.
+
+    The layout is part of the file name, so processes configured with another
+    capacity or slot size, e.g. during a rolling deploy, use a file of their
+    own instead of resizing one that others have mapped.
+    """
+
+    def __init__(self, path: str, capacity: int, slot_size: int):
+        self.path = f"{path}-v{LAYOUT_VERSION}-{capacity}x{slot_size}"
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self._index_offset = HEADER.size
+        self._slots_offset = self._index_offset + capacity * ORG_ENTRY.size
+        self._size = self._slots_offset + capacity * slot_size
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._open_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def _mapping(self) -> mmap.mmap:
+        if self._map is None:
+            with self._open_lock:
+                if self._map is None:
+                    self._open()
+        return self._map
+
+    def _open(self) -> None:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            expected = HEADER.pack(MAGIC, LAYOUT_VERSION, self.capacity, self.slot_size, 0)
+            size = os.fstat(fd).st_size
+            header = os.pread(fd, HEADER.size, 0)
+            if size == 0 or header == bytes(HEADER.size):
+                # New file, or one whose creator died before writing the
+                # header, so nobody has mapped it yet
+                os.ftruncate(fd, self._size)
+                os.pwrite(fd, expected, 0)
+                size, header = self._size, expected
+            matches = size == self._size and header[:GENERATION_OFFSET] == expected[:GENERATION_OFFSET]
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        if not matches:
+            os.close(fd)
+            raise RuntimeError(f"{self.path} is not a shared snapshot store of this layout")
+        self._fd = fd
+        self._map = mmap.mmap(fd, self._size)
+
+    @contextmanager
+    def _locked(self) -> Iterator[mmap.mmap]:
+        data = self._mapping()
+        with self._write_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield data
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @property
+    def generation(self) -> int:
+        return GENERATION.unpack_from(self._mapping(), GENERATION_OFFSET)[0]
+
+    def _bump_generation(self, data: mmap.mmap) -> None:
+        generation = GENERATION.unpack_from(data, GENERATION_OFFSET)[0]
+        GENERATION.pack_into(data, GENERATION_OFFSET, generation + 1)
+
+    def _slot_offset(self, slot: int) -> int:
+        return self._slots_offset + slot * self.slot_size
+
+    def _find_slot(self, data: mmap.mmap, slug: bytes) -> Tuple[Optional[int], bool]:
+        """
+        Get (slot, exists) for a slug: the slot holding it, or else the first
+        free slot on its probe sequence, or None if the table is full.
+        """
+        start = _hash(slug) % self.capacity
+        for probe in range(self.capacity):
+            slot = (start + probe) % self.capacity
+            _, _, _, slug_length, slot_slug, _, _ = SLOT_HEADER.unpack_from(
+                data, self._slot_offset(slot)
+            )
+            if slug_length == 0:
+                return slot, False
+            if slot_slug[:slug_length] == slug:
+                return slot, True
+        return None, False
+
+    def _find_org_entry(self, data: mmap.mmap, organization_id: int) -> Optional[int]:
+        """
+        Get the index entry of an organization, or the free entry to use for it.
+        """
+        start = _hash(organization_id.to_bytes(8, "little", signed=True)) % self.capacity
+        for probe in range(self.capacity):
+            entry = (start + probe) % self.capacity
+            entry_org_id, _ = ORG_ENTRY.unpack_from(data, self._index_offset + entry * ORG_ENTRY.size)
+            if entry_org_id in (0, organization_id):
+                return entry
+        return None
+
+    def _set_valid(self, data: mmap.mmap, slot: int, valid: bool) -> None:
+        offset = self._slot_offset(slot)
+        sequence = SEQUENCE.unpack_from(data, offset)[0]
+        SEQUENCE.pack_into(data, offset, sequence + 1)
+        struct.pack_into("<I", data, offset + 4, 1 if valid else 0)
+        SEQUENCE.pack_into(data, offset, sequence + 2)
+
+    def get(self, slug: str) -> Optional[Tuple[int, bytes]]:
+        """
+        Get (organization_id, payload) stored for a slug, without locking.
+        """
+        encoded = slug.encode("utf-8")
+        if len(encoded) > MAX_SLUG_LENGTH:
+            return None
+        data = self._mapping()
+        slot, exists = self._find_slot(data, encoded)
+        if not exists:
+            return None
+        offset = self._slot_offset(slot)
+        for _ in range(3):
+            before, valid, organization_id, slug_length, slot_slug, length, _ = (
+                SLOT_HEADER.unpack_from(data, offset)
+            )
+            if before % 2:
+                continue
+            start = offset + SLOT_HEADER.size
+            payload = data[start:start + length]
+            if SEQUENCE.unpack_from(data, offset)[0] != before:
+                continue
+            if not valid or slot_slug[:slug_length] != encoded:
+                return None
+            return organization_id, payload
+        return None
+
+    def fits(self, slug: str, payload: bytes) -> bool:
+        """
+        Check whether a slug and payload are small enough to be stored.
+        """
+        return (
+            len(slug.encode("utf-8")) <= MAX_SLUG_LENGTH
+            and SLOT_HEADER.size + len(payload) <= self.slot_size
+        )
+
+    def put(self, organization_id: int, slug: str, payload: bytes, generation: int) -> bool:
+        """
+        Store an organization's payload under its slug, unless something was
+        invalidated since `generation` was read or it does not `fit`. Returns
+        whether it was stored.
+        """
+        encoded = slug.encode("utf-8")
+        if not self.fits(slug, payload):
+            return False
+        with self._locked() as data:
+            if GENERATION.unpack_from(data, GENERATION_OFFSET)[0] != generation:
+                return False
+            slot, _ = self._find_slot(data, encoded)
+            entry = self._find_org_entry(data, organization_id)
+            if slot is None or entry is None:
+                # Full of organizations and slugs that are gone: start over
+                logger.warning("Shared snapshot store is full, clearing it")
+                self._clear(data)
+                return False
+
+            offset = self._slot_offset(slot)
+            sequence = SEQUENCE.unpack_from(data, offset)[0]
+            SEQUENCE.pack_into(data, offset, sequence + 1)
+            SLOT_HEADER.pack_into(
+                data, offset, sequence + 1, 1, organization_id, len(encoded), encoded,
+                len(payload), time.time(),
+            )
+            start = offset + SLOT_HEADER.size
+            data[start:start + len(payload)] = payload
+            SEQUENCE.pack_into(data, offset, sequence + 2)
+
+            # Point the organization at this slot, retiring the slot of its old slug
+            entry_offset = self._index_offset + entry * ORG_ENTRY.size
+            _, previous = ORG_ENTRY.unpack_from(data, entry_offset)
+            if previous and previous - 1 != slot:
+                self._set_valid(data, previous - 1, False)
+            ORG_ENTRY.pack_into(data, entry_offset, organization_id, slot + 1)
+            return True
+
+    def invalidate(self, organization_id: int) -> None:
+        """
+        Drop an organization's snapshot in every process.
+        """
+        with self._locked() as data:
+            self._bump_generation(data)
+            entry = self._find_org_entry(data, organization_id)
+            if entry is None:
+                return
+            entry_org_id, slot = ORG_ENTRY.unpack_from(data, self._index_offset + entry * ORG_ENTRY.size)
+            if entry_org_id == organization_id and slot:
+                self._set_valid(data, slot - 1, False)
+
+    def _clear(self, data: mmap.mmap) -> None:
+        generation = GENERATION.unpack_from(data, GENERATION_OFFSET)[0]
+        data[self._index_offset:self._size] = bytes(self._size - self._index_offset)
+        GENERATION.pack_into(data, GENERATION_OFFSET, generation + 1)
+
+    def clear(self) -> None:
+        with self._locked() as data:
+            self._clear(data)
+
+
+shared_snapshots = SharedSnapshotStore(
+    path=settings.SHARED_SNAPSHOTS_PATH,
+    capacity=settings.SHARED_SNAPSHOTS_CAPACITY,
+    slot_size=(
+        settings.SHARED_SNAPSHOTS_SLOT_SIZE
+        or slot_size_for(settings.STATUS_SNAPSHOT_MAX_ACTIVE_INCIDENTS)
+    ),
+)
+
+
+@on_organization_change
+def _invalidate_shared_snapshot(change: OrganizationChange) -> None:
+    if settings.SHARED_SNAPSHOTS_ENABLED:
+        shared_snapshots.invalidate(change.organization_id)
@@ -0,0 +1,286 @@
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import OrganizationChange, on_organization_change
+from app.schemas.incident import IncidentPublic
+from app.schemas.status import (
+    OrganizationPublic,
+    OrganizationStatusSummary,
+    ServiceWithActiveIncidents,
+    StatusBatch,
+    StatusBundle,
+)
+from app.models.incident import IncidentStatus
+from app.services.incident import (
+    count_incidents_by_status,
+    get_active_incidents_by_organization,
+    get_recent_incidents_by_organization,
+    get_service_ids_by_incident,
+)
+from app.services.resolver import ResolvedOrganization, organization_resolver
+from app.services.service import (
+    get_service_statuses_by_organization,
+    get_services_by_organization,
+)
+from app.services.shared_snapshots import shared_snapshots
+from app.services.status_index import get_status_counts, overall_status
+
+
+logger = logging.getLogger(__name__)
+
+
+class StatusSnapshotCache:
+    """
+    Per-organization cache of the public status snapshot.
+
+    Entries are keyed by slug and dropped whenever a write for the organization
+    is committed. The TTL only bounds staleness for writes made by other
+    processes.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        # Map slug -> (expires_at, snapshot)
+        self._snapshots: Dict[str, tuple] = {}
+        # Map organization_id -> slug the snapshot was stored under
+        self._slugs: Dict[int, str] = {}
+        # Bumped on every invalidation so in-flight builds can detect races
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, slug: str) -> Optional[Dict[str, Any]]:
+        entry = self._snapshots.get(slug)
+        if entry is None:
+            return None
+        expires_at, snapshot = entry
+        if expires_at < time.monotonic():
+            return None
+        return snapshot
+
+    def set(self, slug: str, snapshot: Dict[str, Any], generation: int) -> None:
+        """
+        Store a snapshot unless something was invalidated since `generation`
+        was read, in which case the snapshot may already be stale.
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._snapshots[slug] = (time.monotonic() + self.ttl, snapshot)
+            self._slugs[snapshot["organization_id"]] = slug
+
+    def invalidate(self, organization_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            slug = self._slugs.pop(organization_id, None)
+            if slug is not None:
+                self._snapshots.pop(slug, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._snapshots.clear()
+            self._slugs.clear()
+
+
+status_cache = StatusSnapshotCache(ttl=settings.STATUS_CACHE_TTL_SECONDS)
+
+
+@on_organization_change
+def _invalidate_status_snapshot(change: OrganizationChange) -> None:
+    status_cache.invalidate(change.organization_id)
+
+
+def build_status_snapshot(db: Session, *, org_slug: str) -> Optional[Dict[str, Any]]:
+    """
+    Build the public status snapshot for an organization from the database.
+
+    The status and incident count are derived from the rows fetched here, so
+    that the snapshot is consistent and can be shared with other workers.
+    """
+    organization = organization_resolver.resolve(db, slug=org_slug)
+    if not organization:
+        return None
+
+    active_incidents = get_active_incidents_by_organization(
+        db, organization_id=organization.id, limit=settings.STATUS_SNAPSHOT_MAX_ACTIVE_INCIDENTS
+    )
+    services = get_service_statuses_by_organization(db, organization_id=organization.id)
+
+    active_incidents_count = len(active_incidents)
+    if active_incidents_count >= settings.STATUS_SNAPSHOT_MAX_ACTIVE_INCIDENTS:
+        # Only the newest are listed; count the rest
+        counts = count_incidents_by_status(db, organization_id=organization.id)
+        active_incidents_count = sum(counts.values()) - counts.get(IncidentStatus.RESOLVED, 0)
+
+    return {
+        "organization_id": organization.id,
+        "organization": {
+            "name": organization.name,
+            "slug": organization.slug,
+            "logo_url": organization.logo_url,
+            "website": organization.website,
+        },
+        "status": overall_status(service.status for service in services).value,
+        "active_incidents_count": active_incidents_count,
+        "active_incidents": [
+            IncidentPublic.model_validate(incident).model_dump(mode="json")
+            for incident in active_incidents
+        ],
+        "services": {
+            service.id: {"name": service.name, "status": service.status.value}
+            for service in services
+        },
+    }
+
+
+def get_shared_status_snapshot(org_slug: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the snapshot of an organization from the store shared by all workers.
+    """
+    if not settings.SHARED_SNAPSHOTS_ENABLED:
+        return None
+    stored = shared_snapshots.get(org_slug)
+    if stored is None:
+        return None
+    snapshot = json.loads(stored[1])
+    # JSON object keys are strings
+    snapshot["services"] = {int(key): value for key, value in snapshot["services"].items()}
+    return snapshot
+
+
+def get_status_snapshot(db: Session, *, org_slug: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the public status snapshot for an organization, building it on a cache miss.
+
+    With shared snapshots, the snapshot built by whichever worker misses first
+    is stored for all of them. It is built from the database only, never from
+    this worker's counters, so it is as current as one built by the worker
+    that handled the write. Snapshots too large for a shared slot, or whose
+    store lost to a concurrent write, are cached by each worker instead.
+    """
+    if settings.SHARED_SNAPSHOTS_ENABLED:
+        snapshot = get_shared_status_snapshot(org_slug)
+        if snapshot is not None:
+            return snapshot
+
+    snapshot = status_cache.get(org_slug)
+    if snapshot is not None:
+        return snapshot
+
+    generation = status_cache.generation
+    shared_generation = shared_snapshots.generation if settings.SHARED_SNAPSHOTS_ENABLED else None
+    snapshot = build_status_snapshot(db, org_slug=org_slug)
+    if snapshot is None:
+        return None
+
+    if settings.SHARED_SNAPSHOTS_ENABLED:
+        payload = json.dumps(snapshot, separators=(",", ":")).encode("utf-8")
+        if not shared_snapshots.fits(org_slug, payload):
+            logger.warning(
+                "Status snapshot of %s is %s bytes, too large for a shared slot of %s bytes",
+                org_slug, len(payload), shared_snapshots.slot_size,
+            )
+        elif shared_snapshots.put(snapshot["organization_id"], org_slug, payload, shared_generation):
+            return snapshot
+    # Not shared, or the put lost to a write in any organization: keep it in
+    # this worker so the next request does not rebuild it
+    status_cache.set(org_slug, snapshot, generation)
+    return snapshot
+
+
+def get_status_batch(db: Session, *, slugs: List[str]) -> StatusBatch:
+    """
+    Get the overall status of many organizations at once. Slugs with a cached
+    snapshot are answered from it; the rest take at most three queries in
+    total, however many slugs there are.
+    """
+    slugs = list(dict.fromkeys(slugs))
+    # Private organizations are reported as not found
+    organizations = organization_resolver.resolve_many(db, slugs=slugs)
+    summaries: Dict[str, OrganizationStatusSummary] = {}
+    found: Dict[str, ResolvedOrganization] = {}
+    for slug, organization in organizations.items():
+        if organization is None or organization.is_private:
+            continue
+        snapshot = get_shared_status_snapshot(slug) or status_cache.get(slug)
+        if snapshot is None:
+            found[slug] = organization
+            continue
+        summaries[slug] = OrganizationStatusSummary(
+            slug=slug,
+            name=snapshot["organization"]["name"],
+            status=snapshot["status"],
+            active_incidents_count=snapshot["active_incidents_count"],
+        )
+
+    counts = get_status_counts(db, [organization.id for organization in found.values()])
+    for slug, organization in found.items():
+        summaries[slug] = OrganizationStatusSummary(
+            slug=slug,
+            name=organization.name,
+            status=counts[organization.id].overall_status,
+            active_incidents_count=counts[organization.id].active_incidents_count,
+        )
+
+    return StatusBatch(
+        statuses=[summaries[slug] for slug in slugs if slug in summaries],
+        not_found=[slug for slug in slugs if slug not in summaries],
+    )
+
+
+def build_status_bundle(
+    db: Session, *, org_slug: str, recent_limit: int = 10
+) -> Optional[StatusBundle]:
+    """
+    Build everything the public status page shows with a fixed number of
+    queries, regardless of how many services and incidents there are. All
+    services and active incidents are included: the page shows every one of
+    them, and the bundle has no way to page through the rest.
+    """
+    organization = organization_resolver.resolve(db, slug=org_slug)
+    if not organization:
+        return None
+
+    services = get_services_by_organization(db, organization_id=organization.id, limit=None)
+    active_incidents = get_active_incidents_by_organization(
+        db, organization_id=organization.id, limit=None
+    )
+    recent_incidents = get_recent_incidents_by_organization(
+        db, organization_id=organization.id, limit=recent_limit
+    )
+    service_ids_by_incident = get_service_ids_by_incident(
+        db, incident_ids=[incident.id for incident in active_incidents]
+    )
+
+    # Invert incident -> services into service -> active incidents
+    active_incident_ids: Dict[int, List[int]] = {}
+    for incident in active_incidents:
+        for service_id in service_ids_by_incident.get(incident.id, []):
+            active_incident_ids.setdefault(service_id, []).append(incident.id)
+
+    return StatusBundle(
+        organization=OrganizationPublic.model_validate(organization),
+        status=overall_status(service.status for service in services),
+        services=[
+            ServiceWithActiveIncidents.model_validate(service).model_copy(
+                update={"active_incident_ids": active_incident_ids.get(service.id, [])}
+            )
+            for service in services
+        ],
+        active_incidents=[
+            IncidentPublic.model_validate(incident) for incident in active_incidents
+        ],
+        recent_incidents=[
+            IncidentPublic.model_validate(incident) for incident in recent_incidents
+        ],
+    )
@@ -0,0 +1,77 @@
+from typing import Dict, Iterable
+
+from sqlalchemy.orm import Session
+
+from app.models.incident import IncidentStatus
+from app.models.service import ServiceStatus
+from app.services.incident import count_incidents_by_status_for_organizations
+from app.services.service import count_services_by_status_for_organizations
+
+
+# Service statuses ordered from most to least severe
+STATUS_SEVERITY = [
+    ServiceStatus.MAJOR_OUTAGE,
+    ServiceStatus.PARTIAL_OUTAGE,
+    ServiceStatus.DEGRADED_PERFORMANCE,
+    ServiceStatus.MAINTENANCE,
+    ServiceStatus.OPERATIONAL,
+]
+_SEVERITIES = {status: severity for severity, status in enumerate(STATUS_SEVERITY)}
+
+
+def overall_status(statuses: Iterable[ServiceStatus]) -> ServiceStatus:
+    """
+    Get the most severe of the given service statuses.
+    """
+    severities = [_SEVERITIES[status] for status in statuses]
+    return STATUS_SEVERITY[min(severities)] if severities else ServiceStatus.OPERATIONAL
+
+
+class OrganizationCounts:
+    """
+    Number of services per `ServiceStatus` and incidents per `IncidentStatus`
+    for one organization.
+    """
+
+    __slots__ = ("services", "incidents")
+
+    def __init__(self, services: Dict[ServiceStatus, int], incidents: Dict[IncidentStatus, int]):
+        self.services = services
+        self.incidents = incidents
+
+    @property
+    def overall_status(self) -> ServiceStatus:
+        return overall_status(status for status, count in self.services.items() if count > 0)
+
+    @property
+    def active_incidents_count(self) -> int:
+        return sum(self.incidents.values()) - self.incidents.get(IncidentStatus.RESOLVED, 0)
+
+
+def get_status_counts(
+    db: Session, organization_ids: Iterable[int]
+) -> Dict[int, OrganizationCounts]:
+    """
+    Count the services and incidents of several organizations by status with
+    two grouped COUNT queries.
+
+    Counts are always read from the database rather than kept up to date from
+    write events, which only reach the process that made the write, so every
+    worker reports the same status.
+    """
+    organization_ids = list(organization_ids)
+    if not organization_ids:
+        return {}
+    service_counts = count_services_by_status_for_organizations(
+        db, organization_ids=organization_ids
+    )
+    incident_counts = count_incidents_by_status_for_organizations(
+        db, organization_ids=organization_ids
+    )
+    return {
+        organization_id: OrganizationCounts(
+            service_counts.get(organization_id, {}),
+            incident_counts.get(organization_id, {}),
+        )
+        for organization_id in organization_ids
+    }
@@ -0,0 +1,413 @@
+import logging
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.organization import Organization
+from app.models.service import (
+    Service,
+    ServiceStatus,
+    ServiceStatusChange,
+    ServiceUptimeDaily,
+)
+
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+
+# Longest history the uptime endpoints serve, in days
+UPTIME_MAX_DAYS = 365
+
+# Share of time counted as downtime for each status. Degraded performance and
+# maintenance count as up.
+DOWNTIME_WEIGHTS = {
+    ServiceStatus.MAJOR_OUTAGE: 1.0,
+    ServiceStatus.PARTIAL_OUTAGE: 0.3,
+}
+
+_STATUSES = list(ServiceStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+# Indexed by status code; the extra last slot is hit by code -1 (status unknown)
+_DOWNTIME_BY_CODE = np.array(
+    [DOWNTIME_WEIGHTS.get(status, 0.0) for status in _STATUSES] + [0.0]
+)
+_TRACKED_BY_CODE = np.array([1.0] * len(_STATUSES) + [0.0])
+
+
+def _status_code(status: Optional[ServiceStatus]) -> int:
+    return -1 if status is None else _STATUS_CODES[status]
+
+
+def compute_daily_uptime(
+    *,
+    begins: np.ndarray,
+    current_codes: np.ndarray,
+    change_services: np.ndarray,
+    change_times: np.ndarray,
+    change_codes: np.ndarray,
+    change_previous_codes: np.ndarray,
+    days: int,
+    now: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute downtime and tracked seconds per service and day.
+
+    All times are seconds relative to the start of the first day. `begins` and
+    `current_codes` hold, per service, when tracking starts and the current
+    status code. Changes must be sorted by (service index, time). Returns two
+    arrays of shape (services, days).
+
+    Each service's history is turned into segments of constant status. Rather
+    than intersecting every segment with every day, the cumulative weighted
+    time is evaluated at all day boundaries at once with a sorted search, and
+    per-day amounts are the differences between consecutive boundaries.
+    """
+    services = len(begins)
+    if services == 0:
+        empty = np.zeros((0, days))
+        return empty, empty
+    service_index = np.arange(services)
+    changes = len(change_services)
+
+    # Status from the start of tracking until the first change: the status that
+    # change replaced, or the current status if the service never changed
+    first_change = np.searchsorted(change_services, service_index, side="left")
+    clipped_first = np.minimum(first_change, max(changes - 1, 0))
+    if changes:
+        has_change = (first_change < changes) & (change_services[clipped_first] == service_index)
+        prefix_codes = np.where(
+            has_change, change_previous_codes[clipped_first], current_codes
+        )
+    else:
+        prefix_codes = current_codes
+
+    seg_services = np.concatenate([service_index, change_services])
+    seg_starts = np.concatenate([
+        begins,
+        np.maximum(change_times, begins[change_services]) if changes else change_times,
+    ])
+    seg_codes = np.concatenate([prefix_codes, change_codes])
+    order = np.lexsort((seg_starts, seg_services))
+    seg_services = seg_services[order]
+    seg_starts = seg_starts[order]
+    seg_codes = seg_codes[order]
+
+    # A segment ends where the next one of the same service starts, or now
+    seg_ends = np.empty_like(seg_starts)
+    seg_ends[:-1] = seg_starts[1:]
+    seg_ends[-1] = now
+    last_of_service = np.append(seg_services[:-1] != seg_services[1:], True)
+    seg_ends[last_of_service] = now
+    lengths = np.clip(seg_ends - seg_starts, 0, None)
+
+    # Locate, for every (service, day boundary), the segment it falls in
+    span = (days + 1) * SECONDS_PER_DAY + 1
+    boundaries = np.arange(days + 1) * SECONDS_PER_DAY
+    seg_keys = seg_services * span + seg_starts
+    query_services = np.repeat(service_index, days + 1)
+    query_times = np.tile(boundaries, services)
+    found = np.searchsorted(seg_keys, query_services * span + query_times, side="right") - 1
+    clipped_found = np.clip(found, 0, None)
+    valid = (found >= 0) & (seg_services[clipped_found] == query_services)
+    elapsed = np.clip(
+        np.minimum(query_times, seg_ends[clipped_found]) - seg_starts[clipped_found],
+        0,
+        None,
+    )
+    first_segment = np.searchsorted(seg_services, service_index, side="left")
+
+    results = []
+    for weights_by_code in (_DOWNTIME_BY_CODE, _TRACKED_BY_CODE):
+        weights = weights_by_code[seg_codes]
+        amounts = weights * lengths
+        # Weighted time accumulated before each segment, per service
+        before = np.cumsum(amounts) - amounts
+        before = before - before[first_segment][seg_services]
+        cumulative = np.where(
+            valid,
+            before[clipped_found] + weights[clipped_found] * elapsed,
+            0.0,
+        ).reshape(services, days + 1)
+        results.append(np.diff(cumulative, axis=1))
+
+    return results[0], results[1]
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def _seconds_since(origin: datetime, values: List[datetime]) -> np.ndarray:
+    return np.array(
+        [(value.replace(tzinfo=None) - origin).total_seconds() for value in values],
+        dtype=np.float64,
+    )
+
+
+def refresh_uptime_rollups(
+    db: Session,
+    *,
+    organization_id: int,
+    since: date,
+    service_ids: Optional[List[int]] = None,
+    now: Optional[datetime] = None,
+) -> None:
+    """
+    Recompute the daily uptime rows of an organization's services from `since`
+    up to and including today.
+
+    All times are naive UTC from the application's clock: status changes are
+    recorded with it and services created with it, so days are cut the same
+    way whatever the database's clock or time zone.
+    """
+    now = now or datetime.utcnow()
+    today = now.date()
+    if since > today:
+        return
+    days = (today - since).days + 1
+    origin = _day_start(since)
+
+    services_query = db.query(Service.id, Service.created_at, Service.status).filter(
+        Service.organization_id == organization_id
+    )
+    if service_ids is not None:
+        services_query = services_query.filter(Service.id.in_(service_ids))
+    services = services_query.order_by(Service.id).all()
+    if not services:
+        return
+    positions = {service.id: position for position, service in enumerate(services)}
+
+    changes = (
+        db.query(
+            ServiceStatusChange.service_id,
+            ServiceStatusChange.changed_at,
+            ServiceStatusChange.status,
+            ServiceStatusChange.previous_status,
+        )
+        .filter(
+            ServiceStatusChange.service_id.in_(positions),
+            ServiceStatusChange.changed_at >= origin,
+        )
+        .order_by(ServiceStatusChange.service_id, ServiceStatusChange.changed_at)
+        .all()
+    )
+
+    created = _seconds_since(origin, [service.created_at or origin for service in services])
+    downtime, tracked = compute_daily_uptime(
+        begins=np.maximum(created, 0.0),
+        current_codes=np.array([_status_code(service.status) for service in services]),
+        change_services=np.array([positions[change.service_id] for change in changes], dtype=np.int64),
+        change_times=_seconds_since(origin, [change.changed_at for change in changes]),
+        change_codes=np.array([_status_code(change.status) for change in changes], dtype=np.int64),
+        change_previous_codes=np.array(
+            [_status_code(change.previous_status) for change in changes], dtype=np.int64
+        ),
+        days=days,
+        now=(now - origin).total_seconds(),
+    )
+
+    rows = []
+    for position, service in enumerate(services):
+        for offset in np.flatnonzero(tracked[position]):
+            day = since + timedelta(days=int(offset))
+            rows.append({
+                "service_id": service.id,
+                "organization_id": organization_id,
+                "day": day,
+                "downtime_seconds": float(downtime[position, offset]),
+                "tracked_seconds": float(tracked[position, offset]),
+                "computed_until": now,
+                "is_complete": day < today,
+            })
+
+    try:
+        db.execute(
+            delete(ServiceUptimeDaily).where(
+                ServiceUptimeDaily.service_id.in_(positions),
+                ServiceUptimeDaily.day >= since,
+            )
+        )
+        if rows:
+            db.execute(insert(ServiceUptimeDaily), rows)
+        db.commit()
+    except IntegrityError:
+        # Another worker refreshed the same rows concurrently
+        db.rollback()
+
+
+def _uptime_percent(downtime: float, tracked: float) -> Optional[float]:
+    if tracked <= 0:
+        return None
+    return round(100.0 * (1.0 - downtime / tracked), 4)
+
+
+def close_uptime_days(
+    db: Session, *, organization_id: int, now: Optional[datetime] = None
+) -> None:
+    """
+    Compute the rollups of the days that ended since an organization's last
+    complete one, going back at most UPTIME_MAX_DAYS.
+    """
+    now = now or datetime.utcnow()
+    today = now.date()
+    last_complete = (
+        db.query(func.max(ServiceUptimeDaily.day))
+        .filter(
+            ServiceUptimeDaily.organization_id == organization_id,
+            ServiceUptimeDaily.is_complete == True,
+        )
+        .scalar()
+    )
+    if last_complete is not None and last_complete >= today - timedelta(days=1):
+        return
+    first_day = today - timedelta(days=UPTIME_MAX_DAYS - 1)
+    since = max(last_complete + timedelta(days=1), first_day) if last_complete else first_day
+    refresh_uptime_rollups(db, organization_id=organization_id, since=since, now=now)
+
+
+class UptimeRollupJob:
+    """
+    Background thread closing out the uptime rollups of every organization at
+    startup and shortly after every UTC midnight, so that reads never write.
+
+    Every worker process runs it; a refresh racing with another worker's is
+    rolled back and left to it.
+    """
+
+    def __init__(self, delay: float = 60.0):
+        # Seconds after midnight to wait, for writes made just before it
+        self.delay = delay
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="uptime-rollups", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self.run_once()
+            now = datetime.utcnow()
+            midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+            self._stopping.wait((midnight - now).total_seconds() + self.delay)
+
+    def run_once(self) -> None:
+        db = SessionLocal()
+        try:
+            organization_ids = [organization_id for (organization_id,) in db.query(Organization.id)]
+            for organization_id in organization_ids:
+                if self._stopping.is_set():
+                    return
+                try:
+                    close_uptime_days(db, organization_id=organization_id)
+                except Exception:
+                    logger.exception("Closing uptime days of organization %s failed", organization_id)
+                    db.rollback()
+        except Exception:
+            logger.exception("Closing uptime days failed")
+        finally:
+            db.close()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+uptime_rollups = UptimeRollupJob()
+
+
+def get_uptime_by_organization(
+    db: Session, *, organization_id: int, days: int = 90
+) -> List[Dict]:
+    """
+    Get per-day uptime for every service of an organization from the rollup
+    rows, which UptimeRollupJob closes out daily. Today is extended to now
+    from the current statuses. Nothing is written.
+    """
+    now = datetime.utcnow()
+    today = now.date()
+    first_day = today - timedelta(days=days - 1)
+
+    services = (
+        db.query(Service)
+        .filter(Service.organization_id == organization_id)
+        .order_by(Service.id)
+        .all()
+    )
+    rows = _get_rollups(db, organization_id=organization_id, since=first_day)
+
+    by_service: Dict[int, Dict[date, ServiceUptimeDaily]] = {}
+    for row in rows:
+        by_service.setdefault(row.service_id, {})[row.day] = row
+
+    result = []
+    for service in services:
+        service_rows = by_service.get(service.id, {})
+        uptime_days = []
+        total_downtime = total_tracked = 0.0
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            row = service_rows.get(day)
+            downtime = row.downtime_seconds if row else 0.0
+            tracked = row.tracked_seconds if row else 0.0
+            if day == today:
+                # Extend today's rollup to now with the status it has been in since
+                if row:
+                    since_rollup = (now - row.computed_until.replace(tzinfo=None)).total_seconds()
+                elif service.created_at:
+                    since_rollup = (now - max(service.created_at.replace(tzinfo=None), _day_start(today))).total_seconds()
+                else:
+                    since_rollup = 0.0
+                since_rollup = max(since_rollup, 0.0)
+                downtime += DOWNTIME_WEIGHTS.get(service.status, 0.0) * since_rollup
+                tracked += since_rollup
+            total_downtime += downtime
+            total_tracked += tracked
+            uptime_days.append({"date": day, "uptime": _uptime_percent(downtime, tracked)})
+        result.append({
+            "service_id": service.id,
+            "name": service.name,
+            "status": service.status,
+            "uptime": _uptime_percent(total_downtime, total_tracked),
+            "days": uptime_days,
+        })
+    return result
+
+
+def _get_rollups(
+    db: Session, *, organization_id: int, since: date
+) -> List[ServiceUptimeDaily]:
+    return (
+        db.query(ServiceUptimeDaily)
+        .filter(
+            ServiceUptimeDaily.organization_id == organization_id,
+            ServiceUptimeDaily.day >= since,
+        )
+        .all()
+    )
+
+
+def get_status_history(
+    db: Session, *, service_id: int, skip: int = 0, limit: int = 100
+) -> List[ServiceStatusChange]:
+    """
+    Get the status transitions of a service, newest first.
+    """
+    return (
+        db.query(ServiceStatusChange)
+        .filter(ServiceStatusChange.service_id == service_id)
+        .order_by(ServiceStatusChange.changed_at.desc(), ServiceStatusChange.id.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
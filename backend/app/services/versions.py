@@ -0,0 +1,32 @@
+import threading
+from typing import Dict
+
+from app.core.events import OrganizationChange, on_organization_change
+
+
+class ContentVersions:
+    """
+    Monotonically increasing content version per organization, bumped after
+    every committed write that affects the organization's data.
+    """
+
+    def __init__(self):
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, organization_id: int) -> int:
+        return self._versions.get(organization_id, 0)
+
+    def bump(self, organization_id: int) -> int:
+        with self._lock:
+            version = self._versions.get(organization_id, 0) + 1
+            self._versions[organization_id] = version
+            return version
+
+
+content_versions = ContentVersions()
+
+
+@on_organization_change
+def _bump_content_version(change: OrganizationChange) -> None:
+    content_versions.bump(change.organization_id)
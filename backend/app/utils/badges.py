@@ -0,0 +1,121 @@
+from functools import lru_cache
+from html import escape
+from typing import Dict
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.models.service import ServiceStatus
+from app.utils.helpers import get_status_color, get_status_display_name
+
+
+# Shields.io palette for the colour names used by get_status_color
+BADGE_COLORS = {
+    "green": "#4c1",
+    "yellow": "#dfb317",
+    "orange": "#fe7d37",
+    "red": "#e05d44",
+    "blue": "#007ec6",
+    "gray": "#9f9f9f",
+}
+
+BADGE_FORMATS = ("svg", "json")
+
+# Average glyph width of 11px Verdana, close enough to size the label box
+CHAR_WIDTH = 6.5
+PADDING = 10
+
+BADGE_TEMPLATE = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="{{total_width}}" height="20" '
+    'role="img" aria-label="{{label}}: {message}">'
+    '<title>{{label}}: {message}</title>'
+    '<linearGradient id="s" x2="0" y2="100%">'
+    '<stop offset="0" stop-color="#bbb" stop-opacity=".1"/><stop offset="1" stop-opacity=".1"/>'
+    '</linearGradient>'
+    '<clipPath id="r"><rect width="{{total_width}}" height="20" rx="3" fill="#fff"/></clipPath>'
+    '<g clip-path="url(#r)">'
+    '<rect width="{{label_width}}" height="20" fill="#555"/>'
+    '<rect x="{{label_width}}" width="{message_width}" height="20" fill="{color}"/>'
+    '<rect width="{{total_width}}" height="20" fill="url(#s)"/>'
+    '</g>'
+    '<g fill="#fff" text-anchor="middle" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="11">'
+    '<text x="{{label_x}}" y="14">{{label}}</text>'
+    '<text x="{{message_x}}" y="14">{message}</text>'
+    '</g></svg>'
+)
+
+
+def _text_width(text: str) -> int:
+    return int(len(text) * CHAR_WIDTH + PADDING)
+
+
+def _status_template(status: str) -> Dict[str, object]:
+    message = get_status_display_name(status)
+    message_width = _text_width(message)
+    return {
+        "message": message,
+        "color": get_status_color(status),
+        "message_width": message_width,
+        # Everything that depends only on the status is filled in once here
+        "svg": BADGE_TEMPLATE.format(
+            message=escape(message),
+            message_width=message_width,
+            color=BADGE_COLORS.get(get_status_color(status), BADGE_COLORS["gray"]),
+        ),
+    }
+
+
+STATUS_TEMPLATES = {status.value: _status_template(status.value) for status in ServiceStatus}
+UNKNOWN_TEMPLATE = _status_template("unknown")
+
+
+@lru_cache(maxsize=4096)
+def render_badge_svg(label: str, status: str) -> bytes:
+    """
+    Render a status badge from the precomputed template of the status.
+    """
+    template = STATUS_TEMPLATES.get(status, UNKNOWN_TEMPLATE)
+    label_width = _text_width(label)
+    return template["svg"].format(
+        label=escape(label),
+        label_width=label_width,
+        total_width=label_width + template["message_width"],
+        label_x=label_width / 2,
+        message_x=label_width + template["message_width"] / 2,
+    ).encode("utf-8")
+
+
+def badge_json(label: str, status: str, cache_seconds: int) -> Dict[str, object]:
+    """
+    Get the shields.io endpoint badge description of a status.
+    """
+    template = STATUS_TEMPLATES.get(status, UNKNOWN_TEMPLATE)
+    return {
+        "schemaVersion": 1,
+        "label": label,
+        "message": template["message"],
+        "color": template["color"],
+        "cacheSeconds": cache_seconds,
+    }
+
+
+def badge_response(label: str, status: str, badge_format: str) -> Response:
+    """
+    Get a badge response as SVG or shields.io endpoint JSON, cached for
+    BADGE_CACHE_SECONDS.
+    """
+    cache_seconds = settings.BADGE_CACHE_SECONDS
+    headers = {
+        "Cache-Control": (
+            f"public, max-age={cache_seconds}, "
+            f"stale-while-revalidate={cache_seconds * 12}"
+        ),
+    }
+    if badge_format == "json":
+        return JSONResponse(badge_json(label, status, cache_seconds), headers=headers)
+    return Response(
+        content=render_badge_svg(label, status),
+        media_type="image/svg+xml",
+        headers=headers,
+    )
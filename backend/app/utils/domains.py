@@ -0,0 +1,19 @@
+from typing import List
+
+import dns.exception
+import dns.resolver
+
+
+def txt_records(name: str, timeout: float = 5.0) -> List[str]:
+    """
+    Get the TXT records of a DNS name, empty when it has none or cannot be
+    resolved.
+    """
+    try:
+        answer = dns.resolver.resolve(name, "TXT", lifetime=timeout)
+    except dns.exception.DNSException:
+        return []
+    return [
+        b"".join(record.strings).decode("utf-8", "replace")
+        for record in answer
+    ]
@@ -0,0 +1,55 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.interfaces import LoaderOption
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    """
+    Parse a comma separated `fields` query parameter into the names of the
+    selected fields of `schema`, in the schema's order. Returns None when no
+    fields are given. Raises ValueError for fields the schema doesn't have.
+    """
+    if fields is None:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    if not names:
+        return None
+    unknown = sorted(names - set(schema.model_fields))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return [name for name in schema.model_fields if name in names]
+
+
+def load_fields(model: Any, fields: Iterable[str], *required: str) -> LoaderOption:
+    """
+    Query option that loads only the columns of `fields`, plus the primary
+    key and any `required` ones, e.g. those a cursor is built from.
+    """
+    names = dict.fromkeys([*fields, *required])
+    return load_only(*(getattr(model, name) for name in names))
+
+
+@lru_cache(maxsize=None)
+def _fieldset_adapter(schema: Type[BaseModel], fields: Tuple[str, ...]) -> TypeAdapter:
+    narrowed = create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields},
+    )
+    return TypeAdapter(List[narrowed])
+
+
+def fieldset_response(items: Sequence[Any], schema: Type[BaseModel], fields: Sequence[str]) -> Response:
+    """
+    Serialize `items` with only the selected fields of `schema`. The other
+    fields are never read, so columns left out of the query stay unloaded.
+    """
+    adapter = _fieldset_adapter(schema, tuple(fields))
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(items)),
+        media_type="application/json",
+    )
@@ -1,6 +1,9 @@
 import re
 from datetime import datetime, timezone
-from typing import Optional
+from typing import FrozenSet, Optional
+from urllib.parse import urlsplit
+
+from app.core.config import settings
 
 
 def slugify(text: str) -> str:
@@ -25,6 +28,28 @@ def slugify(text: str) -> str:
     return text
 
 
+def normalize_host(host: str) -> str:
+    """
+    Normalize a Host header or domain: lowercase, without port or trailing dot.
+    """
+    host = host.strip().lower()
+    if host.startswith("["):
+        # IPv6 literal, possibly with a port
+        return host[:host.find("]") + 1]
+    return host.split(":", 1)[0].rstrip(".")
+
+
+def reserved_hosts() -> FrozenSet[str]:
+    """
+    Get the hosts of the API and frontend, which no organization may claim as
+    its custom domain.
+    """
+    hosts = set(settings.CUSTOM_DOMAIN_EXCLUDED_HOSTS)
+    for url in [settings.PUBLIC_STATUS_PAGE_URL, *settings.BACKEND_CORS_ORIGINS]:
+        hosts.add(urlsplit(url).netloc or url)
+    return frozenset(normalize_host(host) for host in hosts if host)
+
+
 def format_datetime(dt: Optional[datetime] = None, format: str = "%Y-%m-%d %H:%M:%S") -> str:
     """
     Format a datetime object as a string.
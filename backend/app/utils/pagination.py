@@ -0,0 +1,55 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import Response
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode the sort key of the last item of a page as an opaque cursor.
+    """
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> Tuple:
+    """
+    Decode a cursor made by `encode_cursor`, converting each value with the
+    matching entry of `types`. Raises ValueError for malformed cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return tuple(convert(value) for convert, value in zip(types, values))
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+
+def paginate(
+    items: Sequence[Any], *, limit: int, key: Callable[[Any], Tuple]
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Split a result fetched with `limit + 1` rows into the page and the cursor
+    of the next page, or None when this is the last page.
+    """
+    page = list(items[:limit])
+    if len(items) <= limit or not page:
+        return page, None
+    return page, encode_cursor(*key(page[-1]))
+
+
+def set_pagination_headers(response: Response, next_cursor: Optional[str]) -> None:
+    """
+    Expose the next page cursor alongside the list body.
+    """
+    response.headers["X-Has-More"] = "true" if next_cursor else "false"
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
@@ -0,0 +1,37 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller starts the
+    computation and every caller that arrives while it is in flight awaits the
+    same result instead of starting its own.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(
+        self, key: Hashable, function: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Run `function` once per key at a time. Returns the result and whether
+        it was shared with another caller.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            # Run as a task of its own so that the first caller going away
+            # does not cancel the computation for everyone else
+            task = asyncio.ensure_future(function())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -1,19 +1,108 @@
+import asyncio
 import json
-from typing import Dict, List, Any, Optional
+import logging
+from typing import Callable, Dict, List, Any, Optional
 from fastapi import WebSocket
 
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SLOW_CLIENT_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+
+
+class ConnectionWriter:
+    """
+    Sends the messages queued for one websocket from a task of its own, so
+    that a slow client only ever holds up itself.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        *,
+        queue_size: int,
+        send_timeout: float,
+        on_error: Callable[[WebSocket], None],
+    ):
+        self.websocket = websocket
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.send_timeout = send_timeout
+        self.dropped = 0
+        self._on_error = on_error
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                text = await self.queue.get()
+                await asyncio.wait_for(self.websocket.send_text(text), self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Gone, or stalled for longer than the send timeout
+            self._on_error(self.websocket)
+
+    def stop(self, close_code: Optional[int] = None, reason: str = "") -> None:
+        self._task.cancel()
+        if close_code is not None:
+            asyncio.create_task(self._close(close_code, reason))
+
+    async def _close(self, code: int, reason: str) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code, reason=reason), self.send_timeout)
+        except Exception:
+            pass
+
+
 class ConnectionManager:
-    def __init__(self):
+    """
+    Tracks websocket connections and broadcasts messages to them.
+
+    Broadcasts can be made from any thread, including sync endpoints running
+    in the threadpool, and return immediately: the message is serialized once
+    and handed to the event loop, which puts it on the bounded queue of every
+    recipient without waiting for any of them. A writer task per connection
+    drains its queue. When a connection falls `queue_size` messages behind,
+    `slow_client_policy` either drops its oldest queued message, drops the new
+    one, or disconnects it.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = settings.WEBSOCKET_QUEUE_SIZE,
+        slow_client_policy: str = settings.WEBSOCKET_SLOW_CLIENT_POLICY,
+        send_timeout: float = settings.WEBSOCKET_SEND_TIMEOUT_SECONDS,
+    ):
+        if slow_client_policy not in SLOW_CLIENT_POLICIES:
+            raise ValueError(f"Unknown slow client policy: {slow_client_policy}")
+        self.queue_size = queue_size
+        self.slow_client_policy = slow_client_policy
+        self.send_timeout = send_timeout
         # Map organization_id -> list of connected WebSockets
         self.org_connections: Dict[int, List[WebSocket]] = {}
         # Map organization_id -> list of public WebSockets
         self.public_connections: Dict[int, List[WebSocket]] = {}
         # Active connections for all organizations (admin view)
         self.admin_connections: List[WebSocket] = []
-    
+        # Writer of every connection, only touched from the event loop
+        self._writers: Dict[WebSocket, ConnectionWriter] = {}
+        # Loop the connections live on, set by the first connection
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _add_writer(self, websocket: WebSocket) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._writers[websocket] = ConnectionWriter(
+            websocket,
+            queue_size=self.queue_size,
+            send_timeout=self.send_timeout,
+            on_error=self.disconnect,
+        )
+
     async def connect(self, websocket: WebSocket, organization_id: int, is_public: bool = False):
         await websocket.accept()
-        
+        self._add_writer(websocket)
+
         if is_public:
             if organization_id not in self.public_connections:
                 self.public_connections[organization_id] = []
@@ -22,12 +111,21 @@ class ConnectionManager:
             if organization_id not in self.org_connections:
                 self.org_connections[organization_id] = []
             self.org_connections[organization_id].append(websocket)
-    
+
     async def connect_admin(self, websocket: WebSocket):
         await websocket.accept()
+        self._add_writer(websocket)
         self.admin_connections.append(websocket)
-    
-    def disconnect(self, websocket: WebSocket, organization_id: Optional[int] = None, is_public: bool = False):
+
+    def disconnect(
+        self,
+        websocket: WebSocket,
+        organization_id: Optional[int] = None,
+        is_public: bool = False,
+        *,
+        close_code: Optional[int] = None,
+        reason: str = "",
+    ):
         if organization_id is not None:
             if is_public and organization_id in self.public_connections:
                 if websocket in self.public_connections[organization_id]:
@@ -47,39 +145,78 @@ class ConnectionManager:
             for org_id in self.public_connections:
                 if websocket in self.public_connections[org_id]:
                     self.public_connections[org_id].remove(websocket)
-    
+
+        writer = self._writers.pop(websocket, None)
+        if writer is not None:
+            writer.stop(close_code=close_code, reason=reason)
+
     async def send_personal_message(self, message: Any, websocket: WebSocket):
         await websocket.send_text(json.dumps(message))
-    
-    async def broadcast_organization(self, organization_id: int, message: Any):
-        if organization_id in self.org_connections:
-            for connection in self.org_connections[organization_id]:
-                try:
-                    await connection.send_text(json.dumps(message))
-                except Exception:
-                    # Remove disconnected clients
-                    self.disconnect(connection, organization_id)
-        
-        # Also send to admin connections
-        for connection in self.admin_connections:
+
+    def broadcast_organization(self, organization_id: int, message: Any) -> None:
+        """
+        Queue a message for the organization's connections, and for admin
+        connections along with the organization ID.
+        """
+        self._dispatch(
+            self._enqueue_organization,
+            organization_id,
+            json.dumps(message),
+            json.dumps({**message, "organization_id": organization_id}),
+        )
+
+    def broadcast_public(self, organization_id: int, message: Any) -> None:
+        """
+        Queue a message for the organization's public connections.
+        """
+        self._dispatch(self._enqueue_public, organization_id, json.dumps(message))
+
+    def _dispatch(self, callback: Callable[..., None], *args: Any) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # Nobody ever connected, so there is nobody to send to
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            callback(*args)
+        else:
+            loop.call_soon_threadsafe(callback, *args)
+
+    def _enqueue_organization(self, organization_id: int, text: str, admin_text: str) -> None:
+        self._enqueue(self.org_connections.get(organization_id, []), text)
+        self._enqueue(self.admin_connections, admin_text)
+
+    def _enqueue_public(self, organization_id: int, text: str) -> None:
+        self._enqueue(self.public_connections.get(organization_id, []), text)
+
+    def _enqueue(self, connections: List[WebSocket], text: str) -> None:
+        # Copied, as disconnecting a slow client changes the list
+        for connection in list(connections):
+            writer = self._writers.get(connection)
+            if writer is None:
+                continue
             try:
-                await connection.send_text(json.dumps({
-                    **message,
-                    "organization_id": organization_id
-                }))
-            except Exception:
-                # Remove disconnected clients
-                self.disconnect(connection)
-    
-    async def broadcast_public(self, organization_id: int, message: Any):
-        if organization_id in self.public_connections:
-            for connection in self.public_connections[organization_id]:
-                try:
-                    await connection.send_text(json.dumps(message))
-                except Exception:
-                    # Remove disconnected clients
-                    self.disconnect(connection, organization_id, is_public=True)
+                writer.queue.put_nowait(text)
+            except asyncio.QueueFull:
+                self._overflow(writer, text)
+
+    def _overflow(self, writer: ConnectionWriter, text: str) -> None:
+        if self.slow_client_policy == "disconnect":
+            logger.warning(
+                "Disconnecting websocket %s that is %s messages behind",
+                writer.websocket.client,
+                self.queue_size,
+            )
+            self.disconnect(writer.websocket, close_code=1013, reason="Too far behind")
+            return
+        writer.dropped += 1
+        if self.slow_client_policy == "drop_oldest":
+            writer.queue.get_nowait()
+            writer.queue.put_nowait(text)
 
 
 # Create a single instance to be imported elsewhere
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager()
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional
 
 from app.api.dependencies import get_current_user, get_user_organization_id
-from app.services.organization import get_organization_by_slug
+from app.api.private_pages import can_view
+from app.services.resolver import resolve_organization
 from app.db.session import get_db
 from app.websockets.manager import manager
 from sqlalchemy.orm import Session
@@ -78,14 +80,16 @@ async def websocket_public(websocket: WebSocket, org_slug: str):
     WebSocket endpoint for public status page updates
     """
     try:
-        # Get organization by slug
-        db = next(get_db())
-        organization = get_organization_by_slug(db, slug=org_slug)
+        organization = await run_in_threadpool(resolve_organization, org_slug)
         
         if not organization:
             await websocket.close(code=1008, reason="Organization not found")
             return
         
+        if not can_view(organization, websocket):
+            await websocket.close(code=1008, reason="Viewer token required")
+            return
+        
         await manager.connect(websocket, organization.id, is_public=True)
         
         try:
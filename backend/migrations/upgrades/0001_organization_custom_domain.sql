@@ -0,0 +1,9 @@
+-- Custom domains for public status pages (MySQL).
+-- Only needed for databases created before custom domains: create_all adds
+-- new tables but never new columns to existing ones.
+ALTER TABLE organization
+    ADD COLUMN custom_domain VARCHAR(255) NULL,
+    ADD COLUMN custom_domain_token VARCHAR(64) NULL,
+    ADD COLUMN custom_domain_verified_at DATETIME NULL;
+
+CREATE UNIQUE INDEX ix_organization_custom_domain ON organization (custom_domain);
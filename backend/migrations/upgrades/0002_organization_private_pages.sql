@@ -0,0 +1,6 @@
+-- Private status pages gated by viewer tokens (MySQL).
+-- Viewer keys are generated on the next update of each organization, or when
+-- its first viewer token is issued.
+ALTER TABLE organization
+    ADD COLUMN is_private BOOLEAN NOT NULL DEFAULT FALSE,
+    ADD COLUMN viewer_key VARCHAR(64) NULL;
@@ -0,0 +1,22 @@
+-- Change journal for polling clients (MySQL).
+-- create_all also creates these tables; the script is for databases whose
+-- schema is managed by hand. Versions come from the per-organization counter
+-- row, so they are assigned in commit order.
+CREATE TABLE IF NOT EXISTS changejournalentry (
+    id INTEGER NOT NULL AUTO_INCREMENT,
+    organization_id INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    entity VARCHAR(20) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    action VARCHAR(20) NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_changejournalentry_organization_version UNIQUE (organization_id, version),
+    INDEX ix_changejournalentry_id (id)
+);
+
+CREATE TABLE IF NOT EXISTS changejournalcounter (
+    organization_id INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (organization_id)
+);
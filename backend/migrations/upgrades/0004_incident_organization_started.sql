@@ -0,0 +1,3 @@
+-- Index for newest-first incident listings and their keyset pagination (MySQL).
+-- create_all never adds indexes to existing tables.
+CREATE INDEX ix_incident_organization_started ON incident (organization_id, started_at, id);
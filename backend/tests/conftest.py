@@ -1,9 +1,10 @@
 import pytest
+from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.db.base import Base
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_db, get_public_db
 from app.main import app
 
 # Create test database engine
@@ -37,6 +38,7 @@ def client(db_session):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
-    with app.test_client() as c:
+    app.dependency_overrides[get_public_db] = override_get_db
+    with TestClient(app) as c:
         yield c
     app.dependency_overrides = {}
\ No newline at end of file
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from app.cdn.keys import purge_keys, surrogate_keys
+from app.cdn.purge import HTTPPurgeBackend, PurgeBackend, PurgeDispatcher
+from app.cdn.standin import PurgeHandler, serve
+
+
+@pytest.mark.parametrize(
+    "route_path, path_params",
+    [
+        ("/{org_slug}/maintenance.ics", {"org_slug": "acme"}),
+        ("/{org_slug}/services/{service_id}/maintenance.ics", {"org_slug": "acme", "service_id": 7}),
+    ],
+)
+def test_service_rename_purges_calendars(route_path, path_params):
+    keys = surrogate_keys(route_path, 1, path_params)
+
+    # Renaming another service than the one a calendar is for
+    assert set(purge_keys(1, "service", 8)) & set(keys)
+    assert set(purge_keys(1, "incident", 3)) & set(keys)
+
+
+def test_incident_change_leaves_the_service_list_cached():
+    keys = surrogate_keys("/{org_slug}/services", 1, {"org_slug": "acme"})
+
+    assert not set(purge_keys(1, "incident", 3)) & set(keys)
+
+
+@pytest.fixture
+def standin():
+    server = serve(port=0)
+    PurgeHandler.recorder.clear()
+    yield server
+    server.shutdown()
+    server.server_close()
+    PurgeHandler.recorder.clear()
+
+
+def make_dispatcher(server, **kwargs):
+    host, port = server.server_address
+    backend = HTTPPurgeBackend(f"http://{host}:{port}/purge")
+    kwargs.setdefault("batch_window", 0.05)
+    kwargs.setdefault("repeat_after", 0)
+    return PurgeDispatcher(backend, **kwargs)
+
+
+def test_purge_backend_is_abstract():
+    with pytest.raises(TypeError):
+        PurgeBackend()
+
+
+def test_burst_is_coalesced_into_one_batch(standin):
+    dispatcher = make_dispatcher(standin)
+    dispatcher.schedule(["org-1", "service-2"])
+    dispatcher.schedule(["service-2", "org-1-services"])
+    dispatcher.stop(timeout=5)
+
+    assert PurgeHandler.recorder.batches == [["org-1", "service-2", "org-1-services"]]
+
+
+def test_batches_are_split_at_the_backend_limit(standin):
+    dispatcher = make_dispatcher(standin)
+    dispatcher.backend.max_batch = 2
+    dispatcher.schedule(["a", "b", "c"])
+    dispatcher.stop(timeout=5)
+
+    assert PurgeHandler.recorder.batches == [["a", "b"], ["c"]]
+
+
+def test_failed_purge_is_retried(standin):
+    PurgeHandler.recorder.failures = 1
+    dispatcher = make_dispatcher(standin)
+    dispatcher.schedule(["org-1"])
+    dispatcher.stop(timeout=10)
+
+    assert PurgeHandler.recorder.batches == [["org-1"]]
+
+
+def test_keys_are_purged_again_after_repeat_after(standin):
+    dispatcher = make_dispatcher(standin, repeat_after=0.1)
+    dispatcher.schedule(["org-1"])
+    deadline = time.monotonic() + 5
+    while len(PurgeHandler.recorder.batches) < 2 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    dispatcher.stop(timeout=5)
+
+    assert PurgeHandler.recorder.batches == [["org-1"], ["org-1"]]
@@ -0,0 +1,65 @@
+import pytest
+
+from app.core.config import settings
+from app.models.change import ChangeJournalCounter, ChangeJournalEntry
+from app.services.changes import get_changes_since, record_change
+
+
+def record(db, entity_id, *, organization_id=1, action="deleted"):
+    record_change(
+        db, organization_id=organization_id, entity="service", entity_id=entity_id, action=action
+    )
+
+
+def test_versions_are_per_organization_and_contiguous(db_session):
+    record(db_session, 10)
+    record(db_session, 20, organization_id=2)
+    record(db_session, 11)
+
+    versions = [
+        (entry.organization_id, entry.version)
+        for entry in db_session.query(ChangeJournalEntry).order_by(ChangeJournalEntry.id)
+    ]
+    assert versions == [(1, 1), (2, 1), (1, 2)]
+    assert db_session.get(ChangeJournalCounter, 1).version == 2
+
+
+def test_changes_since_a_version(db_session):
+    for entity_id in (10, 11, 12):
+        record(db_session, entity_id)
+
+    changes = get_changes_since(db_session, organization_id=1, since=1)
+    assert changes.version == 3
+    assert not changes.resync_required
+    assert changes.deleted.services == [11, 12]
+
+    assert get_changes_since(db_session, organization_id=1, since=3).deleted.services == []
+
+
+@pytest.mark.parametrize("since", [None, 4])
+def test_resync_without_or_past_the_version(db_session, since):
+    record(db_session, 10)
+    changes = get_changes_since(db_session, organization_id=1, since=since)
+    assert changes.resync_required
+    assert changes.version == 1
+
+
+def test_organization_without_changes(db_session):
+    changes = get_changes_since(db_session, organization_id=1, since=0)
+    assert changes.version == 0
+    assert not changes.resync_required
+
+
+def test_pruning_every_interval(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "CHANGE_JOURNAL_SIZE", 3)
+    monkeypatch.setattr(settings, "CHANGE_JOURNAL_PRUNE_INTERVAL", 2)
+    for entity_id in range(1, 6):
+        record(db_session, entity_id)
+    # Pruned at version 4 down to versions after 1; version 5 added since
+    remaining = [version for (version,) in db_session.query(ChangeJournalEntry.version).order_by("version")]
+    assert remaining == [2, 3, 4, 5]
+
+    assert get_changes_since(db_session, organization_id=1, since=0).resync_required
+    changes = get_changes_since(db_session, organization_id=1, since=1)
+    assert not changes.resync_required
+    assert changes.deleted.services == [2, 3, 4, 5]
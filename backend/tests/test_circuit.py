@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.db.circuit import CircuitBreaker
+from app.db.session import engine, public_engine, statement_timeout
+from app.utils.singleflight import SingleFlight
+
+
+def make_breaker() -> CircuitBreaker:
+    return CircuitBreaker(failure_threshold=5, reset_timeout=15, timeout=2.5, attempts=3)
+
+
+def test_transient_errors_are_retried():
+    calls = []
+
+    async def function():
+        calls.append(statement_timeout.get())
+        if len(calls) < 3:
+            raise OperationalError("SELECT 1", {}, Exception(2013, "Lost connection"))
+        return "ok"
+
+    assert asyncio.run(make_breaker().call(function)) == "ok"
+    # Every attempt runs with the server-side statement timeout
+    assert calls == [2500, 2500, 2500]
+    assert statement_timeout.get() is None
+
+
+def test_query_timeouts_are_not_retried():
+    calls = []
+
+    async def function():
+        calls.append(1)
+        raise OperationalError("SELECT 1", {}, Exception(3024, "Query execution was interrupted"))
+
+    with pytest.raises(OperationalError):
+        asyncio.run(make_breaker().call(function))
+    assert len(calls) == 1
+
+
+def test_shared_failure_is_counted_once():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=15, timeout=2.5, attempts=1)
+    flight = SingleFlight()
+
+    async def query():
+        await asyncio.sleep(0.01)
+        raise OperationalError("SELECT 1", {}, Exception(3024, "Query execution was interrupted"))
+
+    async def read():
+        return await breaker.call(lambda: flight.do("key", query))
+
+    async def run():
+        return await asyncio.gather(*(read() for _ in range(10)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, OperationalError) for result in results)
+    assert not breaker.is_open
+
+
+def test_public_engine_fails_fast():
+    assert public_engine.pool.timeout() == settings.PUBLIC_DB_POOL_TIMEOUT_SECONDS
+    assert public_engine.pool is not engine.pool
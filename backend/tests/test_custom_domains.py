@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from app.api.custom_domains import CustomDomainMiddleware
+from app.core.config import settings
+from app.models.organization import Organization
+from app.schemas.organization import OrganizationCreate, OrganizationUpdate
+from app.services import organization as organization_service
+from app.services.resolver import domain_resolver
+
+
+@pytest.fixture(autouse=True)
+def clear_domain_resolver():
+    domain_resolver.clear()
+    yield
+    domain_resolver.clear()
+
+
+def add_organization(db, *, slug: str, domain: str, verified: bool) -> Organization:
+    organization = Organization(
+        name=slug,
+        slug=slug,
+        custom_domain=domain,
+        custom_domain_token="token",
+        custom_domain_verified_at=datetime.utcnow() if verified else None,
+        is_private=False,
+    )
+    db.add(organization)
+    db.flush()
+    return organization
+
+
+def run_middleware(host: str, path: str, scope_type: str = "http") -> str:
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen["path"] = scope["path"]
+
+    middleware = CustomDomainMiddleware(app, prefix="/public")
+    scope = {"type": scope_type, "path": path, "raw_path": path.encode(), "headers": [(b"host", host.encode())]}
+    asyncio.run(middleware(scope, None, None))
+    return seen["path"]
+
+
+def test_custom_domain_is_normalized():
+    organization = OrganizationCreate(name="Acme", slug="acme", custom_domain="Status.Acme.COM:443")
+    assert organization.custom_domain == "status.acme.com"
+
+
+@pytest.mark.parametrize("domain", ["localhost", "127.0.0.1:8000"])
+def test_excluded_hosts_are_rejected(domain):
+    with pytest.raises(ValidationError):
+        OrganizationUpdate(custom_domain=domain)
+
+
+def test_public_status_page_host_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "PUBLIC_STATUS_PAGE_URL", "https://status-app.example.com")
+    with pytest.raises(ValidationError):
+        OrganizationCreate(name="Acme", slug="acme", custom_domain="status-app.example.com")
+
+
+def test_cors_origin_host_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "BACKEND_CORS_ORIGINS", ["https://app.example.com"])
+    with pytest.raises(ValidationError):
+        OrganizationUpdate(custom_domain="app.example.com")
+
+
+def test_unverified_domain_is_not_resolved(db_session):
+    add_organization(db_session, slug="acme", domain="status.acme.com", verified=False)
+    assert domain_resolver.resolve(db_session, slug="status.acme.com") is None
+
+
+def test_verified_domain_is_rewritten(db_session):
+    add_organization(db_session, slug="acme", domain="status.acme.com", verified=True)
+    assert domain_resolver.resolve(db_session, slug="status.acme.com").slug == "acme"
+
+    assert run_middleware("status.acme.com", "/") == "/public/acme/bundle"
+    assert run_middleware("status.acme.com:443", "/status") == "/public/acme/status"
+    assert run_middleware("status.acme.com", "/ws", "websocket") == "/ws/public/acme"
+    # Slug URLs work on any host
+    assert run_middleware("status.acme.com", "/public/other/status") == "/public/other/status"
+
+
+def test_reserved_hosts_are_not_rewritten():
+    assert run_middleware("localhost:8000", "/api/v1/auth/login") == "/api/v1/auth/login"
+
+
+def test_verify_custom_domain_checks_txt_record(db_session, monkeypatch):
+    organization = add_organization(db_session, slug="acme", domain="status.acme.com", verified=False)
+    monkeypatch.setattr(organization_service, "txt_records", lambda name: ["other"])
+    with pytest.raises(ValueError):
+        organization_service.verify_custom_domain(db_session, db_obj=organization)
+    assert organization.custom_domain_verified_at is None
+
+    looked_up = []
+    monkeypatch.setattr(
+        organization_service, "txt_records", lambda name: looked_up.append(name) or ["token"]
+    )
+    organization_service.verify_custom_domain(db_session, db_obj=organization)
+    assert looked_up == [f"{settings.CUSTOM_DOMAIN_TXT_PREFIX}.status.acme.com"]
+    assert organization.custom_domain_verified_at is not None
+
+
+def test_changing_domain_resets_verification(db_session):
+    organization = add_organization(db_session, slug="acme", domain="status.acme.com", verified=True)
+    organization_service.update_organization(
+        db_session, db_obj=organization, obj_in={"custom_domain": "status.acme.io"}
+    )
+    assert organization.custom_domain_verified_at is None
+    assert organization.custom_domain_token != "token"
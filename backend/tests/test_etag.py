@@ -0,0 +1,111 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.api.etag import make_etag
+from app.api.response_cache import CachedResponse, response_cache
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.organization import Organization
+from app.models.service import Service
+from app.models.user import User
+from app.services import resolver
+from app.services.resolver import organization_resolver
+
+
+@pytest.fixture
+def user(db_session):
+    organization = Organization(name="Acme", slug="acme", is_private=False)
+    db_session.add(organization)
+    db_session.flush()
+    db_session.add(Service(name="API", organization_id=organization.id))
+    user = User(
+        email="ops@acme.test",
+        hashed_password="x",
+        is_active=True,
+        organization_id=organization.id,
+    )
+    db_session.add(user)
+    db_session.flush()
+    return user
+
+
+def get_services(client, user, etag_value=None):
+    headers = {"Authorization": f"Bearer {create_access_token(subject=user.id)}"}
+    if etag_value:
+        headers["If-None-Match"] = etag_value
+    return client.get(f"{settings.API_V1_STR}/services/", headers=headers)
+
+
+def test_etag_is_a_hash_of_the_body(client, user):
+    response = get_services(client, user)
+
+    # Any worker rendering the same content gives the same tag
+    assert response.headers["etag"] == make_etag(response.content)
+
+
+def test_matching_etag_is_answered_with_304(client, user):
+    first = get_services(client, user)
+    assert first.status_code == 200
+
+    second = get_services(client, user, first.headers["etag"])
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+def test_deactivated_user_gets_no_304(client, db_session, user):
+    tag = get_services(client, user).headers["etag"]
+    user.is_active = False
+    db_session.flush()
+
+    assert get_services(client, user, tag).status_code == 400
+
+
+def test_organization_change_changes_the_etag(client, db_session, user):
+    tag = get_services(client, user).headers["etag"]
+    other = Organization(name="Other", slug="other")
+    db_session.add(other)
+    db_session.flush()
+    user.organization_id = other.id
+    db_session.flush()
+
+    response = get_services(client, user, tag)
+    assert response.status_code == 200
+    assert response.headers["etag"] != tag
+
+
+def test_public_route_answers_304_from_the_cached_tag(client, db_session, user, monkeypatch):
+    monkeypatch.setattr(resolver, "PublicSessionLocal", sessionmaker(bind=db_session.connection()))
+    organization_resolver.clear()
+    response_cache.clear()
+
+    first = client.get("/public/acme/services")
+    assert first.headers["etag"] == make_etag(first.content)
+
+    second = client.get("/public/acme/services", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.headers["surrogate-key"] == first.headers["surrogate-key"]
+    organization_resolver.clear()
+    response_cache.clear()
+
+
+def test_unchanged_body_keeps_its_compressed_variants():
+    def cached(body, version, previous=None):
+        return CachedResponse(
+            organization_id=1,
+            version=version,
+            status_code=200,
+            media_type="application/json",
+            headers={},
+            body=body,
+            previous=previous,
+        )
+
+    body = b'{"status": "operational"}' * 100
+    first = cached(body, 1)
+    assert "gzip" in first.bodies
+
+    # A version bump that leaves the URL unchanged does not compress again
+    assert cached(body, 2, first).bodies is first.bodies
+    changed = cached(body + b" ", 3, first)
+    assert changed.bodies is not first.bodies
+    assert changed.bodies["identity"] == body + b" "
@@ -0,0 +1,23 @@
+from app.models.incident import Incident, IncidentUpdate, IncidentStatus, incident_service
+from app.models.organization import Organization
+from app.models.service import Service
+from app.services.export import iter_incident_history
+
+
+def test_history_lists_every_service_of_an_incident(db_session):
+    organization = Organization(name="Acme", slug="acme", is_private=False)
+    db_session.add(organization)
+    db_session.flush()
+    services = [Service(name=f"service {n}", organization_id=organization.id) for n in range(300)]
+    incident = Incident(title="Outage", organization_id=organization.id)
+    db_session.add_all(services + [incident])
+    db_session.flush()
+    db_session.execute(incident_service.insert(), [
+        {"incident_id": incident.id, "service_id": service.id} for service in services
+    ])
+    db_session.add(IncidentUpdate(message="Looking", status=IncidentStatus.INVESTIGATING, incident_id=incident.id))
+    db_session.flush()
+
+    [record] = list(iter_incident_history(db_session, organization_id=organization.id))
+    assert record["service_ids"] == sorted(service.id for service in services)
+    assert [update["message"] for update in record["updates"]] == ["Looking"]
@@ -0,0 +1,67 @@
+import threading
+
+from app.services.feeds import FeedCache
+
+
+def make_cache(ttl, max_entries=8):
+    renders = []
+
+    def render(db, *, organization_id):
+        renders.append(organization_id)
+        return {"rss": f"render {len(renders)}".encode()}
+
+    return FeedCache(render, name="test-renderer", ttl=ttl, max_entries=max_entries), renders
+
+
+def wait_for_renders(cache):
+    # The executor runs one render at a time, so this returns after those queued
+    cache._executor.submit(lambda: None).result(timeout=5)
+
+
+def test_fresh_feeds_are_served_from_memory():
+    cache, renders = make_cache(ttl=60)
+    assert cache.get(None, 1, "rss") == b"render 1"
+    assert cache.get(None, 1, "rss") == b"render 1"
+    assert renders == [1]
+
+
+def test_expired_feeds_are_rerendered_in_the_background():
+    cache, renders = make_cache(ttl=0)
+    assert cache.get(None, 1, "rss") == b"render 1"
+    # The previous documents are served while the new ones render
+    assert cache.get(None, 1, "rss") == b"render 1"
+    wait_for_renders(cache)
+    assert cache.get(None, 1, "rss") == b"render 2"
+
+
+def test_scheduled_rerender():
+    cache, renders = make_cache(ttl=60)
+    cache.schedule(1)
+    wait_for_renders(cache)
+    # Never requested, so nothing to re-render
+    assert renders == []
+
+    cache.get(None, 1, "rss")
+    cache.schedule(1)
+    wait_for_renders(cache)
+    assert cache.get(None, 1, "rss") == b"render 2"
+
+
+def test_changed_feeds_are_never_served_from_before_the_change():
+    cache, renders = make_cache(ttl=60)
+    cache.get(None, 1, "rss")
+    # Block the background renderer so the request comes first
+    blocker = threading.Event()
+    cache._executor.submit(blocker.wait, 5)
+
+    cache.schedule(1)
+    assert cache.get(None, 1, "rss") == b"render 2"
+    blocker.set()
+
+
+def test_least_recently_requested_feeds_are_evicted():
+    cache, renders = make_cache(ttl=60, max_entries=2)
+    for organization_id in (1, 2, 1, 3):
+        cache.get(None, organization_id, "rss")
+
+    assert list(cache._feeds) == [1, 3]
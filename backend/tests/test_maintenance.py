@@ -0,0 +1,133 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.incident import Incident, IncidentImpact, IncidentStatus
+from app.schemas.incident import MaintenanceWindow
+from app.services.maintenance import MaintenanceIndex, MaintenanceTree, maintenance_window
+
+
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def at(hours: float) -> datetime:
+    return EPOCH + timedelta(hours=hours)
+
+
+def window(id, start, end=None):
+    return MaintenanceWindow(
+        id=id,
+        title=f"Maintenance {id}",
+        status=IncidentStatus.IDENTIFIED,
+        impact=IncidentImpact.MINOR,
+        starts_at=at(start),
+        ends_at=at(end) if end is not None else None,
+    )
+
+
+def ids(windows):
+    return [window.id for window in windows]
+
+
+def brute_at(windows, moment):
+    return sorted(
+        (w for w in windows if w.starts_at <= moment and (w.ends_at is None or moment < w.ends_at)),
+        key=lambda w: (w.starts_at, w.id),
+    )
+
+
+def brute_overlapping(windows, start, end):
+    def overlaps(w):
+        if w.ends_at == w.starts_at:
+            # Empty windows only count when they start inside the range
+            return start < w.starts_at < end
+        return w.starts_at < end and (w.ends_at is None or w.ends_at > start)
+
+    return sorted(filter(overlaps, windows), key=lambda w: (w.starts_at, w.id))
+
+
+def test_windows_are_half_open():
+    tree = MaintenanceTree([window(1, 0, 2), window(2, 2, 4)])
+
+    assert ids(tree.at(at(0))) == [1]
+    assert ids(tree.at(at(2))) == [2]
+    assert ids(tree.at(at(4))) == []
+    assert ids(tree.at(at(-1))) == []
+
+
+def test_open_ended_window_never_ends():
+    tree = MaintenanceTree([window(1, 0), window(2, 1, 2)])
+
+    assert ids(tree.at(at(1.5))) == [1, 2]
+    assert ids(tree.at(at(10_000))) == [1]
+
+
+def test_empty_window_contains_no_point_but_starts_in_ranges():
+    tree = MaintenanceTree([window(1, 1, 1)])
+
+    assert tree.at(at(1)) == []
+    assert ids(tree.starting(at(0), at(1))) == [1]
+    assert ids(tree.overlapping(at(0), at(2))) == [1]
+
+
+def test_naive_moments_are_taken_as_utc():
+    tree = MaintenanceTree([window(1, 0, 2)])
+
+    assert ids(tree.at(at(1).replace(tzinfo=None))) == [1]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_queries_match_a_linear_scan(seed):
+    rng = random.Random(seed)
+    windows = []
+    for id in range(200):
+        start = rng.randrange(0, 500)
+        end = None if rng.random() < 0.1 else start + rng.choice([0, 1, 2, 5, 24, 100])
+        windows.append(window(id, start, end))
+    tree = MaintenanceTree(windows)
+
+    for _ in range(100):
+        moment = at(rng.uniform(-10, 620))
+        assert ids(tree.at(moment)) == ids(brute_at(windows, moment))
+
+        start = at(rng.randrange(-10, 600))
+        end = start + timedelta(hours=rng.randrange(1, 48))
+        expected = [w for w in windows if start < w.starts_at <= end]
+        assert ids(tree.starting(start, end)) == ids(sorted(expected, key=lambda w: (w.starts_at, w.id)))
+        assert ids(tree.overlapping(start, end)) == ids(brute_overlapping(windows, start, end))
+
+
+def test_resolved_maintenance_ends_when_resolved():
+    incident = Incident(
+        id=1,
+        title="Database upgrade",
+        status=IncidentStatus.RESOLVED,
+        impact=IncidentImpact.MINOR,
+        scheduled_start_time=at(0).replace(tzinfo=None),
+        scheduled_end_time=at(4).replace(tzinfo=None),
+        resolved_at=at(1).replace(tzinfo=None),
+        services=[],
+    )
+
+    result = maintenance_window(incident)
+    assert (result.starts_at, result.ends_at) == (at(0), at(1))
+
+
+def test_invalidated_tree_is_not_replaced_by_an_overlapping_load(monkeypatch):
+    index = MaintenanceIndex(resync_interval=3600)
+    loads = []
+
+    def incidents(db, *, organization_id, since):
+        # A write lands while the tree is being loaded
+        if not loads:
+            index.invalidate(organization_id)
+        loads.append(organization_id)
+        return []
+
+    monkeypatch.setattr("app.services.maintenance.get_maintenance_incidents_by_organization", incidents)
+
+    index.get(None, 1)
+    index.get(None, 1)
+    index.get(None, 1)
+    assert loads == [1, 1]
@@ -0,0 +1,145 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.mirror import shipper
+from app.mirror.log import SnapshotLog
+from app.models.incident import Incident, IncidentStatus, IncidentType
+from app.models.organization import Organization
+from app.models.service import Service, ServiceStatus
+from app.services.calendars import render_calendars
+
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(check, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if check():
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise AssertionError("Mirror did not catch up")
+        time.sleep(0.1)
+
+
+@pytest.fixture
+def leader(db_session, tmp_path, monkeypatch):
+    """
+    An organization shipped to a snapshot log in this process.
+    """
+    monkeypatch.setattr(shipper, "snapshot_log", SnapshotLog(str(tmp_path / "mirror.log")))
+    monkeypatch.setattr(shipper, "_shipped", set())
+
+    organization = Organization(name="Acme", slug="acme", is_private=False)
+    db_session.add(organization)
+    db_session.flush()
+    service = Service(name="API", organization_id=organization.id)
+    db_session.add(service)
+    db_session.flush()
+    now = datetime.utcnow()
+    maintenance = Incident(
+        title="Database upgrade",
+        status=IncidentStatus.IDENTIFIED,
+        type=IncidentType.MAINTENANCE,
+        organization_id=organization.id,
+        scheduled_start_time=now + timedelta(days=1),
+        scheduled_end_time=now + timedelta(days=1, hours=2),
+        services=[service],
+    )
+    db_session.add(maintenance)
+    db_session.flush()
+
+    assert shipper.ship_organization(db_session, organization.id)
+    return organization, service, maintenance
+
+
+@pytest.fixture
+def mirror(leader, tmp_path):
+    """
+    A mirror server process following the leader's snapshot log.
+    """
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "app.mirror.server",
+            "--log", str(tmp_path / "mirror.log"),
+            "--port", str(port),
+        ],
+        cwd=BACKEND,
+        env=os.environ.copy(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            wait_for(lambda: client.get("/").json()["organizations"] == 1)
+            yield client
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def test_mirror_serves_the_shipped_documents(db_session, leader, mirror):
+    organization, service, maintenance = leader
+
+    status = mirror.get("/public/acme/status")
+    assert status.status_code == 200
+    assert status.json()["status"] == "operational"
+    assert mirror.get("/public/acme/status", headers={"If-None-Match": status.headers["etag"]}).status_code == 304
+
+    badge = mirror.get(f"/public/acme/services/{service.id}/badge.json")
+    assert badge.json()["label"] == "API"
+    assert mirror.get("/public/acme/badge.svg").headers["content-type"] == "image/svg+xml"
+
+    calendar = mirror.get("/public/acme/maintenance.ics")
+    assert calendar.headers["content-type"].startswith("text/calendar")
+    assert calendar.content == render_calendars(db_session, organization_id=organization.id)[None]
+    assert mirror.get(f"/public/acme/services/{service.id}/maintenance.ics").status_code == 200
+    assert mirror.get(f"/public/acme/services/{service.id + 1}/maintenance.ics").status_code == 404
+
+    upcoming = mirror.get("/public/acme/maintenance/upcoming").json()
+    assert [window["id"] for window in upcoming] == [maintenance.id]
+    assert mirror.get(
+        "/public/acme/maintenance/upcoming", params={"service_ids": service.id + 1}
+    ).json() == []
+    assert mirror.get("/public/acme/maintenance/active").json() == []
+
+    assert mirror.get("/public/missing/status").status_code == 404
+
+
+def test_mirror_tells_clients_behind_it_to_resync(mirror):
+    resync = mirror.get("/public/acme/changes").json()
+    assert resync["resync_required"]
+
+    current = mirror.get("/public/acme/changes", params={"since": resync["version"]}).json()
+    assert not current["resync_required"]
+    assert current["version"] == resync["version"]
+
+
+def test_mirror_follows_deltas(db_session, leader, mirror):
+    organization, service, _ = leader
+    service.status = ServiceStatus.MAJOR_OUTAGE
+    db_session.flush()
+
+    assert shipper.ship_organization(db_session, organization.id)
+    wait_for(
+        lambda: mirror.get("/public/acme/services").json()[0]["status"] == "major_outage"
+    )
+    assert mirror.get("/public/acme/status").json()["status"] == "major_outage"
@@ -0,0 +1,23 @@
+from sqlalchemy import text
+
+from app.models.organization import Organization
+from app.models.service import Service, ServiceStatusChange, ServiceUptimeDaily
+from app.schemas.service import ServiceCreate
+from app.services.organization import delete_organization
+from app.services.service import create_service
+
+
+def test_delete_organization_with_service_history(db_session):
+    # SQLite only enforces foreign keys when asked to, like MySQL always does
+    db_session.execute(text("PRAGMA foreign_keys=ON"))
+    organization = Organization(name="Acme", slug="acme")
+    db_session.add(organization)
+    db_session.flush()
+    service = create_service(db_session, obj_in=ServiceCreate(name="API", organization_id=organization.id))
+
+    delete_organization(db_session, id=organization.id)
+
+    assert db_session.get(Organization, organization.id) is None
+    assert db_session.query(ServiceStatusChange).count() == 0
+    assert db_session.query(ServiceUptimeDaily).count() == 0
+    assert db_session.get(Service, service.id).organization_id is None
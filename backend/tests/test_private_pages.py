@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app.api.private_pages import cache_query
+from app.api.response_cache import response_cache
+from app.core.security import create_viewer_token, verify_viewer_token
+from app.models.organization import Organization
+from app.services import resolver
+from app.services.organization import issue_viewer_token, rotate_viewer_key
+from app.services.resolver import organization_resolver
+
+
+def in_an_hour():
+    return datetime.utcnow() + timedelta(hours=1)
+
+
+def test_viewer_token_is_verified():
+    token = create_viewer_token(1, "key", in_an_hour())
+
+    assert verify_viewer_token(token, 1, "key")
+    assert not verify_viewer_token(token, 2, "key")
+    assert not verify_viewer_token(token, 1, "rotated")
+    assert not verify_viewer_token(token, 1, None)
+    assert not verify_viewer_token(None, 1, "key")
+    assert not verify_viewer_token(token[:-2] + "xx", 1, "key")
+    assert not verify_viewer_token("not.a-token", 1, "key")
+
+
+def test_expired_viewer_token_is_rejected():
+    token = create_viewer_token(1, "key", datetime.utcnow() - timedelta(seconds=1))
+
+    assert not verify_viewer_token(token, 1, "key")
+
+
+def test_cache_query_drops_the_viewer_token():
+    request = Request({
+        "type": "http",
+        "path": "/public/acme/services",
+        "query_string": b"fields=id%2Cname&viewer_token=abc",
+        "headers": [],
+    })
+
+    assert cache_query(request) == "fields=id%2Cname"
+
+
+@pytest.fixture
+def private_organization(db_session, monkeypatch):
+    # Let the resolver query through the test transaction
+    monkeypatch.setattr(resolver, "PublicSessionLocal", sessionmaker(bind=db_session.connection()))
+    organization_resolver.clear()
+    response_cache.clear()
+    organization = Organization(name="Acme", slug="acme", is_private=True)
+    db_session.add(organization)
+    db_session.flush()
+    yield organization
+    organization_resolver.clear()
+    response_cache.clear()
+
+
+def test_private_page_needs_a_viewer_token(client, private_organization):
+    response = client.get("/public/acme/services")
+
+    assert response.status_code == 401
+
+
+def test_viewer_token_header_or_query_parameter_grants_access(client, db_session, private_organization):
+    token, _ = issue_viewer_token(db_session, db_obj=private_organization)
+
+    by_header = client.get("/public/acme/services", headers={"X-Viewer-Token": token})
+    by_query = client.get(f"/public/acme/services?viewer_token={token}")
+
+    assert by_header.status_code == by_query.status_code == 200
+    assert by_header.headers["cache-control"] == "private, no-cache"
+    assert "surrogate-key" not in by_header.headers
+
+
+def test_rotated_key_revokes_cached_access(client, db_session, private_organization):
+    token, _ = issue_viewer_token(db_session, db_obj=private_organization)
+    assert client.get("/public/acme/services", headers={"X-Viewer-Token": token}).status_code == 200
+
+    rotate_viewer_key(db_session, db_obj=private_organization)
+
+    assert client.get("/public/acme/services", headers={"X-Viewer-Token": token}).status_code == 401
@@ -0,0 +1,71 @@
+import json
+from datetime import datetime
+
+from app.core.config import settings
+from app.models.organization import Organization
+from app.schemas.incident import IncidentPublic
+from app.services import status
+from app.services.resolver import organization_resolver
+from app.services.shared_snapshots import SharedSnapshotStore, slot_size_for
+
+
+def test_put_and_get(tmp_path):
+    store = SharedSnapshotStore(str(tmp_path / "snapshots"), capacity=8, slot_size=4096)
+    assert store.put(1, "acme", b"{}", store.generation)
+    assert store.get("acme") == (1, b"{}")
+
+    store.invalidate(1)
+    assert store.get("acme") is None
+
+
+def test_put_refuses_payloads_larger_than_a_slot(tmp_path):
+    store = SharedSnapshotStore(str(tmp_path / "snapshots"), capacity=8, slot_size=4096)
+    payload = b"x" * 4096
+    assert not store.fits("acme", payload)
+    assert not store.put(1, "acme", payload, store.generation)
+    assert store.get("acme") is None
+
+
+def test_default_slot_fits_the_listed_active_incidents():
+    incident = IncidentPublic(
+        id=2 ** 31 - 1,
+        title="x" * 255,
+        status="investigating",
+        impact="critical",
+        type="maintenance",
+        started_at=datetime(2026, 1, 1),
+        resolved_at=datetime(2026, 1, 1),
+        scheduled_start_time=datetime(2026, 1, 1),
+        scheduled_end_time=datetime(2026, 1, 1),
+    ).model_dump(mode="json")
+    incident_size = len(json.dumps(incident, separators=(",", ":"))) + 1
+    assert slot_size_for(100) >= 8192 + 100 * incident_size
+
+
+def test_layout_is_part_of_the_file_name(tmp_path):
+    old = SharedSnapshotStore(str(tmp_path / "snapshots"), capacity=8, slot_size=4096)
+    assert old.put(1, "acme", b"{}", old.generation)
+
+    # A worker with another slot size leaves the file the old one mapped alone
+    new = SharedSnapshotStore(str(tmp_path / "snapshots"), capacity=8, slot_size=8192)
+    assert new.get("acme") is None
+    assert new.path != old.path
+    assert old.get("acme") == (1, b"{}")
+
+
+def test_failed_put_falls_back_to_the_worker_cache(db_session, monkeypatch, tmp_path):
+    store = SharedSnapshotStore(str(tmp_path / "snapshots"), capacity=8, slot_size=slot_size_for(100))
+    monkeypatch.setattr(settings, "SHARED_SNAPSHOTS_ENABLED", True)
+    monkeypatch.setattr(status, "shared_snapshots", store)
+    # Another organization changes while the snapshot is being built
+    monkeypatch.setattr(store, "put", lambda *args: False)
+    organization_resolver.clear()
+    status.status_cache.clear()
+    db_session.add(Organization(name="Acme", slug="acme", is_private=False))
+    db_session.flush()
+
+    snapshot = status.get_status_snapshot(db_session, org_slug="acme")
+
+    assert status.status_cache.get("acme") == snapshot
+    status.status_cache.clear()
+    organization_resolver.clear()
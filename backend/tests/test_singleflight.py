@@ -0,0 +1,61 @@
+import asyncio
+
+from starlette.requests import Request
+
+from app.api.response_cache import public_read_key
+from app.utils.singleflight import SingleFlight
+
+
+def make_request(path: str, query: str = "") -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(b"host", b"testserver")],
+        "server": ("testserver", 80),
+        "scheme": "http",
+    })
+
+
+def test_public_read_key_includes_path_parameters():
+    first = public_read_key(make_request("/public/acme/incidents/1"), 1)
+    second = public_read_key(make_request("/public/acme/incidents/2"), 1)
+    assert first != second
+
+
+def test_public_read_key_separates_formats():
+    assert public_read_key(make_request("/public/acme/feed.rss"), 1) != public_read_key(
+        make_request("/public/acme/feed.atom"), 1
+    )
+    assert public_read_key(make_request("/public/acme/badge.svg"), 1) != public_read_key(
+        make_request("/public/acme/badge.json"), 1
+    )
+
+
+def test_public_read_key_ignores_viewer_token():
+    first = public_read_key(make_request("/public/acme/status", "viewer_token=a"), 1)
+    second = public_read_key(make_request("/public/acme/status", "viewer_token=b"), 1)
+    assert first == second
+
+
+def test_single_flight_shares_same_key_only():
+    flights = SingleFlight()
+    calls = []
+
+    async def render(name):
+        calls.append(name)
+        await asyncio.sleep(0.01)
+        return name
+
+    async def run():
+        return await asyncio.gather(
+            flights.do("a", lambda: render("a")),
+            flights.do("a", lambda: render("a")),
+            flights.do("b", lambda: render("b")),
+        )
+
+    results = asyncio.run(run())
+    assert results == [("a", False), ("a", True), ("b", False)]
+    assert calls == ["a", "b"]
+    assert len(flights) == 0
@@ -0,0 +1,75 @@
+import pytest
+
+from app.models.incident import Incident, IncidentStatus
+from app.models.organization import Organization
+from app.models.service import Service, ServiceStatus
+from app.services.resolver import organization_resolver
+from app.services.status import build_status_bundle, build_status_snapshot, get_status_batch
+from app.services.status_index import overall_status
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    organization_resolver.clear()
+    yield
+    organization_resolver.clear()
+
+
+def test_overall_status_is_most_severe():
+    assert overall_status([]) == ServiceStatus.OPERATIONAL
+    assert overall_status(
+        [ServiceStatus.OPERATIONAL, ServiceStatus.MAJOR_OUTAGE, ServiceStatus.DEGRADED_PERFORMANCE]
+    ) == ServiceStatus.MAJOR_OUTAGE
+
+
+def test_snapshot_is_built_from_database_rows(db_session):
+    organization = Organization(name="Acme", slug="acme", is_private=False)
+    db_session.add(organization)
+    db_session.flush()
+    db_session.add_all([
+        Service(name="API", status=ServiceStatus.PARTIAL_OUTAGE, organization_id=organization.id),
+        Service(name="Web", status=ServiceStatus.OPERATIONAL, organization_id=organization.id),
+        Incident(title="Errors", status=IncidentStatus.INVESTIGATING, organization_id=organization.id),
+        Incident(title="Old", status=IncidentStatus.RESOLVED, organization_id=organization.id),
+    ])
+    db_session.flush()
+
+    snapshot = build_status_snapshot(db_session, org_slug="acme")
+    assert snapshot["status"] == ServiceStatus.PARTIAL_OUTAGE.value
+    assert snapshot["active_incidents_count"] == len(snapshot["active_incidents"]) == 1
+
+
+def test_bundle_lists_every_service_and_active_incident(db_session):
+    organization = Organization(name="Acme", slug="acme", is_private=False)
+    db_session.add(organization)
+    db_session.flush()
+    db_session.add_all(
+        [Service(name=f"Service {n}", organization_id=organization.id) for n in range(150)]
+        + [
+            Incident(title=f"Incident {n}", status=IncidentStatus.INVESTIGATING, organization_id=organization.id)
+            for n in range(120)
+        ]
+    )
+    db_session.flush()
+
+    bundle = build_status_bundle(db_session, org_slug="acme")
+    assert len(bundle.services) == 150
+    assert len(bundle.active_incidents) == 120
+
+
+def test_batch_and_bundle_see_writes_made_elsewhere(db_session):
+    organization = Organization(name="Acme", slug="acme", is_private=False)
+    db_session.add(organization)
+    db_session.flush()
+    assert get_status_batch(db_session, slugs=["acme"]).statuses[0].status == ServiceStatus.OPERATIONAL
+
+    # Written without change events, as by another worker
+    db_session.add_all([
+        Service(name="API", status=ServiceStatus.MAJOR_OUTAGE, organization_id=organization.id),
+        Incident(title="Down", status=IncidentStatus.IDENTIFIED, organization_id=organization.id),
+    ])
+    db_session.flush()
+
+    summary = get_status_batch(db_session, slugs=["acme"]).statuses[0]
+    assert (summary.status, summary.active_incidents_count) == (ServiceStatus.MAJOR_OUTAGE, 1)
+    assert build_status_bundle(db_session, org_slug="acme").status == ServiceStatus.MAJOR_OUTAGE
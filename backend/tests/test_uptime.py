@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core import events
+from app.models.organization import Organization
+from app.models.service import Service, ServiceStatus, ServiceStatusChange, ServiceUptimeDaily
+from app.services import service as service_module
+from app.services.service import update_service_status
+from app.services.uptime import close_uptime_days, get_uptime_by_organization
+
+
+def add_service(db, *, created_at):
+    organization = Organization(name="Acme", slug="acme")
+    db.add(organization)
+    db.flush()
+    service = Service(
+        name="API",
+        status=ServiceStatus.OPERATIONAL,
+        organization_id=organization.id,
+        created_at=created_at,
+    )
+    db.add(service)
+    db.flush()
+    db.add(ServiceStatusChange(
+        service_id=service.id,
+        organization_id=organization.id,
+        status=service.status,
+        changed_at=created_at,
+    ))
+    db.flush()
+    return service
+
+
+def test_reading_uptime_writes_no_rollups(db_session):
+    service = add_service(db_session, created_at=datetime.utcnow() - timedelta(days=3))
+
+    uptime = get_uptime_by_organization(db_session, organization_id=service.organization_id, days=7)
+
+    assert db_session.query(ServiceUptimeDaily).count() == 0
+    # Today is still extended from the current status
+    assert uptime[0]["days"][-1]["uptime"] == 100.0
+
+
+def test_close_uptime_days_completes_the_days_that_ended(db_session):
+    now = datetime.utcnow()
+    service = add_service(db_session, created_at=now - timedelta(days=3))
+
+    close_uptime_days(db_session, organization_id=service.organization_id, now=now)
+
+    days = {
+        row.day: row.is_complete
+        for row in db_session.query(ServiceUptimeDaily).filter_by(service_id=service.id)
+    }
+    assert len(days) == 4
+    assert days[now.date()] is False
+    assert all(days[now.date() - timedelta(days=offset)] for offset in (1, 2, 3))
+
+    uptime = get_uptime_by_organization(db_session, organization_id=service.organization_id, days=7)
+    assert [day["uptime"] for day in uptime[0]["days"][-4:]] == [100.0] * 4
+    assert uptime[0]["days"][0]["uptime"] is None
+
+
+def test_failed_uptime_refresh_still_publishes_the_change(db_session, monkeypatch):
+    # Commits and rollbacks stay inside savepoints of the test transaction
+    db = Session(bind=db_session.connection(), join_transaction_mode="create_savepoint")
+    service = add_service(db, created_at=datetime.utcnow() - timedelta(days=1))
+    published = []
+    monkeypatch.setattr(events, "_change_listeners", [published.append])
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("rollup failed")
+
+    monkeypatch.setattr(service_module, "refresh_uptime_rollups", fail)
+
+    update_service_status(db, db_obj=service, status=ServiceStatus.MAJOR_OUTAGE)
+
+    assert [change.status for change in published] == [ServiceStatus.MAJOR_OUTAGE]
+    assert db.get(Service, service.id).status == ServiceStatus.MAJOR_OUTAGE
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from app.websockets.manager import ConnectionManager
+
+
+class FakeWebSocket:
+    """
+    Websocket that only sends once `unblocked` is set, to play a slow client.
+    """
+
+    client = ("127.0.0.1", 50000)
+
+    def __init__(self, *, slow: bool = False):
+        self.sent = []
+        self.closed_with = None
+        self.closes = 0
+        self.unblocked = asyncio.Event()
+        if not slow:
+            self.unblocked.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.unblocked.wait()
+        self.sent.append(text)
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+        self.closes += 1
+
+
+async def flush():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+async def broadcast(policy, count, *, queue_size=2):
+    manager = ConnectionManager(queue_size=queue_size, slow_client_policy=policy, send_timeout=1)
+    slow, fast = FakeWebSocket(slow=True), FakeWebSocket()
+    await manager.connect(slow, 1, is_public=True)
+    await manager.connect(fast, 1, is_public=True)
+    # The slow writer takes message 0 off its queue and blocks sending it
+    for number in range(count):
+        manager.broadcast_public(1, {"n": number})
+        await flush()
+    return manager, slow, fast
+
+
+def numbers(websocket):
+    return [int(text.split(": ")[1].rstrip("}")) for text in websocket.sent]
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ConnectionManager(slow_client_policy="block")
+
+
+@pytest.mark.parametrize(
+    "policy, expected",
+    [("drop_oldest", [0, 4, 5]), ("drop_newest", [0, 1, 2])],
+)
+def test_slow_client_drops_messages(policy, expected):
+    async def run():
+        manager, slow, fast = await broadcast(policy, 6)
+        writer = manager._writers[slow]
+        slow.unblocked.set()
+        await flush()
+        return writer.dropped, numbers(slow), numbers(fast)
+
+    dropped, slow_numbers, fast_numbers = asyncio.run(run())
+
+    assert fast_numbers == list(range(6))
+    assert slow_numbers == expected
+    assert dropped == 3
+
+
+def test_slow_client_is_disconnected():
+    async def run():
+        manager, slow, fast = await broadcast("disconnect", 4)
+        return manager, slow, fast
+
+    manager, slow, fast = asyncio.run(run())
+
+    assert slow.closed_with == 1013
+    assert slow.closes == 1
+    assert slow not in manager._writers
+    assert manager.public_connections[1] == [fast]
+    assert numbers(fast) == [0, 1, 2, 3]
+
+
+def test_stalled_send_times_out():
+    async def run():
+        manager = ConnectionManager(queue_size=2, slow_client_policy="drop_oldest", send_timeout=0.01)
+        slow = FakeWebSocket(slow=True)
+        await manager.connect(slow, 1)
+        manager.broadcast_organization(1, {"n": 0})
+        await asyncio.sleep(0.05)
+        return manager, slow
+
+    manager, slow = asyncio.run(run())
+
+    assert slow not in manager._writers
+    assert manager.org_connections[1] == []
+
+
+def test_broadcast_from_another_thread():
+    async def run():
+        manager = ConnectionManager(queue_size=2)
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, 1)
+        await asyncio.to_thread(manager.broadcast_organization, 1, {"n": 7})
+        await flush()
+        return websocket
+
+    assert numbers(asyncio.run(run())) == [7]
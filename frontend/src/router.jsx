@@ -42,6 +42,7 @@ const AppRoutes = () => {
     <Routes>
       {/* Public routes */}
       <Route path="/" element={<PublicLayout><StatusPage /></PublicLayout>} />
+      <Route path="/status/:slug" element={<PublicLayout><StatusPage /></PublicLayout>} />
       <Route path="/incidents/:id" element={<PublicLayout><IncidentDetail /></PublicLayout>} />
       
       {/* Auth routes */}